@@ -0,0 +1,85 @@
+"""
+Проверка выбора компонентов на синтетическом каталоге.
+
+Сравнивает построение ComponentRegistry и валидацию через него
+с прежним подходом (линейный поиск компонента по имени и
+проверка требований по списку).
+
+Запуск:
+    python benchmarks/bench_component_registry.py --size 10000 --selected 2000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from botango.core.component_registry import ComponentRegistry  # noqa: E402
+from botango.core.project_config import Component  # noqa: E402
+
+
+def synthetic_catalog(size: int, seed: int = 0):
+    rnd = random.Random(seed)
+    components = []
+    for i in range(size):
+        # Требования только «назад» по индексу — граф без циклов
+        requires = [f"plugin_{j}" for j in rnd.sample(range(i), min(i, 3))]
+        conflicts = [f"plugin_{rnd.randrange(size)}"] if rnd.random() < 0.05 else []
+        components.append(Component(
+            name=f"plugin_{i}", description="", templates="",
+            requires=requires, conflicts_with=conflicts, required=i < 5,
+        ))
+    return components
+
+
+def legacy_validate(components, selected):
+    """Прежняя логика BotangoConfig.validate_component_selection."""
+    def by_name(name):
+        for component in components:
+            if component.name == name:
+                return component
+        return None
+
+    errors = []
+    found = [c for c in map(by_name, selected) if c]
+    for component in found:
+        if not component.validate_compatibility(selected):
+            errors.append(component.name)
+    for component in [c for c in components if c.required]:
+        if component.name not in selected:
+            errors.append(component.name)
+    return errors
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--selected", type=int, default=2_000)
+    parser.add_argument("--legacy", type=int, default=1_000, help="размер выбора для старого пути")
+    args = parser.parse_args()
+
+    components = synthetic_catalog(args.size)
+    selected = [f"plugin_{i}" for i in random.Random(1).sample(range(args.size), args.selected)]
+
+    registry, build_ms = timed(ComponentRegistry, components)
+    errors, validate_ms = timed(registry.validate, selected)
+    print(f"каталог: {args.size}, выбрано: {args.selected}, циклов: {len(registry.cycles)}")
+    print(f"построение индекса: {build_ms:8.1f} ms")
+    print(f"валидация:          {validate_ms:8.1f} ms ({len(errors)} ошибок)")
+
+    if args.legacy:
+        _, legacy_ms = timed(legacy_validate, components, selected[:args.legacy])
+        _, new_ms = timed(registry.validate, selected[:args.legacy])
+        print(f"прежний путь, {args.legacy} выбранных: {legacy_ms:8.1f} ms против {new_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
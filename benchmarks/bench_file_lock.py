@@ -0,0 +1,61 @@
+"""
+Пропускная способность изменений project_file.toml под межпроцессной блокировкой.
+
+N процессов одновременно добавляют свои значения через TomlCreator.add_value;
+печатается общее число операций в секунду для каждого N.
+
+Запуск:
+    python benchmarks/bench_file_lock.py --ops 50 --procs 1 2 4 8
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+WORKER = """
+import sys
+from botango.core.toml_creator import TomlCreator
+worker, count = int(sys.argv[1]), int(sys.argv[2])
+creator = TomlCreator("project_file.toml")
+for i in range(count):
+    creator.add_value("handlers", f"w{worker}_h{i}")
+"""
+
+
+def run(procs: int, ops: int) -> float:
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"))
+    with tempfile.TemporaryDirectory() as cwd:
+        started = time.perf_counter()
+        children = [
+            subprocess.Popen([sys.executable, "-c", WORKER, str(w), str(ops)], cwd=cwd, env=env)
+            for w in range(procs)
+        ]
+        if any(child.wait() != 0 for child in children):
+            raise RuntimeError("процесс завершился с ошибкой")
+        elapsed = time.perf_counter() - started
+
+        sys.path.insert(0, str(ROOT / "src"))
+        from botango.core.toml_creator import TomlCreator
+
+        written = len(TomlCreator(str(Path(cwd) / "project_file.toml")).read()["handlers"]["class"])
+        if written != procs * ops:
+            raise RuntimeError(f"потеряны обновления: {written} из {procs * ops}")
+    return procs * ops / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=50, help="операций на процесс")
+    parser.add_argument("--procs", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    for procs in args.procs:
+        print(f"{procs:>3} процессов: {run(procs, args.ops):8.0f} ops/s (включая запуск процессов)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Холодный старт бота с большим числом модулей хендлеров.
+
+Во временном каталоге генерируется проект с --modules модулями хендлеров
+(в каждом --handlers хендлеров команд и один callback_query), индекс
+роутеров строится так же, как в botango newbot. Затем в отдельных
+процессах измеряется:
+- start — import bot.main и create_dispatcher(), из них dispatcher —
+  только create_dispatcher() (подключение хендлеров, без импорта aiogram);
+- first — первый апдейт /cmd, который загружает один модуль;
+- ready — всё вместе, от запуска интерпретатора (без учёта кеша .pyc
+  при первом прогоне: берётся минимум из --repeat).
+
+Режимы: lazy (по умолчанию) и prewarm (HANDLERS_PREWARM=1 — все модули
+при старте, как прежний handlers/__init__.py с прямыми импортами).
+
+Запуск:
+    python benchmarks/bench_handlers_startup.py --modules 500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from botango.core.router_index import index_handlers  # noqa: E402
+from botango.core.structures.structures.bot_structure import BotStructure  # noqa: E402
+
+PROBE = '''
+import asyncio, json, time
+started = time.perf_counter()
+from aiogram import Bot
+from aiogram.types import Update
+from bot.main import create_dispatcher
+from bot.middlewares import ConcurrencyLimitMiddleware
+imported = time.perf_counter()
+dp = create_dispatcher(ConcurrencyLimitMiddleware(64))
+start = time.perf_counter() - started
+dispatcher = time.perf_counter() - imported
+
+bot = Bot("42:bench")
+update = Update.model_validate({{"update_id": 1, "message": {{
+    "message_id": 1, "date": 0, "text": "/m{target}_0",
+    "chat": {{"id": 1, "type": "private"}},
+}}}}, context={{"bot": bot}})
+began = time.perf_counter()
+assert asyncio.run(dp.feed_update(bot, update)) == "m{target}_0"
+first = time.perf_counter() - began
+print(json.dumps({{"start": start, "dispatcher": dispatcher, "first": first}}))
+'''
+
+
+def handler_module(index: int, handlers: int) -> str:
+    lines = [
+        "from aiogram import F, Router",
+        "from aiogram.filters import Command",
+        "from aiogram.types import CallbackQuery, Message",
+        "",
+        f"m{index}_router = Router()",
+    ]
+    for n in range(handlers):
+        lines += [
+            "",
+            "",
+            f'@m{index}_router.message(Command("m{index}_{n}"))',
+            f"async def command_{n}(message: Message) -> str:",
+            f'    return "m{index}_{n}"',
+        ]
+    lines += [
+        "",
+        "",
+        f'@m{index}_router.callback_query(F.data.startswith("m{index}:"))',
+        "async def pressed(callback: CallbackQuery) -> None:",
+        "    await callback.answer()",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def generate_project(root: Path, modules: int, handlers: int) -> None:
+    names = [f"m{i}" for i in range(modules)]
+    directory = root / "bot" / "handlers"
+    directory.mkdir(parents=True)
+    for i, name in enumerate(names):
+        (directory / f"{name}.py").write_text(handler_module(i, handlers), encoding="utf-8")
+    routers = index_handlers(directory, names)
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        BotStructure().build_project(data={
+            "BOT_TOKEN": "42:bench",
+            "handlers": {"class": names},
+            "routers": {name: info.pack() for name, info in routers.items()},
+        })
+    finally:
+        os.chdir(cwd)
+    (root / "data").mkdir(exist_ok=True)
+    (root / "data" / ".env").write_text("BOT_TOKEN=42:bench\n", encoding="utf-8")
+
+
+def probe(root: Path, prewarm: bool, target: int) -> dict:
+    env = dict(os.environ, HANDLERS_PREWARM="1" if prewarm else "0")
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(target=target)],
+        cwd=root, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["ready"] = time.perf_counter() - started
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", type=int, default=500)
+    parser.add_argument("--handlers", type=int, default=5, help="хендлеров команд в модуле")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        started = time.perf_counter()
+        generate_project(root, args.modules, args.handlers)
+        print(f"modules={args.modules} handlers={args.handlers} "
+              f"(генерация и индекс: {(time.perf_counter() - started) * 1000:.0f} ms)")
+        print(f"{'mode':<8} {'start, ms':>10} {'dispatcher':>10} {'first, ms':>10} {'ready, ms':>10}")
+        target = args.modules // 2
+        for label, prewarm in (("prewarm", True), ("lazy", False)):
+            runs = [probe(root, prewarm, target) for _ in range(args.repeat)]
+            best = {key: min(run[key] for run in runs) * 1000 for key in runs[0]}
+            print(f"{label:<8} {best['start']:>10.1f} {best['dispatcher']:>10.1f} "
+                  f"{best['first']:>10.2f} {best['ready']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
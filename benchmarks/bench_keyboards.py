@@ -0,0 +1,119 @@
+"""
+Стоимость клавиатуры в исходящем сообщении.
+
+Во временном каталоге генерируется проект с компонентом keyboards:
+статическая клавиатура menu (3 ряда по 2 кнопки) и клавиатура product
+с параметром. Сравнивается подготовка запроса sendMessage
+(SendMessage + build_form_data сессии бота) на одно сообщение:
+- builder  — клавиатура собирается в хендлере через InlineKeyboardBuilder,
+             сериализуется стандартной сессией aiogram;
+- static   — та же константа MENU, но стандартная сессия aiogram
+             (объект не создаётся, JSON считается каждый раз);
+- prebuilt — константа MENU и сессия сгенерированного main.py
+             (JSON клавиатуры посчитан при импорте);
+- product  — product(id) из LRU-кеша для --ids разных товаров.
+
+Запуск:
+    python benchmarks/bench_keyboards.py --messages 20000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from botango.core.keyboards import compile_keyboards  # noqa: E402
+from botango.core.structures.structures.bot_structure import BotStructure  # noqa: E402
+
+LABELS = [("Профиль", "profile"), ("Заказы", "orders"), ("Корзина", "cart"),
+          ("Настройки", "settings"), ("Помощь", "help"), ("О боте", "about")]
+ROWS = [[{"text": text, "callback": data} for text, data in LABELS[i:i + 2]] for i in range(0, 6, 2)]
+
+
+def generate_project(root: Path) -> None:
+    specs = compile_keyboards({
+        "menu": {"rows": ROWS},
+        "product": {
+            "params": ["product_id:int"],
+            "rows": [[{"text": "Купить", "callback": "buy", "args": ["product_id"]}],
+                     [{"text": "Назад", "callback": "profile"}]],
+        },
+    })
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        BotStructure().build_project(data={
+            "BOT_TOKEN": "42:bench",
+            "handlers": {"class": []},
+            "components": {"class": ["base", "handlers", "keyboards"]},
+            "keyboard_specs": specs,
+        })
+    finally:
+        os.chdir(cwd)
+    (root / "data").mkdir(exist_ok=True)
+    (root / "data" / ".env").write_text("BOT_TOKEN=42:bench\n", encoding="utf-8")
+
+
+def measure(messages: int, prepare) -> float:
+    started = time.perf_counter()
+    for i in range(messages):
+        prepare(i)
+    return (time.perf_counter() - started) / messages * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--ids", type=int, default=100, help="разных товаров для product(id)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        generate_project(root)
+        sys.path.insert(0, str(root))
+        os.environ["ENV_PATH"] = str(root / "data" / ".env")
+
+        from aiogram.client.session.aiohttp import AiohttpSession
+        from aiogram.methods import SendMessage
+        from aiogram.utils.keyboard import InlineKeyboardBuilder
+        from bot.keyboards import MENU, product
+        from bot.main import create_bot
+
+        bot = create_bot()
+        plain = AiohttpSession()
+
+        def builder(i):
+            kb = InlineKeyboardBuilder()
+            for text, data in LABELS:
+                kb.button(text=text, callback_data=data)
+            kb.adjust(2)
+            plain.build_form_data(bot, SendMessage(chat_id=1, text="menu", reply_markup=kb.as_markup()))
+
+        def static(i):
+            plain.build_form_data(bot, SendMessage(chat_id=1, text="menu", reply_markup=MENU))
+
+        def prebuilt(i):
+            bot.session.build_form_data(bot, SendMessage(chat_id=1, text="menu", reply_markup=MENU))
+
+        def cached(i):
+            markup = product(i % args.ids)
+            bot.session.build_form_data(bot, SendMessage(chat_id=1, text="product", reply_markup=markup))
+
+        def bare(i):
+            bot.session.build_form_data(bot, SendMessage(chat_id=1, text="menu"))
+
+        results = {}
+        for label, prepare in (("без клав.", bare), ("builder", builder), ("static", static), ("prebuilt", prebuilt), ("product", cached)):
+            results[label] = min(measure(args.messages, prepare) for _ in range(args.repeat))
+
+    for label, us in results.items():
+        print(f"{label:<10} {us:8.2f} µs/message")
+    print(f"builder / prebuilt: {results['builder'] / results['prebuilt']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Цена сгенерированных метрик на один апдейт.
+
+Шаблоны bot/metrics/registry.py и middleware.py отрисовываются во временный
+пакет. Через Dispatcher.feed_update прогоняются одинаковые апдейты с
+пустым хендлером: без метрик, с пустыми middleware в тех же местах
+(цена самого механизма middleware aiogram) и с setup_metrics(dp).
+
+Запуск:
+    python benchmarks/bench_metrics.py --updates 50000
+"""
+import argparse
+import asyncio
+import importlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from aiogram import BaseMiddleware, Bot, Dispatcher, Router  # noqa: E402
+from aiogram.types import Update  # noqa: E402
+
+from botango.core.structures.template import Template  # noqa: E402
+
+PACKAGE = "bench_metrics_pkg"
+
+
+def load_metrics(directory: Path):
+    package = directory / PACKAGE
+    package.mkdir()
+    (package / "__init__.py").write_text("", encoding="utf-8")
+    for name in ("registry.py", "middleware.py"):
+        template = Template(base_directory="bot/metrics", target_file=name)
+        (package / name).write_text(template.render({"name_project": "bot"}), encoding="utf-8")
+    sys.path.insert(0, str(directory))
+    return importlib.import_module(f"{PACKAGE}.middleware"), importlib.import_module(f"{PACKAGE}.registry")
+
+
+class NoopMiddleware(BaseMiddleware):
+    async def __call__(self, handler, event, data):
+        return await handler(event, data)
+
+
+def setup_noop(dp: Dispatcher) -> None:
+    dp.update.outer_middleware(NoopMiddleware())
+    noop = NoopMiddleware()
+    for name, observer in dp.observers.items():
+        if name not in ("update", "error"):
+            observer.middleware(noop)
+
+
+def make_dispatcher(setup) -> Dispatcher:
+    router = Router(name="bench")
+
+    @router.message()
+    async def handle(message) -> None:
+        return None
+
+    dp = Dispatcher()
+    if setup:
+        setup(dp)
+    dp.include_router(router)
+    return dp
+
+
+async def run(dp: Dispatcher, bot: Bot, updates) -> float:
+    started = time.perf_counter()
+    for update in updates:
+        await dp.feed_update(bot, update)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--updates", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)  # aiogram логирует каждый апдейт
+
+    with tempfile.TemporaryDirectory() as tmp:
+        middleware, registry = load_metrics(Path(tmp))
+        bot = Bot("42:bench")
+        updates = [
+            Update.model_validate({"update_id": i, "message": {
+                "message_id": i, "date": 0, "text": "hi", "chat": {"id": i % 100, "type": "private"},
+            }}, context={"bot": bot})
+            for i in range(args.updates)
+        ]
+
+        results = {}
+        configs = (("без метрик", None), ("пустые mw", setup_noop), ("с метриками", middleware.setup_metrics))
+        for label, setup in configs:
+            dp = make_dispatcher(setup)
+            results[label] = min(asyncio.run(run(dp, bot, updates)) for _ in range(args.repeat))
+
+        started = time.perf_counter()
+        size = len(registry.registry.render())
+        render_ms = (time.perf_counter() - started) * 1000
+
+    per_update = {label: seconds / args.updates * 1e6 for label, seconds in results.items()}
+    for label, us in per_update.items():
+        print(f"{label:<12} {us:8.2f} µs/update")
+    print(f"добавочно    {per_update['с метриками'] - per_update['без метрик']:8.2f} µs/update "
+          f"(из них сами метрики {per_update['с метриками'] - per_update['пустые mw']:.2f})")
+    print(f"/metrics: {size} байт за {render_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
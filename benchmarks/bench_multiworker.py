@@ -0,0 +1,216 @@
+"""
+Нагрузочный прогон сгенерированного webhook-режима multiworker.
+
+Для каждого числа обработчиков:
+1. во временном каталоге генерируется проект с webhook и хендлером echo,
+   который выполняет --work итераций sha256 (CPU-нагрузка) и отвечает
+   sendMessage;
+2. поднимается локальный фейковый Bot API (TELEGRAM_API_URL), он
+   принимает ответы бота и фиксирует время;
+3. python -m bot.multiworker получает --updates синтетических апдейтов
+   от --chats чатов (не больше --concurrency запросов одновременно).
+
+Печатает апдейтов в секунду, p50/p99 задержки «апдейт отправлен — ответ
+бота получен» и проверяет, что ответы в каждом чате пришли по порядку.
+
+Запуск:
+    python benchmarks/bench_multiworker.py --workers 1 2 4 --updates 5000 --work 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from aiohttp import ClientSession, web  # noqa: E402
+
+from botango.core.structures.structures.bot_structure import BotStructure  # noqa: E402
+
+SECRET = "bench-secret"
+
+ECHO_HANDLER = '''
+import hashlib
+
+from aiogram import Router
+from aiogram.types import Message
+
+echo_router = Router()
+
+
+@echo_router.message()
+async def echo(message: Message) -> None:
+    digest = message.text.encode()
+    for _ in range({work}):
+        digest = hashlib.sha256(digest).digest()
+    await message.answer(message.text)
+'''
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def generate_project(root: Path, workers: int, work: int, webhook_port: int, api_port: int) -> None:
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        BotStructure().build_project(data={
+            "BOT_TOKEN": "42:bench",
+            "WEBHOOK_URL": "http://127.0.0.1",
+            "WEBHOOK_PATH": "/webhook",
+            "WEBHOOK_SECRET": SECRET,
+            "handlers": {"class": ["echo"]},
+        })
+    finally:
+        os.chdir(cwd)
+    (root / "bot" / "handlers" / "echo.py").write_text(ECHO_HANDLER.format(work=work), encoding="utf-8")
+    (root / "data").mkdir(exist_ok=True)
+    (root / "data" / ".env").write_text(
+        "\n".join([
+            "BOT_TOKEN=42:bench",
+            "WEBHOOK_URL=http://127.0.0.1",
+            "WEBHOOK_PATH=/webhook",
+            f"WEBHOOK_SECRET={SECRET}",
+            "WEBHOOK_HOST=127.0.0.1",
+            f"WEBHOOK_PORT={webhook_port}",
+            f"WEBHOOK_WORKERS={workers}",
+            f"TELEGRAM_API_URL=http://127.0.0.1:{api_port}",
+        ]) + "\n",
+        encoding="utf-8",
+    )
+
+
+class FakeBotAPI:
+    """Принимает запросы бота; sendMessage отмечает время ответа на апдейт."""
+
+    def __init__(self):
+        self.answered = {}
+        self.order = defaultdict(list)
+        self.done = asyncio.Event()
+        self.expected = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        if method.lower() != "sendmessage":
+            return web.json_response({"ok": True, "result": True})
+        form = await request.post()
+        update_id, chat_id = int(form["text"]), int(form["chat_id"])
+        self.answered[update_id] = time.perf_counter()
+        self.order[chat_id].append(update_id)
+        if len(self.answered) >= self.expected:
+            self.done.set()
+        return web.json_response({"ok": True, "result": {
+            "message_id": update_id, "date": 0,
+            "chat": {"id": chat_id, "type": "private"}, "text": form["text"],
+        }})
+
+
+def make_update(update_id: int, chat_id: int) -> bytes:
+    return json.dumps({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id, "date": 0, "text": str(update_id),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "bench"},
+        },
+    }).encode()
+
+
+async def wait_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"порт {port} не открылся за {timeout} с")
+
+
+async def run_once(args, workers: int) -> dict:
+    webhook_port, api_port = free_port(), free_port()
+    api = FakeBotAPI()
+    api.expected = args.updates
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", api.handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", api_port).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        generate_project(root, workers, args.work, webhook_port, api_port)
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "bot.multiworker"], cwd=root,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        try:
+            await wait_port(webhook_port)
+            url = f"http://127.0.0.1:{webhook_port}/webhook"
+            headers = {"X-Telegram-Bot-Api-Secret-Token": SECRET, "Content-Type": "application/json"}
+            sent = {}
+            queue = iter(range(1, args.updates + 1))
+
+            async with ClientSession() as session:
+                async def client():
+                    for update_id in queue:
+                        sent[update_id] = time.perf_counter()
+                        body = make_update(update_id, update_id % args.chats + 1)
+                        async with session.post(url, data=body, headers=headers) as resp:
+                            assert resp.status == 200, resp.status
+
+                started = time.perf_counter()
+                await asyncio.gather(*(client() for _ in range(args.concurrency)))
+                await asyncio.wait_for(api.done.wait(), args.timeout)
+                elapsed = max(api.answered.values()) - started
+        finally:
+            proc.send_signal(signal.SIGINT)
+            try:
+                proc.wait(30)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+            await runner.cleanup()
+
+    latencies = sorted(api.answered[i] - sent[i] for i in sent)
+    ordered = all(ids == sorted(ids) for ids in api.order.values())
+    return {
+        "workers": workers,
+        "rate": args.updates / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "ordered": ordered,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--chats", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--work", type=int, default=2000, help="итераций sha256 в хендлере")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    print(f"updates={args.updates} chats={args.chats} concurrency={args.concurrency} work={args.work}")
+    print(f"{'workers':>7} {'updates/s':>10} {'p50, ms':>9} {'p99, ms':>9} {'order':>6}")
+    for workers in args.workers:
+        r = asyncio.run(run_once(args, workers))
+        print(f"{r['workers']:>7} {r['rate']:>10.0f} {r['p50']:>9.1f} {r['p99']:>9.1f} "
+              f"{'ok' if r['ordered'] else 'BROKEN':>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Сборка проекта в архив: через временный каталог и напрямую в синк.
+
+Режимы (проектов в секунду, все компоненты включены):
+- disk+tar — как раньше у сервиса выдачи: build_project во временный
+  каталог (mkstemp + replace на каждый файл), затем tar.gz этого каталога;
+- tar.gz / zip — build_project(sink=TarSink/ZipSink) в BytesIO, без диска;
+- memory — build_project(sink=MemorySink), только отрисовка.
+
+Запуск:
+    python benchmarks/bench_output_sinks.py --projects 50
+"""
+import argparse
+import io
+import os
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from botango.core.output_sinks import MemorySink, TarSink, ZipSink  # noqa: E402
+from botango.core.structures.structures.bot_structure import BotStructure  # noqa: E402
+
+DATA = {
+    "BOT_TOKEN": "42:bench",
+    "DB_NAME": "bench.db",
+    "REDIS_HOST": "localhost",
+    "THROTTLE_BURST": "5",
+    "METRICS_PORT": "9100",
+    "TASKS_CONCURRENCY": "8",
+    "BROADCAST_RATE": "25",
+    "WEBHOOK_URL": "https://example.com",
+    "handlers": {"class": ["start", "help"]},
+    "components": {"class": ["base", "handlers", "aiosqlite", "services", "keyboards", "tasks"]},
+}
+
+
+def via_disk(workers: int) -> int:
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            BotStructure().build_project(data=DATA, workers=workers, force=True)
+        finally:
+            os.chdir(cwd)
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+            tar.add(tmp, arcname="bot")
+    return buffer.tell()
+
+
+def via_tar(workers: int) -> int:
+    buffer = io.BytesIO()
+    with TarSink(buffer, prefix="bot") as sink:
+        BotStructure().build_project(data=DATA, workers=workers, sink=sink)
+    return buffer.tell()
+
+
+def via_zip(workers: int) -> int:
+    buffer = io.BytesIO()
+    with ZipSink(buffer, prefix="bot") as sink:
+        BotStructure().build_project(data=DATA, workers=workers, sink=sink)
+    return buffer.tell()
+
+
+def via_memory(workers: int) -> int:
+    sink = MemorySink()
+    BotStructure().build_project(data=DATA, workers=workers, sink=sink)
+    return sum(map(len, sink.files.values()))
+
+
+MODES = {"disk+tar": via_disk, "tar.gz": via_tar, "zip": via_zip, "memory": via_memory}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=1, help="потоков отрисовки на проект")
+    args = parser.parse_args()
+
+    for build in MODES.values():
+        build(args.workers)  # прогрев: компиляция шаблонов
+    print(f"projects={args.projects} workers={args.workers}")
+    print(f"{'mode':<10} {'projects/s':>11} {'ms/project':>11} {'size, KB':>9}")
+    for label, build in MODES.items():
+        started = time.perf_counter()
+        for _ in range(args.projects):
+            size = build(args.workers)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<10} {args.projects / elapsed:>11.1f} {elapsed / args.projects * 1000:>11.2f} {size / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+Набор бенчмарков botango на синтетических входных данных разного размера.
+
+Случаи (size — размер входа):
+- build_project        — полная сборка схемы из size шаблонов на диск (force=True);
+- build_project.noop   — повторная инкрементальная сборка той же схемы (всё пропущено);
+- toml.mutate          — TomlCreator.add_value/delete_value (по очереди, размер файла
+                         не меняется) в project_file.toml из size значений;
+- toml.session         — 50 add_value и 50 delete_value в одной TomlSession;
+- env.add / env.load   — EnvCreator.add / EnvCreator.load на .env из size переменных;
+- validate_selection   — BotangoConfig.validate_component_selection: каталог из size
+                         плагинов (с построением индекса), выбрано size // 5;
+- resolve_selection    — ComponentResolver.resolve: компонент требует size возможностей
+                         по 3 провайдера, первый из которых конфликтует с концом очереди.
+
+Каждый случай готовится в отдельном временном каталоге (подготовка не
+замеряется) и выполняется один раз для прогрева. Затем снимается --repeat
+замеров; в каждом функция вызывается столько раз, чтобы замер длился не
+меньше --min-time (как в timeit), — быстрые случаи меньше шумят.
+Результаты сохраняются в JSON; compare сравнивает два файла и завершается
+с кодом 1, если какой-то случай медленнее базового больше чем на --threshold.
+
+Запуск:
+    python benchmarks/bench_suite.py run --output base.json
+    python benchmarks/bench_suite.py run --output new.json --filter toml --max-size 1000
+    python benchmarks/bench_suite.py compare base.json new.json --threshold 0.1
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from jinja2 import FileSystemLoader  # noqa: E402
+
+from botango.core.component_registry import ComponentRegistry  # noqa: E402
+from botango.core.component_resolver import ComponentResolver  # noqa: E402
+from botango.core.project_config import BotangoConfig, Component  # noqa: E402
+from botango.core.structures.env_configuration import EnvCreator, TasksEnv  # noqa: E402
+from botango.core.structures.structures.base_structure import BaseStructure  # noqa: E402
+from botango.core.structures.template import Template, make_environment  # noqa: E402
+from botango.core.toml_creator import TomlCreator  # noqa: E402
+
+Setup = Callable[[Path, int], Callable[[], object]]
+
+# имя случая -> (размеры, подготовка); подготовка возвращает замеряемую функцию
+CASES: Dict[str, Tuple[Tuple[int, ...], Setup]] = {}
+
+SYNTHETIC = """# {{ name_project }}/module_@INDEX@.py
+{% for item in handlers.get("class", []) %}
+from .{{ item }} import {{ item }}_router
+{% endfor %}
+{% if DB_NAME %}DB = "{{ DB_NAME }}"{% else %}DB = None{% endif %}
+{% for key, value in (settings or {}).items() %}
+{{ key }} = {{ value | tojson }}
+{% endfor %}
+"""
+
+DATA = {
+    "BOT_TOKEN": "42:bench",
+    "DB_NAME": "bench.db",
+    "handlers": {"class": ["start", "help", "catalog"]},
+    "settings": {f"OPTION_{i}": i for i in range(20)},
+}
+
+
+def case(name: str, sizes: Tuple[int, ...]) -> Callable[[Setup], Setup]:
+    def register(setup: Setup) -> Setup:
+        CASES[name] = (sizes, setup)
+        return setup
+    return register
+
+
+def synthetic_structure(root: Path, size: int) -> BaseStructure:
+    """Схема из size шаблонов в root/templates; каждый десятый — с условием when."""
+    templates = root / "templates" / "bench"
+    templates.mkdir(parents=True)
+    for i in range(size):
+        (templates / f"module_{i}.py.j2").write_text(SYNTHETIC.replace("@INDEX@", str(i)), encoding="utf-8")
+    # Те же настройки, что у среды botango (в том числе размер кеша шаблонов), но свой каталог
+    Template._environment = make_environment(bytecode_cache=False).overlay(loader=FileSystemLoader(root / "templates"))
+    Template._conditions = {}
+
+    class SyntheticStructure(BaseStructure):
+        name = "bench"
+        schema = [
+            Template(base_directory="bench", target_file=f"module_{i}.py", when="DB_NAME" if i % 10 == 0 else None)
+            for i in range(size)
+        ]
+
+    return SyntheticStructure()
+
+
+@case("build_project", (10, 100, 1000, 10000))
+def build_full(root: Path, size: int):
+    structure = synthetic_structure(root, size)
+    return lambda: structure.build_project(data=DATA, force=True)
+
+
+@case("build_project.noop", (10, 100, 1000, 10000))
+def build_noop(root: Path, size: int):
+    structure = synthetic_structure(root, size)
+    structure.build_project(data=DATA)
+    return lambda: structure.build_project(data=DATA)
+
+
+def large_toml(size: int) -> TomlCreator:
+    creator = TomlCreator("project_file.toml")
+    per_section = 50
+    creator.write({
+        f"section_{s}": {"class": [f"value_{s}_{i}" for i in range(per_section)]}
+        for s in range(max(1, size // per_section))
+    })
+    return creator
+
+
+@case("toml.mutate", (100, 1000, 10000, 100000))
+def toml_mutate(root: Path, size: int):
+    creator = large_toml(size)
+    added = False
+
+    def run():
+        nonlocal added
+        if added:
+            creator.delete_value("section_0", "new")
+        else:
+            creator.add_value("section_0", "new")
+        added = not added
+    return run
+
+
+@case("toml.session", (100, 1000, 10000, 100000))
+def toml_session(root: Path, size: int):
+    creator = large_toml(size)
+
+    def run():
+        with creator.session() as session:
+            for i in range(50):
+                session.add_value("section_0", f"new_{i}")
+            for i in range(50):
+                session.delete_value("section_0", f"new_{i}")
+    return run
+
+
+def large_env(size: int) -> None:
+    EnvCreator.path.parent.mkdir(parents=True, exist_ok=True)
+    rows = [f"VARIABLE_{i}=value_{i}\n" for i in range(size)]
+    EnvCreator.path.write_text("BOT_TOKEN=42:bench\n" + "".join(rows), encoding="utf-8")
+
+
+@case("env.add", (100, 1000, 10000, 100000))
+def env_add(root: Path, size: int):
+    large_env(size)
+    return lambda: EnvCreator.add(TasksEnv())
+
+
+@case("env.load", (100, 1000, 10000, 100000))
+def env_load(root: Path, size: int):
+    large_env(size)
+    return EnvCreator.load
+
+
+@case("validate_selection", (100, 1000, 10000))
+def validate_selection(root: Path, size: int):
+    rnd = random.Random(size)
+    plugins = []
+    for i in range(size):
+        # Требования только «назад» по индексу — граф без циклов
+        requires = [f"plugin_{j}" for j in rnd.sample(range(i), min(i, 3))]
+        conflicts = [f"plugin_{rnd.randrange(size)}"] if rnd.random() < 0.05 else []
+        plugins.append(Component(name=f"plugin_{i}", description="", templates="",
+                                 requires=requires, conflicts_with=conflicts))
+    selected = ["base", "handlers"] + [f"plugin_{i}" for i in rnd.sample(range(size), size // 5)]
+
+    def run():
+        # Новый конфиг на каждый запуск — как в CLI, вместе с построением индекса
+        return BotangoConfig(plugin_components=plugins).validate_component_selection(selected)
+    return run
+
+
+@case("resolve_selection", (10, 100, 1000))
+def resolve_selection(root: Path, size: int):
+    components = [
+        Component(name="root", description="", templates="",
+                  requires=[f"cap_{i}" for i in range(size)] + ["late"]),
+        Component(name="late", description="", templates=""),
+    ]
+    for i in range(size):
+        components += [
+            Component(name=f"provider_{i}_{j}", description="", templates="", provides=[f"cap_{i}"],
+                      conflicts_with=["late"] if j == 0 else [])
+            for j in range(3)
+        ]
+    registry = ComponentRegistry(components)
+    # Новый резолвер на каждый запуск — без кеша результатов
+    return lambda: ComponentResolver(registry).resolve(["root"])
+
+
+def measure(setup: Setup, size: int, repeat: int, min_time: float = 0.05) -> List[float]:
+    """Время одного вызова (с) в каждом из repeat замеров."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            fn = setup(Path(tmp), size)
+            started = time.perf_counter()
+            fn()  # прогрев
+            loops = max(1, int(min_time / max(time.perf_counter() - started, 1e-9)))
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                for _ in range(loops):
+                    fn()
+                timings.append((time.perf_counter() - started) / loops)
+            return timings
+        finally:
+            os.chdir(cwd)
+            Template._environment = None
+            Template._conditions = {}
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def run(args) -> None:
+    pattern = re.compile(args.filter) if args.filter else None
+    results = {}
+    print(f"{'case':<32} {'median, ms':>11} {'min, ms':>9} {'stdev, ms':>10}")
+    for name, (sizes, setup) in CASES.items():
+        if pattern and not pattern.search(name):
+            continue
+        for size in sizes:
+            if args.max_size and size > args.max_size:
+                continue
+            timings = measure(setup, size, args.repeat, args.min_time)
+            key = f"{name}[{size}]"
+            results[key] = {
+                "median": statistics.median(timings),
+                "min": min(timings),
+                "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+                "runs": timings,
+            }
+            r = results[key]
+            print(f"{key:<32} {r['median'] * 1000:>11.3f} {r['min'] * 1000:>9.3f} {r['stdev'] * 1000:>10.3f}")
+    output = Path(args.output)
+    output.write_text(json.dumps({"meta": metadata() | {"repeat": args.repeat, "min_time": args.min_time}, "results": results}, indent=2),
+                      encoding="utf-8")
+    print(f"Результаты: {output}")
+
+
+def compare(args) -> int:
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+    print(f"base: {base['meta'].get('commit')}  new: {new['meta'].get('commit')}  threshold: {args.threshold:.0%}")
+    print(f"{'case':<32} {'base, ms':>10} {'new, ms':>10} {'change':>8}")
+    regressions = []
+    for key in sorted(base["results"].keys() & new["results"].keys()):
+        old, cur = base["results"][key], new["results"][key]
+        change = cur["median"] / old["median"] - 1
+        # Регрессия — если медленнее и медиана, и лучший запуск: единичный выброс не в счёт
+        slower = change > args.threshold and cur["min"] / old["min"] - 1 > args.threshold
+        mark = "  REGRESSION" if slower else ("  faster" if change < -args.threshold else "")
+        if slower:
+            regressions.append(key)
+        print(f"{key:<32} {old['median'] * 1000:>10.3f} {cur['median'] * 1000:>10.3f} {change:>+8.1%}{mark}")
+    for key in sorted(base["results"].keys() ^ new["results"].keys()):
+        print(f"{key:<32} есть только в {'base' if key in base['results'] else 'new'}")
+    if regressions:
+        print(f"Регрессии ({len(regressions)}): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="выполнить бенчмарки и сохранить JSON")
+    run_parser.add_argument("--output", "-o", default="bench-results.json")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--min-time", type=float, default=0.05, help="минимальная длительность замера, с")
+    run_parser.add_argument("--filter", "-k", help="регулярное выражение по имени случая")
+    run_parser.add_argument("--max-size", type=int, help="пропустить входы больше этого размера")
+
+    compare_parser = commands.add_parser("compare", help="сравнить два файла результатов")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="допустимое замедление (0.1 = 10%%)")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
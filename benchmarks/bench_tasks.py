@@ -0,0 +1,137 @@
+"""
+Пропускная способность очереди фоновых задач (компонент tasks).
+
+Во временных каталогах генерируются два проекта: с очередью в SQLite
+(aiosqlite) и в Redis (fakeredis, в памяти процесса). Для каждого:
+- enqueue — задержка постановки одной задачи из «хендлера»
+  (p50/p99, мс): столько добавляется ко времени ответа на апдейт;
+- drain — --jobs пустых задач разбираются Worker с --concurrency
+  слотами, задач в секунду;
+- sleep — то же для задач с await asyncio.sleep(--sleep) — видно,
+  что ожидание внешнего API не занимает обработчик.
+
+Запуск:
+    python benchmarks/bench_tasks.py --jobs 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from botango.core.structures.structures.bot_structure import BotStructure  # noqa: E402
+
+PROJECTS = {
+    "sqlite": {"DB_NAME": "bench.db", "components": {"class": ["base", "handlers", "aiosqlite", "tasks"]}},
+    "fakeredis": {"REDIS_HOST": "localhost", "components": {"class": ["base", "handlers", "redis", "tasks"]}},
+}
+
+
+def load_project(root: Path, data: dict) -> None:
+    """Генерирует проект в root и делает его пакет bot импортируемым."""
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        BotStructure().build_project(data={
+            "BOT_TOKEN": "42:bench", "TASKS_CONCURRENCY": "8", "handlers": {"class": []},
+        } | data)
+    finally:
+        os.chdir(cwd)
+    (root / "data").mkdir(exist_ok=True)
+    (root / "data" / ".env").write_text(f"BOT_TOKEN=42:bench\nDB_NAME={data.get('DB_NAME', '')}\n", encoding="utf-8")
+    for name in list(sys.modules):
+        if name.split(".")[0] in ("bot", "settings"):
+            del sys.modules[name]
+    os.environ["ENV_PATH"] = str(root / "data" / ".env")
+    sys.path.insert(0, str(root))
+
+
+def create_backend(label: str):
+    if label == "sqlite":
+        from bot.database import engine, session_pool
+        from bot.tasks.backends import SqlBackend
+        return SqlBackend(engine, session_pool, key_ttl=60)
+    import fakeredis
+
+    from bot.tasks.backends import RedisBackend
+    return RedisBackend(fakeredis.FakeAsyncRedis(), prefix="bench:tasks", key_ttl=60)
+
+
+async def drain(queue, worker_cls, jobs: int, concurrency: int) -> float:
+    """Задач в секунду: разбор jobs уже поставленных задач."""
+    worker = worker_cls(queue, concurrency=concurrency, poll_interval=0.05)
+    started = time.perf_counter()
+    await worker.start()
+    while worker.processed < jobs:
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - started
+    await worker.stop(5)
+    return jobs / elapsed
+
+
+async def measure(label: str, jobs: int, concurrency: int, sleep: float) -> dict:
+    from bot.tasks import TaskQueue, Worker
+
+    backend = create_backend(label)
+    await backend.setup()
+    queue = TaskQueue(backend)
+
+    @queue.task()
+    async def noop(n: int) -> None:
+        pass
+
+    @queue.task()
+    async def external_call(n: int) -> None:
+        await asyncio.sleep(sleep)
+
+    latencies = []
+    for n in range(jobs):
+        started = time.perf_counter()
+        await noop.enqueue(n)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    result = {
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99)] * 1000,
+        "drain": await drain(queue, Worker, jobs, concurrency),
+    }
+    for n in range(jobs):
+        await external_call.enqueue(n)
+    result["sleep"] = await drain(queue, Worker, jobs, concurrency)
+    if label == "sqlite":
+        from bot.database import engine
+        await engine.dispose()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--sleep", type=float, default=0.05, help="длительность «внешнего вызова», с")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"jobs={args.jobs} concurrency={args.concurrency} sleep={args.sleep}")
+    print(f"{'backend':<10} {'enqueue p50, ms':>16} {'p99, ms':>8} {'drain, jobs/s':>14} {'sleep, jobs/s':>14}")
+    for label, data in PROJECTS.items():
+        runs = []
+        for _ in range(args.repeat):
+            with tempfile.TemporaryDirectory() as tmp:
+                load_project(Path(tmp), data)
+                runs.append(asyncio.run(measure(label, args.jobs, args.concurrency, args.sleep)))
+                sys.path.remove(tmp)
+        p50 = statistics.median(run["p50"] for run in runs)
+        p99 = statistics.median(run["p99"] for run in runs)
+        drained = max(run["drain"] for run in runs)
+        slept = max(run["sleep"] for run in runs)
+        print(f"{label:<10} {p50:>16.3f} {p99:>8.3f} {drained:>14.0f} {slept:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
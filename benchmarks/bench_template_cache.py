@@ -0,0 +1,101 @@
+"""
+Бенчмарк холодного старта: компиляция шаблонов с дисковым кешем байткода и без него.
+
+Каждый замер выполняется в новом процессе, как при запуске CLI.
+Помимо шаблонов botango используется синтетический набор из --synthetic
+шаблонов, чтобы разница была заметна на больших схемах.
+
+Запуск:
+    python benchmarks/bench_template_cache.py --runs 5 --synthetic 300
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+TEMPLATES = ROOT / "src" / "botango" / "templates"
+
+CHILD = """
+import sys, time
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+directory, cache_dir = sys.argv[1], sys.argv[2]
+started = time.perf_counter()
+env = Environment(
+    loader=FileSystemLoader(directory),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    bytecode_cache=FileSystemBytecodeCache(cache_dir) if cache_dir else None,
+)
+for name in env.list_templates(extensions=["j2"]):
+    env.get_template(name)
+print(time.perf_counter() - started)
+"""
+
+SYNTHETIC = """# {{ name_project }}/module_@INDEX@.py
+{% for item in handlers.get("class", []) %}
+from .{{ item }} import {{ item }}_router
+{% endfor %}
+{% if DB_NAME %}DB = "{{ DB_NAME }}"{% else %}DB = None{% endif %}
+{% macro row(key, value) -%}{{ key }} = {{ value | tojson }}{%- endmacro %}
+{% for key, value in (settings or {}).items() %}{{ row(key, value) }}
+{% endfor %}
+"""
+
+
+def make_synthetic(directory: Path, count: int) -> None:
+    for i in range(count):
+        source = SYNTHETIC.replace("@INDEX@", str(i))
+        (directory / f"module_{i}.py.j2").write_text(source, encoding="utf-8")
+
+
+def measure(directory: Path, cache_dir: str, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD, str(directory), cache_dir],
+            check=True, capture_output=True, text=True,
+        )
+        timings.append(float(out.stdout))
+    return timings
+
+
+def bench(directory: Path, runs: int) -> dict:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        no_cache = measure(directory, "", runs)
+        measure(directory, cache_dir, 1)            # прогрев кеша
+        with_cache = measure(directory, cache_dir, runs)
+    return {
+        "no_cache_ms": statistics.median(no_cache) * 1000,
+        "cache_ms": statistics.median(with_cache) * 1000,
+        "speedup": statistics.median(no_cache) / statistics.median(with_cache),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--synthetic", type=int, default=300)
+    args = parser.parse_args()
+
+    results = {"botango": bench(TEMPLATES, args.runs)}
+    if args.synthetic:
+        with tempfile.TemporaryDirectory() as directory:
+            make_synthetic(Path(directory), args.synthetic)
+            results[f"synthetic_{args.synthetic}"] = bench(Path(directory), args.runs)
+
+    for name, result in results.items():
+        print(
+            f"{name:>16}: без кеша {result['no_cache_ms']:8.1f} ms, "
+            f"с кешем {result['cache_ms']:8.1f} ms, x{result['speedup']:.2f}"
+        )
+    if os.getenv("BENCH_JSON"):
+        Path(os.environ["BENCH_JSON"]).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Накладные расходы сгенерированного ThrottlingMiddleware на один апдейт.
+
+Шаблон bot/middlewares/throttling.py отрисовывается во временный каталог
+и импортируется. Сравниваются:
+- вызов хендлера напрямую (базовая линия);
+- тот же вызов через ThrottlingMiddleware с MemoryThrottleStorage;
+- только MemoryThrottleStorage.consume_nowait.
+
+Апдейты приходят от --users пользователей по закону Ципфа (немногие
+активные пишут часто), размер хранилища ограничен --max-size.
+
+Запуск:
+    python benchmarks/bench_throttling.py --updates 200000 --users 50000 --max-size 10000
+"""
+import argparse
+import asyncio
+import importlib.util
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from botango.core.structures.template import Template  # noqa: E402
+
+
+def load_throttling(directory: Path):
+    template = Template(base_directory="bot/middlewares", target_file="throttling.py")
+    module_path = directory / "throttling.py"
+    module_path.write_text(template.render({"name_project": "bot"}), encoding="utf-8")
+    spec = importlib.util.spec_from_file_location("bench_throttling_module", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeUser:
+    __slots__ = ("id",)
+
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+
+def make_stream(updates: int, users: int, seed: int = 0):
+    rnd = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(users)]
+    ids = rnd.choices(range(users), weights=weights, k=updates)
+    return [{"event_from_user": FakeUser(user_id)} for user_id in ids]
+
+
+async def handler(event, data):
+    return None
+
+
+async def run_direct(stream) -> float:
+    started = time.perf_counter()
+    for data in stream:
+        await handler(None, data)
+    return time.perf_counter() - started
+
+
+async def run_middleware(middleware, stream) -> float:
+    started = time.perf_counter()
+    for data in stream:
+        await middleware(handler, None, data)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--updates", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--max-size", type=int, default=10_000)
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--period", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        throttling = load_throttling(Path(tmp))
+
+    stream = make_stream(args.updates, args.users)
+
+    def storage():
+        return throttling.MemoryThrottleStorage(args.burst, args.period, args.max_size)
+
+    direct = asyncio.run(run_direct(stream))
+    middleware = throttling.ThrottlingMiddleware(storage())
+    wrapped = asyncio.run(run_middleware(middleware, stream))
+
+    bare = storage()
+    started = time.perf_counter()
+    for data in stream:
+        bare.consume_nowait(data["event_from_user"].id)
+    consume = time.perf_counter() - started
+
+    per_update = lambda seconds: seconds / args.updates * 1e9  # noqa: E731
+    print(f"updates={args.updates} users={args.users} max_size={args.max_size}")
+    print(f"handler directly:          {per_update(direct):8.0f} ns/update")
+    print(f"through middleware:        {per_update(wrapped):8.0f} ns/update")
+    print(f"middleware overhead:       {per_update(wrapped - direct):8.0f} ns/update")
+    print(f"consume_nowait only:       {per_update(consume):8.0f} ns/update")
+    print(f"throttled: {middleware.throttled}, buckets kept: {len(middleware.storage)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Задержка botango watch: от сохранения файла до пересобранного проекта.
+
+Во временном каталоге генерируется проект (aiosqlite, redis, tasks, keyboards).
+Затем --repeat раз меняется:
+- handlers — в project_file.toml добавляется хендлер;
+- REDIS_HOST — значение в data/.env.
+Для каждого изменения:
+- apply — LiveBuilder.apply (перечитать данные, индекс, сборка затронутых целей), мс;
+- latency — от записи файла до конца сборки в цикле run_watch с inotify
+  (или опросом, --poll) и debounce --debounce мс;
+- full — то, что делал newbot: полная сборка схемы (force=True), мс.
+
+Запуск:
+    python benchmarks/bench_watch.py --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from click.testing import CliRunner  # noqa: E402
+
+from botango.cli import cli  # noqa: E402
+from botango.core.structures.structures.bot_structure import BotStructure  # noqa: E402
+from botango.core.toml_creator import TomlCreator  # noqa: E402
+from botango.core.watch import LiveBuilder, open_watcher, run_watch  # noqa: E402
+
+
+def change_handlers(n: int) -> None:
+    TomlCreator("project_file.toml").add_value("handlers", f"h{n}")
+
+
+def change_redis(n: int) -> None:
+    env = Path("data/.env")
+    rows = [f"REDIS_HOST=redis-{n}" if row.startswith("REDIS_HOST=") else row
+            for row in env.read_text(encoding="utf-8").splitlines()]
+    env.write_text("\n".join(rows) + "\n", encoding="utf-8")
+
+
+CHANGES = {"handlers": change_handlers, "REDIS_HOST": change_redis}
+
+
+def measure(change, repeat: int, poll, debounce: float) -> dict:
+    builder = LiveBuilder()
+    apply_ms, full_ms = [], []
+    for n in range(repeat):
+        change(n)
+        update = builder.apply([Path("project_file.toml"), Path("data/.env")])
+        apply_ms.append(update.elapsed * 1000)
+        started = time.perf_counter()
+        BotStructure().build_project(data=builder.data, force=True)
+        full_ms.append((time.perf_counter() - started) * 1000)
+
+    watcher = open_watcher(builder.files, builder.directories, poll)
+    done, stop = threading.Event(), threading.Event()
+    thread = threading.Thread(target=run_watch, args=(builder, watcher), kwargs={
+        "debounce": debounce, "stop": stop, "on_update": lambda update: update.report and done.set(),
+    })
+    thread.start()
+    latency_ms = []
+    try:
+        for n in range(repeat, 2 * repeat):
+            done.clear()
+            started = time.perf_counter()
+            change(n)
+            done.wait(10)
+            latency_ms.append((time.perf_counter() - started) * 1000)
+    finally:
+        stop.set()
+        thread.join()
+        watcher.close()
+    return {
+        "apply": statistics.median(apply_ms),
+        "latency": statistics.median(latency_ms),
+        "full": statistics.median(full_ms),
+        "watcher": type(watcher).__name__,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--poll", type=float, default=None, help="интервал опроса вместо inotify, с")
+    parser.add_argument("--debounce", type=float, default=50, help="мс")
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            CliRunner().invoke(cli, ["newbot", "-c", "aiosqlite", "-c", "redis", "-c", "tasks", "-c", "keyboards"])
+            print(f"repeat={args.repeat} debounce={args.debounce} ms")
+            print(f"{'change':<11} {'apply, ms':>10} {'latency, ms':>12} {'full, ms':>9}  watcher")
+            for label, change in CHANGES.items():
+                r = measure(change, args.repeat, args.poll, args.debounce / 1000)
+                print(f"{label:<11} {r['apply']:>10.2f} {r['latency']:>12.2f} {r['full']:>9.2f}  {r['watcher']}")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
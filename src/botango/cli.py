@@ -1,35 +1,124 @@
+import importlib
 import logging
+import os
 import sys
-from collections import defaultdict
+import time
 from pathlib import Path
+from typing import Dict, Tuple
 
 import click
 
 from .cli_commands import Commands
-from .core.structures.env_configuration import EnvCreator, AiosqliteEnv, PostgresEnv, CryptoBotEnv
-from .core.structures.structures.bot_structure import BotStructure
-from .core.toml_creator import TomlCreator
-
-ENV = EnvCreator()
-Toml = TomlCreator("project_file.toml")
-logging.basicConfig(level=logging.INFO, stream=sys.stdout)
-
-DEFAULT_DIRS = {
-        "handlers": {"class": []},
-    }
-
-@click.group()
-def cli():
-    pass
-
-@cli.command()
-def newbot():
-    Toml.rewrite(DEFAULT_DIRS)
-    ENV.add(AiosqliteEnv())
-    ENV.add(PostgresEnv())
-    ENV.add(CryptoBotEnv())
-    bot_struc = BotStructure()
-    bot_struc.build_project(data=ENV.load() | Toml.read())
+from .core import tracing
+from .core.template_cache import NO_CACHE_ENV
+
+# Подкоманды: имя -> ("модуль:объект", краткая справка).
+# Модули импортируются только при вызове команды, поэтому `botango --help`
+# не загружает pydantic, jinja2 и шаблоны проекта.
+LAZY_COMMANDS: Dict[str, Tuple[str, str]] = {
+    Commands.newbot: ("botango.commands.newbot:newbot", "Создать новый проект бота."),
+    Commands.cache: ("botango.commands.cache:cache", "Управление кешем скомпилированных шаблонов."),
+    Commands.lock: ("botango.commands.lock:lock", "Разрешить зависимости проекта в uv.lock."),
+    Commands.batch: ("botango.commands.batch:batch", "Сгенерировать проекты по манифесту batch.toml."),
+    Commands.watch: ("botango.commands.watch:watch", "Пересобирать проект при изменении .env, project_file.toml и шаблонов."),
+}
+
+
+class LazyGroup(click.Group):
+    """Группа click, которая импортирует подкоманды по требованию."""
+
+    def __init__(self, *args, lazy_commands: Dict[str, Tuple[str, str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+        # Модуль -> (начало, длительность) импорта; подкоманда загружается
+        # до вызова группы, поэтому --trace добавляет эти интервалы задним числом
+        self.import_times: Dict[str, Tuple[float, float]] = {}
+
+    def list_commands(self, ctx: click.Context):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx: click.Context, cmd_name: str):
+        if cmd_name in self.lazy_commands:
+            return self._load(cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def _load(self, cmd_name: str) -> click.Command:
+        import_path, _ = self.lazy_commands[cmd_name]
+        module_name, attr = import_path.split(":")
+        started = time.perf_counter()
+        command = getattr(importlib.import_module(module_name), attr)
+        self.import_times[module_name] = (started, time.perf_counter() - started)
+        if not isinstance(command, click.Command):
+            raise TypeError(f"{import_path} не является командой click")
+        return command
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter):
+        """Справка по командам без импорта их модулей."""
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in self.lazy_commands:
+                rows.append((name, self.lazy_commands[name][1]))
+            else:
+                command = super().get_command(ctx, name)
+                if command is not None and not command.hidden:
+                    rows.append((name, command.get_short_help_str()))
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
+
+
+def _start_profile(ctx: click.Context, path: Path) -> None:
+    import cProfile
+
+    profiler = cProfile.Profile()
+
+    def finish():
+        profiler.disable()
+        profiler.dump_stats(path)
+        logging.info("Профиль cProfile: %s (python -m pstats %s)", path, path)
+
+    ctx.call_on_close(finish)
+    profiler.enable()
+
+
+def _start_trace(ctx: click.Context, path: Path) -> None:
+    tracer = tracing.enable()
+    for module, (started, elapsed) in ctx.command.import_times.items():
+        tracer.add("import", "import", started, elapsed, {"module": module})
+
+    def finish():
+        tracing.disable()
+        tracer.dump(path)
+        logging.info("Трасса: %s (chrome://tracing или https://ui.perfetto.dev)", path)
+        for name, count, elapsed in tracer.summary():
+            logging.info("  %-24s %5d  %9.2f ms", name, count, elapsed * 1000)
+
+    ctx.call_on_close(finish)
+
+
+@click.group(cls=LazyGroup, lazy_commands=LAZY_COMMANDS)
+@click.option(
+    "--no-cache", is_flag=True, envvar=NO_CACHE_ENV,
+    help="Не использовать дисковый кеш скомпилированных шаблонов.",
+)
+@click.option(
+    "--profile", type=click.Path(dir_okay=False, path_type=Path), metavar="FILE",
+    help="Записать профиль cProfile команды в FILE (pstats, snakeviz).",
+)
+@click.option(
+    "--trace", type=click.Path(dir_okay=False, path_type=Path), metavar="FILE",
+    help="Записать хронологию фаз в FILE (JSON для chrome://tracing / Perfetto) и вывести сводку.",
+)
+@click.pass_context
+def cli(ctx, no_cache, profile, trace):
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    if no_cache:
+        # Среда Jinja2 создаётся лениво и прочитает флаг при первом обращении
+        os.environ[NO_CACHE_ENV] = "1"
+    if trace:
+        _start_trace(ctx, trace)
+    if profile:
+        _start_profile(ctx, profile)
 
 
 #     """Команда для работы с ботами"""
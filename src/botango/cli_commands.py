@@ -5,4 +5,8 @@ from dataclasses import dataclass
 class Commands:
     newbot: str = "newbot"
     add: str = "add"
-    help: str = "help"
\ No newline at end of file
+    help: str = "help"
+    cache: str = "cache"
+    lock: str = "lock"
+    batch: str = "batch"
+    watch: str = "watch"
@@ -0,0 +1,46 @@
+import logging
+import os
+import time
+from pathlib import Path
+
+import click
+import toml
+from pydantic import ValidationError
+
+from botango.core.batch import BatchManifest, BatchReport, run_batch
+
+
+@click.command()
+@click.argument("manifest_path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--workers", "-w", type=click.IntRange(min=1), default=None,
+    help="Процессов сборки (по умолчанию — число CPU; 1 — без пула).",
+)
+def batch(manifest_path, workers):
+    """Сгенерировать проекты по манифесту batch.toml."""
+    try:
+        manifest = BatchManifest.load(manifest_path)
+    except (toml.TomlDecodeError, ValidationError) as e:
+        raise click.UsageError(f"Некорректный манифест {manifest_path}: {e}")
+    duplicates = manifest.duplicates()
+    if duplicates:
+        raise click.UsageError(f"Повторяющиеся имена проектов: {', '.join(duplicates)}")
+
+    report = BatchReport(workers=workers or os.cpu_count() or 1)
+    started = time.perf_counter()
+    for result in run_batch(manifest, base_dir=manifest_path.parent, workers=workers):
+        report.results.append(result)
+        if result.ok:
+            logging.info("%s: %d файлов -> %s (%.1f ms)", result.name, result.files, result.output, result.elapsed * 1000)
+        else:
+            logging.error("%s: %s", result.name, result.error)
+    report.elapsed = time.perf_counter() - started
+
+    logging.info(
+        "Собрано %d из %d проектов за %.2f s (%.1f проектов/с)",
+        len(report.results) - len(report.failed), len(report.results), report.elapsed, report.projects_per_second,
+    )
+    if report.failed:
+        raise click.ClickException(
+            "Не собраны: " + ", ".join(result.name for result in report.failed)
+        )
@@ -0,0 +1,22 @@
+import click
+
+from botango.core.template_cache import bytecode_cache_dir, clear_cache
+
+
+@click.group()
+def cache():
+    """Управление кешем скомпилированных шаблонов и результатов uv lock."""
+
+
+@cache.command("clear")
+@click.option("--locks", is_flag=True, help="Удалить также закешированные результаты uv lock.")
+def cache_clear(locks: bool):
+    """Удалить кеш скомпилированных шаблонов (с --locks — и результатов uv lock)."""
+    removed = clear_cache(locks=locks)
+    click.echo(f"Удалено файлов кеша: {removed}")
+
+
+@cache.command("dir")
+def cache_dir():
+    """Показать каталог кеша текущей версии."""
+    click.echo(bytecode_cache_dir())
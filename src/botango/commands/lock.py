@@ -0,0 +1,31 @@
+import logging
+from pathlib import Path
+
+import click
+
+from botango.core.dependency_lock import DependencyLocker, LockError
+
+
+@click.command()
+@click.option(
+    "--find-links", "-f", multiple=True,
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Локальный каталог с колёсами (можно указать несколько раз).",
+)
+@click.option("--offline", is_flag=True, help="Не обращаться к индексу пакетов и сети.")
+@click.option("--no-lock-cache", is_flag=True, help="Не использовать кеш разрешённых lock-файлов.")
+@click.option(
+    "--project-dir", type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=Path("."), show_default=True, help="Каталог сгенерированного проекта.",
+)
+def lock(find_links, offline, no_lock_cache, project_dir):
+    """Разрешить зависимости проекта в uv.lock."""
+    locker = DependencyLocker(find_links=find_links, offline=offline, use_cache=not no_lock_cache)
+    try:
+        result = locker.lock(project_dir)
+    except LockError as e:
+        raise click.ClickException(str(e))
+    logging.info(
+        "%s %s за %.1f ms", result.path, "взят из кеша" if result.cached else "создан",
+        result.elapsed * 1000,
+    )
@@ -0,0 +1,84 @@
+import logging
+from pathlib import Path
+
+import click
+
+from botango.core.keyboards import KeyboardSpecError, compile_keyboards
+from botango.core.project_config import DATABASE_KINDS, ResolutionError, config
+from botango.core.requirements import RequirementConflictError, split_requirements
+from botango.core.router_index import index_handlers
+from botango.core.structures.env_configuration import (
+    COMPONENT_ENVS, EnvCreator, CryptoBotEnv, HttpEnv, DatabaseEnv, HandlersEnv,
+)
+from botango.core.structures.structures.bot_structure import BotStructure
+from botango.core.toml_creator import TomlCreator
+
+DEFAULT_DIRS = {
+        "handlers": {"class": []},
+    }
+
+@click.command()
+@click.option(
+    "--component", "-c", "components", multiple=True, metavar="NAME",
+    help="Компонент проекта (можно указать несколько раз); "
+         "зависимости и провайдер базы данных подбираются автоматически.",
+)
+@click.option(
+    "--workers", "-w", type=click.IntRange(min=1), default=None,
+    help="Количество потоков для отрисовки шаблонов (1 — последовательно).",
+)
+@click.option("--force", is_flag=True, help="Пересобрать все файлы, игнорируя манифест сборки.")
+def newbot(components, workers, force):
+    """Создать новый проект бота."""
+    try:
+        resolved = config.resolve_selection(list(components))
+        requirements = config.get_requirements(resolved)
+    except ResolutionError as e:
+        raise click.UsageError("\n".join(e.reasons))
+    except RequirementConflictError as e:
+        raise click.UsageError(str(e))
+
+    env = EnvCreator()
+    toml_file = TomlCreator("project_file.toml")
+    with toml_file.session() as s:
+        # Уже добавленные хендлеры сохраняются при пересборке
+        s.rewrite(DEFAULT_DIRS, prefer_new=False)
+        s.rewrite({"components": {"class": resolved}})
+        if "keyboards" in resolved:
+            s.rewrite({"keyboards": {"class": []}}, prefer_new=False)
+
+    # Только переменные выбранных компонентов: шаблоны решают по components, а не по .env
+    for name in resolved:
+        if name in COMPONENT_ENVS:
+            env.add(COMPONENT_ENVS[name]())
+    env.add(CryptoBotEnv())
+    env.add(HttpEnv())
+    env.add(HandlersEnv())
+    if any(name in DATABASE_KINDS for name in resolved):
+        env.add(DatabaseEnv())
+
+    project = toml_file.read()
+    try:
+        keyboard_specs = compile_keyboards(project.get("keyboards", {}))
+    except KeyboardSpecError as e:
+        raise click.UsageError("\n".join(e.reasons))
+    # Индекс роутеров для ленивой загрузки модулей хендлеров
+    routers = index_handlers(
+        Path(BotStructure.name) / "handlers", project.get("handlers", {}).get("class", [])
+    )
+
+    bot_struc = BotStructure()
+    report = bot_struc.build_project(
+        data=env.load() | project | {
+            **split_requirements(requirements),
+            "routers": {name: info.pack() for name, info in routers.items()},
+            "keyboard_specs": keyboard_specs,
+        },
+        workers=workers,
+        force=force,
+    )
+    logging.info("Компоненты: %s", ", ".join(resolved))
+    logging.info(
+        "Записано: %d, без изменений: %d, удалено: %d (%.1f ms)",
+        report.written, len(report.skipped), len(report.removed), report.elapsed * 1000,
+    )
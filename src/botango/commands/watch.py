@@ -0,0 +1,48 @@
+import logging
+
+import click
+
+from botango.core.watch import PROJECT_FILE, LiveBuilder, WatchUpdate, open_watcher, run_watch
+
+
+def _log_update(update: WatchUpdate) -> None:
+    changes = sorted(update.keys) + sorted(update.templates)
+    if update.report is None:
+        logging.info("%s: пересобирать нечего (%.1f ms)", ", ".join(changes) or "без изменений", update.elapsed * 1000)
+        return
+    unchanged = set(update.report.unchanged)
+    written = [r.target.as_posix() for r in update.report.results if r.target not in unchanged]
+    written += [f"-{path.as_posix()}" for path in update.report.removed]
+    logging.info(
+        "%s: %s (%.1f ms)", ", ".join(changes),
+        ", ".join(written) or "файлы не изменились", update.elapsed * 1000,
+    )
+
+
+@click.command()
+@click.option(
+    "--poll", type=click.FloatRange(min=0.01), default=None, metavar="SECONDS",
+    help="Опрашивать файлы с этим интервалом вместо inotify (сетевые ФС, Docker-тома).",
+)
+@click.option(
+    "--debounce", type=click.FloatRange(min=0), default=50, show_default=True,
+    help="Сколько миллисекунд ждать тишины, прежде чем пересобирать пачку изменений.",
+)
+def watch(poll, debounce):
+    """Пересобирать проект при изменении .env, project_file.toml и шаблонов."""
+    if not PROJECT_FILE.exists():
+        raise click.UsageError(f"{PROJECT_FILE} не найден — сначала выполните botango newbot")
+    builder = LiveBuilder()
+    report = builder.build_all()
+    logging.info(
+        "Начальная сборка: записано %d, без изменений %d (%.1f ms)",
+        report.written, len(report.skipped) + len(report.unchanged), report.elapsed * 1000,
+    )
+    watcher = open_watcher(builder.files, builder.directories, poll)
+    logging.info("Слежу за изменениями (%s), Ctrl+C — выход", type(watcher).__name__)
+    try:
+        run_watch(builder, watcher, debounce=debounce / 1000, on_update=_log_update)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
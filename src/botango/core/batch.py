@@ -0,0 +1,204 @@
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import toml
+from pydantic import BaseModel, Field
+
+from botango.core.keyboards import compile_keyboards
+from botango.core.output_sinks import DiskSink, open_sink
+from botango.core.project_config import DATABASE_KINDS, config
+from botango.core.requirements import split_requirements
+from botango.core.router_index import index_handlers
+from botango.core.structures.env_configuration import (
+    COMPONENT_ENVS, ENV_PATH, BotEnv, CryptoBotEnv, DatabaseEnv, EnvCreator, HandlersEnv, HttpEnv,
+)
+from botango.core.structures.structures.bot_structure import BotStructure
+from botango.core.structures.template import Template
+from botango.core.toml_creator import _InlineTableEncoder
+
+logger = logging.getLogger(__name__)
+
+PROJECT_FILE = Path("project_file.toml")
+
+
+class ProjectSpec(BaseModel):
+    """Проект в манифесте batch: то, что newbot берёт из аргументов, .env и project_file.toml."""
+
+    name: str
+    components: List[str] = []
+    handlers: Optional[List[str]] = None
+    env: Dict[str, Any] = {}
+    keyboards: Dict[str, Any] = {}
+    # Каталог или архив (.tar.gz, .zip); по умолчанию — output манифеста
+    output: Optional[str] = None
+
+
+class BatchDefaults(BaseModel):
+    """Общие значения для всех проектов: компоненты и env объединяются с проектными."""
+
+    components: List[str] = []
+    handlers: List[str] = []
+    env: Dict[str, Any] = {}
+    keyboards: Dict[str, Any] = {}
+
+
+class BatchManifest(BaseModel):
+    """
+    Манифест botango batch:
+
+        output = "build/{name}"          # или "dist/{name}.tar.gz"
+
+        [defaults]
+        components = ["aiosqlite"]
+        env = {BOT_TOKEN = "change-me"}
+
+        [[project]]
+        name = "shop"
+        components = ["keyboards", "tasks"]
+        handlers = ["start", "catalog"]
+        env = {DB_NAME = "shop.db"}
+
+    Относительные пути output считаются от каталога манифеста.
+    """
+
+    output: str = "build/{name}"
+    defaults: BatchDefaults = BatchDefaults()
+    projects: List[ProjectSpec] = Field(default_factory=list, alias="project")
+
+    @classmethod
+    def load(cls, path: Path) -> "BatchManifest":
+        return cls.model_validate(toml.loads(Path(path).read_text(encoding="utf-8")))
+
+    def duplicates(self) -> List[str]:
+        names = [spec.name for spec in self.projects]
+        return sorted({name for name in names if names.count(name) > 1})
+
+
+@dataclass(frozen=True)
+class ProjectResult:
+    name: str
+    output: str
+    files: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchReport:
+    workers: int
+    elapsed: float = 0.0
+    results: List[ProjectResult] = field(default_factory=list)
+
+    @property
+    def failed(self) -> List[ProjectResult]:
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def projects_per_second(self) -> float:
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+
+
+def project_env(resolved: List[str], overrides: Dict[str, Any]) -> Dict[str, str]:
+    """Содержимое .env проекта — то же, что собирает newbot, но в памяти."""
+    data: Dict[str, Any] = BotEnv().model_dump(exclude={"name"})
+    models = [COMPONENT_ENVS[name]() for name in resolved if name in COMPONENT_ENVS]
+    for model in models + [CryptoBotEnv(), HttpEnv(), HandlersEnv()]:
+        EnvCreator.merge(data, model)
+    if any(name in DATABASE_KINDS for name in resolved):
+        EnvCreator.merge(data, DatabaseEnv())
+    data.update(overrides)
+    return {key: str(value) for key, value in data.items()}
+
+
+def build_one(spec: ProjectSpec, defaults: BatchDefaults, output: str) -> ProjectResult:
+    """
+    Собирает один проект в output: шаблоны, data/.env и project_file.toml.
+    Ошибки проекта возвращаются в результате и не прерывают пакет.
+    """
+    started = time.perf_counter()
+    try:
+        resolved = config.resolve_selection(list(dict.fromkeys(defaults.components + spec.components)))
+        requirements = config.get_requirements(resolved)
+        env = project_env(resolved, defaults.env | spec.env)
+        handlers = spec.handlers if spec.handlers is not None else defaults.handlers
+        project: Dict[str, Dict[str, Any]] = {
+            "handlers": {"class": list(handlers)},
+            "components": {"class": resolved},
+        }
+        if "keyboards" in resolved:
+            project["keyboards"] = {"class": []} | defaults.keyboards | spec.keyboards
+        keyboard_specs = compile_keyboards(project.get("keyboards", {}))
+
+        with open_sink(output) as sink:
+            # Уже написанные хендлеры есть только в каталоге; для архива индекс консервативный
+            existing = sink.path(Path(BotStructure.name) / "handlers") if isinstance(sink, DiskSink) else None
+            routers = index_handlers(existing, handlers)
+            report = BotStructure().build_project(
+                data=env | project | {
+                    **split_requirements(requirements),
+                    "routers": {name: info.pack() for name, info in routers.items()},
+                    "keyboard_specs": keyboard_specs,
+                },
+                workers=1,
+                sink=sink,
+            )
+            sink.prepare([ENV_PATH, PROJECT_FILE])
+            sink.write(ENV_PATH, [f"{key}={value}\n" for key, value in env.items()])
+            sink.write(PROJECT_FILE, [toml.dumps(project, encoder=_InlineTableEncoder())])
+    except Exception as e:
+        logger.debug("Проект %s не собран", spec.name, exc_info=True)
+        return ProjectResult(spec.name, output, elapsed=time.perf_counter() - started, error=f"{type(e).__name__}: {e}")
+    return ProjectResult(spec.name, output, files=report.files + 2, elapsed=time.perf_counter() - started)
+
+
+def warm_up() -> None:
+    """
+    Компилирует все шаблоны и условия when и строит индекс компонентов.
+    Вызывается в родительском процессе до создания пула: при fork дочерние
+    процессы получают готовую среду Jinja2 и реестр без повторной работы.
+    """
+    environment = Template.environment
+    for template in BotStructure.schema:
+        environment.get_template(template.template_name)
+        template.enabled({})
+    _ = config.registry
+
+
+def _build(job: tuple) -> ProjectResult:
+    return build_one(*job)
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def run_batch(manifest: BatchManifest, base_dir: Path = Path("."), workers: Optional[int] = None) -> Iterator[ProjectResult]:
+    """
+    Собирает проекты манифеста в пуле процессов (workers=1 — в текущем
+    процессе) и отдаёт результаты по мере готовности, в порядке манифеста.
+    """
+    jobs = []
+    for spec in manifest.projects:
+        output = spec.output or manifest.output.format(name=spec.name)
+        jobs.append((spec, manifest.defaults, str(Path(base_dir) / output)))
+    warm_up()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        yield from map(_build, jobs)
+        return
+    # Несколько проектов на задачу пула — меньше накладных расходов на pickle/IPC
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(), initializer=warm_up) as executor:
+        yield from executor.map(_build, jobs, chunksize=chunksize)
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from jinja2 import meta
+
+from botango.core.structures.env_configuration import DATA_PATH
+from botango.core.structures.template import Template
+from botango.core.template_render import RenderResult
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_PATH = DATA_PATH / ".botango-manifest.json"
+MANIFEST_VERSION = 1
+
+# Запись манифеста: target -> сведения о последней сборке файла
+ManifestEntry = Dict[str, Any]
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class BuildManifest:
+    """
+    Манифест инкрементальной сборки.
+
+    Для каждого целевого файла хранит:
+    - хеш исходника .j2-шаблона;
+    - список переменных контекста, которые шаблон действительно использует
+      (jinja2.meta.find_undeclared_variables), и хеш их значений;
+    - хеш, размер и mtime записанного файла.
+
+    Если ни шаблон, ни используемые им переменные не изменились, а файл
+    на диске совпадает с записанным, цель пропускается и файл не трогается.
+    """
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = Path(path)
+        self.entries: Dict[str, ManifestEntry] = {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: Path = MANIFEST_PATH) -> "BuildManifest":
+        manifest = cls(path)
+        if not manifest.path.exists():
+            return manifest
+        try:
+            raw = json.loads(manifest.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            logger.warning("Манифест %s повреждён — выполняю полную сборку", manifest.path)
+            return manifest
+        if raw.get("version") == MANIFEST_VERSION:
+            manifest.entries = raw.get("targets", {})
+        return manifest
+
+    def save(self) -> None:
+        """Атомарно записывает манифест, если он изменился."""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": MANIFEST_VERSION, "targets": self.entries}
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.path.parent))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_path, str(self.path))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._dirty = False
+
+    # --- вычисление входов ---
+
+    def _variables(self, template: Template, source_hash: str) -> List[str]:
+        """Переменные шаблона; повторный разбор не нужен, пока исходник тот же."""
+        entry = self.entries.get(template.target_file.as_posix())
+        if entry and entry.get("source_hash") == source_hash:
+            return entry["variables"]
+        ast = template.environment.parse(template.source())
+        return sorted(meta.find_undeclared_variables(ast))
+
+    @staticmethod
+    def context_hash(variables: Iterable[str], data: Dict[str, Any]) -> str:
+        """Хеш только тех значений контекста, от которых зависит шаблон."""
+        subset = {name: data.get(name) for name in variables}
+        return _sha256(json.dumps(subset, sort_keys=True, ensure_ascii=False, default=str))
+
+    def inputs(self, template: Template, data: Dict[str, Any]) -> ManifestEntry:
+        source_hash = _sha256(template.source())
+        variables = self._variables(template, source_hash)
+        return {
+            "template": template.template_name,
+            "source_hash": source_hash,
+            "variables": variables,
+            "context_hash": self.context_hash(variables, template.data | data),
+        }
+
+    # --- планирование сборки ---
+
+    def is_fresh(self, target: Path, inputs: ManifestEntry) -> bool:
+        """True, если цель можно не пересобирать."""
+        entry = self.entries.get(target.as_posix())
+        if not entry:
+            return False
+        if any(entry.get(key) != value for key, value in inputs.items()):
+            return False
+        try:
+            stat = target.stat()
+        except FileNotFoundError:
+            return False
+        if stat.st_size == entry.get("size") and stat.st_mtime_ns == entry.get("mtime_ns"):
+            return True
+        # Метаданные изменились (например, touch) — сверяем содержимое
+        return _file_sha256(target) == entry.get("output_hash")
+
+    def plan(
+        self,
+        templates: Sequence[Template],
+        data: Dict[str, Any],
+        force: bool = False,
+    ) -> Tuple[List[Tuple[Template, ManifestEntry]], List[Path], List[str]]:
+        """
+        Делит схему на цели для отрисовки и пропускаемые.
+        Третий элемент — цели из манифеста, которых больше нет в схеме.
+        """
+        pending: List[Tuple[Template, ManifestEntry]] = []
+        skipped: List[Path] = []
+        for template in templates:
+            inputs = self.inputs(template, data)
+            if not force and self.is_fresh(template.target_file, inputs):
+                skipped.append(template.target_file)
+            else:
+                pending.append((template, inputs))
+        current = {t.target_file.as_posix() for t in templates}
+        stale = [target for target in self.entries if target not in current]
+        return pending, skipped, stale
+
+    # --- обновление манифеста ---
+
+    def record(self, inputs: ManifestEntry, result: RenderResult) -> None:
+        stat = result.target.stat()
+        self.entries[result.target.as_posix()] = {
+            **inputs,
+            "output_hash": result.digest,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        self._dirty = True
+
+    def remove(self, target: str) -> Optional[Path]:
+        """
+        Удаляет цель, исключённую из схемы, и опустевшие после этого каталоги.
+        Файл удаляется, только если его не меняли вручную после сборки.
+        """
+        entry = self.entries.pop(target)
+        self._dirty = True
+        path = Path(target)
+        if not path.exists():
+            return None
+        if _file_sha256(path) != entry.get("output_hash"):
+            logger.warning("Файл %s изменён вручную — оставляю без изменений", path)
+            return None
+        path.unlink()
+        for parent in path.parents[:-1]:
+            try:
+                parent.rmdir()
+            except OSError:
+                # Не пуст (или уже удалён) — выше тоже не пусто
+                break
+        return path
@@ -0,0 +1,155 @@
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from botango.core.project_config import Component
+
+
+class ComponentRegistry:
+    """
+    Индекс компонентов, построенный один раз.
+
+    Хранит словарь имя -> компонент, граф зависимостей —
+    requires (ориентированные рёбра) и conflicts_with (симметричные рёбра) —
+    и провайдеров абстрактных возможностей (provides, например "database").
+    Проверка выбора выполняется за O(выбранные + их рёбра), а не
+    линейным поиском по каталогу на каждое имя.
+    """
+
+    def __init__(self, components: Iterable["Component"]):
+        self.components: Dict[str, "Component"] = {}
+        self.requires: Dict[str, Tuple[str, ...]] = {}
+        self.conflicts: Dict[str, Set[str]] = {}
+        self.providers: Dict[str, List[str]] = {}
+        self.duplicates: List[str] = []
+
+        for component in components:
+            if component.name in self.components:
+                self.duplicates.append(component.name)
+                continue
+            self.components[component.name] = component
+            self.requires[component.name] = tuple(component.requires)
+            self.conflicts.setdefault(component.name, set())
+            for capability in component.provides:
+                self.providers.setdefault(capability, []).append(component.name)
+            for other in component.conflicts_with:
+                # Конфликт симметричен, даже если объявлен только с одной стороны
+                self.conflicts[component.name].add(other)
+                self.conflicts.setdefault(other, set()).add(component.name)
+
+        self.required: Tuple[str, ...] = tuple(
+            name for name, component in self.components.items() if component.required
+        )
+        self.cycles: List[List[str]] = self._find_cycles()
+        self._cycle_of: Dict[str, int] = {
+            name: i for i, cycle in enumerate(self.cycles) for name in cycle
+        }
+
+    def __len__(self) -> int:
+        return len(self.components)
+
+    def __iter__(self) -> Iterator["Component"]:
+        return iter(self.components.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.components
+
+    def get(self, name: str) -> Optional["Component"]:
+        return self.components.get(name)
+
+    def is_satisfied(self, requirement: str, selected: Iterable[str]) -> bool:
+        """Требование выполнено самим компонентом или любым провайдером возможности."""
+        if requirement in selected:
+            return True
+        return any(p in selected for p in self.providers.get(requirement, ()))
+
+    def _find_cycles(self) -> List[List[str]]:
+        """
+        Циклы в графе requires (алгоритм Тарьяна, итеративно — без рекурсии,
+        чтобы не упираться в лимит стека на больших каталогах).
+        Возвращает компоненты сильной связности из 2+ вершин и петли.
+        """
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        cycles: List[List[str]] = []
+        counter = 0
+
+        for root in self.components:
+            if root in index:
+                continue
+            work: List[Tuple[str, Iterator[str]]] = [(root, iter(self.requires[root]))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, edges = work[-1]
+                advanced = False
+                for nxt in edges:
+                    if nxt not in self.components:
+                        continue
+                    if nxt not in index:
+                        index[nxt] = low[nxt] = counter
+                        counter += 1
+                        stack.append(nxt)
+                        on_stack.add(nxt)
+                        work.append((nxt, iter(self.requires[nxt])))
+                        advanced = True
+                        break
+                    if nxt in on_stack:
+                        low[node] = min(low[node], index[nxt])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    scc = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        scc.append(member)
+                        if member == node:
+                            break
+                    if len(scc) > 1 or node in self.requires[node]:
+                        cycles.append(scc[::-1])
+        return cycles
+
+    def validate(self, selected_names: Iterable[str]) -> List[str]:
+        """
+        Проверяет выбор компонентов и возвращает сразу все ошибки:
+        неизвестные имена, неудовлетворённые требования, каждую пару
+        конфликтующих компонентов, циклы и невыбранные обязательные компоненты.
+        """
+        errors: List[str] = []
+        selected = dict.fromkeys(selected_names)
+        known: List[str] = []
+
+        for name in selected:
+            if name in self.components:
+                known.append(name)
+            else:
+                errors.append(f"Компонент '{name}' не найден")
+
+        reported_cycles: Set[int] = set()
+        for name in known:
+            for requirement in self.requires[name]:
+                if not self.is_satisfied(requirement, selected):
+                    errors.append(f"Компонент '{name}' требует '{requirement}', который не выбран")
+            for other in self.conflicts[name]:
+                # Каждую пару сообщаем один раз
+                if other in selected and (other not in self.components or name < other):
+                    errors.append(f"Компонент '{name}' конфликтует с '{other}'")
+            cycle = self._cycle_of.get(name)
+            if cycle is not None and cycle not in reported_cycles:
+                reported_cycles.add(cycle)
+                path = " -> ".join(self.cycles[cycle] + [self.cycles[cycle][0]])
+                errors.append(f"Циклическая зависимость компонентов: {path}")
+
+        for name in self.required:
+            if name not in selected:
+                errors.append(f"Обязательный компонент '{name}' не выбран")
+
+        return errors
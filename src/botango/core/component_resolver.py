@@ -0,0 +1,161 @@
+from collections import deque
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+from botango.core.component_registry import ComponentRegistry
+
+# Состояние перебора: (выбранные компоненты, ожидающие имена)
+State = Tuple[FrozenSet[str], FrozenSet[str]]
+
+
+class ResolutionError(ValueError):
+    """Выбор компонентов невозможно дополнить до согласованного набора."""
+
+    def __init__(self, reasons: List[str]):
+        self.reasons = list(dict.fromkeys(reasons))
+        super().__init__("; ".join(self.reasons))
+
+
+class ComponentResolver:
+    """
+    Дополняет частичный выбор компонентов до полного согласованного набора.
+
+    - транзитивно добавляет requires и обязательные компоненты каталога;
+    - для абстрактных требований ("database", "web") выбирает одного
+      провайдера; если подходящий уже выбран — новый не добавляется;
+    - учитывает conflicts_with: провайдер, чьи requires конфликтуют с уже
+      выбранным или с конкретными компонентами в очереди, не рассматривается.
+
+    Провайдер выбирается жадно — тот, что добавляет меньше всего новых
+    компонентов через свои requires (при равенстве — первый по порядку
+    каталога). К другим провайдерам резолвер возвращается только при
+    конфликте дальше по очереди, а состояния, из которых решения нет,
+    запоминаются: без конфликтов каждое требование раскрывается один раз,
+    а не по разу на каждую комбинацию провайдеров. Перебор итеративный
+    (без рекурсии), результат запоминается для каждого набора выбранных имён.
+    """
+
+    def __init__(self, registry: ComponentRegistry, cache_size: int = 1024):
+        self.registry = registry
+        self._resolve_cached = lru_cache(maxsize=cache_size)(self._resolve)
+        self._closures: Dict[str, FrozenSet[str]] = {}
+
+    def resolve(self, selected_names: Iterable[str]) -> List[str]:
+        """
+        Возвращает полный набор имён компонентов в порядке добавления
+        или выбрасывает ResolutionError с перечнем причин.
+        """
+        return list(self._resolve_cached(frozenset(selected_names)))
+
+    def _resolve(self, selected: FrozenSet[str]) -> Tuple[str, ...]:
+        unknown = [
+            name for name in sorted(selected)
+            if name not in self.registry and name not in self.registry.providers
+        ]
+        if unknown:
+            raise ResolutionError([f"Компонент '{name}' не найден" for name in unknown])
+
+        # Явно выбранные — в порядке каталога, затем обязательные
+        ordered = [c.name for c in self.registry if c.name in selected]
+        ordered += sorted(name for name in selected if name not in self.registry)
+        reasons: List[str] = []
+        result = self._expand(tuple(ordered) + self.registry.required, reasons)
+        if result is None:
+            raise ResolutionError(reasons)
+        return result
+
+    def _closure(self, name: str) -> FrozenSet[str]:
+        """Конкретные компоненты, которые name подтягивает через requires (без выбора провайдеров)."""
+        closure = self._closures.get(name)
+        if closure is None:
+            found = {name}
+            stack = [name]
+            while stack:
+                for requirement in self.registry.requires[stack.pop()]:
+                    if requirement in self.registry and requirement not in found:
+                        found.add(requirement)
+                        stack.append(requirement)
+            closure = self._closures[name] = frozenset(found)
+        return closure
+
+    def _candidates(self, providers: List[str], chosen: Dict[str, None], queue: Iterable[str]) -> List[str]:
+        """
+        Провайдеры без конфликтов с выбранным и с тем, что точно будет
+        выбрано (конкретные имена в очереди и их requires), — по возрастанию
+        числа новых компонентов.
+        """
+        conflicts = self.registry.conflicts
+        forced = set(chosen)
+        for name in queue:
+            if name in self.registry:
+                forced |= self._closure(name)
+        candidates = [
+            provider for provider in providers
+            if not any(c in forced for member in self._closure(provider) for c in conflicts[member])
+        ]
+        # sorted устойчива: при равной стоимости остаётся порядок каталога
+        return sorted(candidates, key=lambda p: sum(m not in chosen for m in self._closure(p)))
+
+    def _expand(self, pending: Tuple[str, ...], reasons: List[str]) -> Optional[Tuple[str, ...]]:
+        registry = self.registry
+        chosen: Dict[str, None] = {}
+        queue = deque(pending)
+        # Точки выбора для возврата: (ключ состояния, требование, выбранное, очередь, оставшиеся провайдеры)
+        choices: List[Tuple[State, str, Dict[str, None], Tuple[str, ...], Iterator[str]]] = []
+        # Состояния, из которых решения нет: исход зависит только от множеств
+        # выбранного и ожидающего, поэтому второй раз их не раскрываем
+        failed: Set[State] = set()
+
+        while True:
+            ok = True
+            while queue:
+                name = queue.popleft()
+                if name in chosen:
+                    continue
+
+                if name in registry:
+                    conflict = next((c for c in registry.conflicts[name] if c in chosen), None)
+                    if conflict is not None:
+                        reasons.append(f"Компонент '{name}' конфликтует с '{conflict}'")
+                        ok = False
+                        break
+                    chosen[name] = None
+                    queue.extend(registry.requires[name])
+                    continue
+
+                providers = registry.providers.get(name)
+                if not providers:
+                    reasons.append(f"Требование '{name}' не закрывает ни один компонент")
+                    ok = False
+                    break
+                if any(p in chosen for p in providers):
+                    continue
+
+                state = (frozenset(chosen), frozenset(queue) | {name})
+                candidates = iter(self._candidates(providers, chosen, queue) if state not in failed else ())
+                provider = next(candidates, None)
+                if provider is None:
+                    failed.add(state)
+                    reasons.append(f"Для '{name}' нет совместимого провайдера: {', '.join(providers)}")
+                    ok = False
+                    break
+                choices.append((state, name, dict(chosen), tuple(queue), candidates))
+                queue.appendleft(provider)
+
+            if ok:
+                return tuple(chosen)
+
+            # Конфликт: возвращаемся к последней точке выбора с непроверенным провайдером
+            while choices:
+                state, name, saved, rest, candidates = choices[-1]
+                provider = next(candidates, None)
+                if provider is not None:
+                    chosen = dict(saved)
+                    queue = deque((provider, *rest))
+                    break
+                choices.pop()
+                failed.add(state)
+                providers = registry.providers[name]
+                reasons.append(f"Для '{name}' нет совместимого провайдера: {', '.join(providers)}")
+            else:
+                return None
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import toml
+
+from botango.core.template_cache import lock_cache_dir
+
+logger = logging.getLogger(__name__)
+
+LOCK_FILE = "uv.lock"
+
+
+class LockError(RuntimeError):
+    """uv не смог разрешить зависимости проекта."""
+
+
+@dataclass(frozen=True)
+class LockResult:
+    path: Path
+    key: str
+    cached: bool
+    elapsed: float
+
+
+def find_uv() -> str:
+    """Путь к бинарнику uv: из пакета uv (зависимость botango) или из PATH."""
+    try:
+        from uv import find_uv_bin
+
+        return find_uv_bin()
+    except (ImportError, FileNotFoundError):
+        found = shutil.which("uv")
+        if not found:
+            raise LockError("uv не найден: установите пакет uv или добавьте его в PATH")
+        return found
+
+
+class DependencyLocker:
+    """
+    Разрешение зависимостей сгенерированного проекта в uv.lock.
+
+    Ключ кеша — хеш набора зависимостей из pyproject.toml проекта
+    (имя, requires-python, отсортированные dependencies и optional-dependencies)
+    вместе с источниками пакетов и бинарником uv (путь, mtime, размер —
+    без запуска uv --version на каждом вызове). Одинаковые наборы
+    компонентов у разных ботов получают готовый uv.lock из кеша
+    без запуска резолвера.
+
+    find_links — локальные каталоги с колёсами; при offline=True uv
+    не обращается к индексу и сети (--no-index --offline).
+    """
+
+    def __init__(
+        self,
+        find_links: Iterable[Path] = (),
+        offline: bool = False,
+        cache_dir: Optional[Path] = None,
+        use_cache: bool = True,
+    ):
+        # Абсолютные пути: uv записывает их в uv.lock, и закешированный
+        # lock-файл остаётся корректным для проекта в любом каталоге
+        self.find_links = [Path(p).resolve() for p in find_links]
+        self.offline = offline
+        self.cache_dir = Path(cache_dir) if cache_dir else lock_cache_dir()
+        self.use_cache = use_cache
+        self._uv: Optional[str] = None
+
+    @property
+    def uv(self) -> str:
+        if self._uv is None:
+            self._uv = find_uv()
+        return self._uv
+
+    @property
+    def uv_stamp(self) -> str:
+        """Отпечаток бинарника uv: обновление uv меняет mtime и размер."""
+        stat = os.stat(self.uv)
+        return f"{Path(self.uv).resolve()}:{stat.st_mtime_ns}:{stat.st_size}"
+
+    def _uv_args(self) -> List[str]:
+        args = [self.uv, "lock"]
+        for path in self.find_links:
+            args += ["--find-links", str(path)]
+        if self.offline:
+            args += ["--no-index", "--offline"]
+        return args
+
+    def cache_key(self, pyproject: Path) -> str:
+        project = toml.load(pyproject).get("project", {})
+        payload = {
+            "name": project.get("name"),
+            "requires-python": project.get("requires-python"),
+            "dependencies": sorted(
+                "".join(dep.split()).lower() for dep in project.get("dependencies", [])
+            ),
+            "optional-dependencies": {
+                extra: sorted("".join(dep.split()).lower() for dep in deps)
+                for extra, deps in project.get("optional-dependencies", {}).items()
+            },
+            "find-links": [str(p) for p in self.find_links],
+            "offline": self.offline,
+            "uv": self.uv_stamp,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def lock(self, project_dir: Path = Path(".")) -> LockResult:
+        """Создаёт uv.lock в project_dir (из кеша или запуском uv lock)."""
+        started = time.perf_counter()
+        project_dir = Path(project_dir)
+        pyproject = project_dir / "pyproject.toml"
+        if not pyproject.exists():
+            raise LockError(f"{pyproject} не найден — сначала выполните botango newbot")
+
+        key = self.cache_key(pyproject)
+        cached = self.cache_dir / f"{key}.lock"
+        target = project_dir / LOCK_FILE
+
+        if self.use_cache and cached.exists():
+            shutil.copyfile(cached, target)
+            logger.debug("uv.lock взят из кеша %s", cached)
+            return LockResult(target, key, True, time.perf_counter() - started)
+
+        proc = subprocess.run(
+            self._uv_args(), cwd=project_dir, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise LockError(proc.stderr.strip() or "uv lock завершился с ошибкой")
+
+        if self.use_cache:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=str(self.cache_dir))
+            os.close(fd)
+            try:
+                shutil.copyfile(target, tmp_path)
+                os.replace(tmp_path, cached)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        return LockResult(target, key, False, time.perf_counter() - started)
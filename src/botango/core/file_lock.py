@@ -0,0 +1,105 @@
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Блокировки внутри процесса: путь -> (RLock, глубина захвата).
+# flock привязан к открытому файлу, поэтому повторный захват тем же процессом
+# через новый дескриптор привёл бы к взаимоблокировке — считаем глубину сами.
+_registry_guard = threading.Lock()
+_thread_locks: Dict[str, threading.RLock] = {}
+_depth: Dict[str, int] = {}
+_handles: Dict[str, int] = {}
+
+
+class LockTimeoutError(TimeoutError):
+    """Не удалось захватить блокировку за отведённое время."""
+
+
+def lock_path_for(path: Path) -> Path:
+    """Файл-спутник блокировки: data/.env -> data/.env.lock."""
+    return path.with_name(f"{path.name}.lock")
+
+
+class FileLock:
+    """
+    Межпроцессная рекомендательная блокировка (fcntl.flock, на Windows — msvcrt).
+
+    Блокируется не сам файл данных (его заменяет os.replace), а файл-спутник
+    <name>.lock рядом с ним. Блокировка реентерабельна внутри процесса:
+    вложенный захват тем же потоком не блокируется, другие потоки ждут.
+    """
+
+    def __init__(self, path: Path, timeout: float = 30.0, poll_interval: float = 0.005):
+        self.path = lock_path_for(Path(path))
+        self.key = str(self.path.resolve())
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    def _thread_lock(self) -> threading.RLock:
+        with _registry_guard:
+            return _thread_locks.setdefault(self.key, threading.RLock())
+
+    def acquire(self) -> None:
+        deadline = time.monotonic() + self.timeout
+        rlock = self._thread_lock()
+        if not rlock.acquire(timeout=self.timeout):
+            raise LockTimeoutError(f"Не удалось захватить {self.path}")
+        if _depth.get(self.key, 0) == 0:
+            try:
+                _handles[self.key] = self._lock_file(deadline)
+            except BaseException:
+                rlock.release()
+                raise
+        _depth[self.key] = _depth.get(self.key, 0) + 1
+
+    def release(self) -> None:
+        _depth[self.key] -= 1
+        if _depth[self.key] == 0:
+            fd = _handles.pop(self.key)
+            try:
+                self._unlock_file(fd)
+            finally:
+                os.close(fd)
+        self._thread_lock().release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+    def _lock_file(self, deadline: float) -> int:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                return fd
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise LockTimeoutError(f"Не удалось захватить {self.path}")
+                time.sleep(self.poll_interval)
+
+    @staticmethod
+    def _unlock_file(fd: int) -> None:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
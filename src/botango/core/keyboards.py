@@ -0,0 +1,183 @@
+import keyword
+import re
+import string
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError
+
+# Предел Telegram для callback_data, байт
+CALLBACK_DATA_LIMIT = 64
+# Разделитель префикса действия и аргументов в callback_data
+SEPARATOR = ":"
+# Типы параметров клавиатур: "page:int"
+PARAM_TYPES = ("str", "int")
+
+ACTION_NAME = re.compile(r"^[A-Za-z0-9_]+$")
+
+
+class KeyboardSpecError(ValueError):
+    """Описание клавиатур в project_file.toml некорректно."""
+
+    def __init__(self, reasons: List[str]):
+        self.reasons = list(dict.fromkeys(reasons))
+        super().__init__("; ".join(self.reasons))
+
+
+class ButtonSpec(BaseModel):
+    text: str
+    callback: Optional[str] = None      # имя действия (префикс callback_data)
+    args: List[str] = []                # параметры клавиатуры, упакованные после префикса
+    url: Optional[str] = None
+    request_contact: bool = False       # только для reply-клавиатур
+    request_location: bool = False
+
+
+class KeyboardSpec(BaseModel):
+    """
+    Клавиатура из секции [keyboards.<name>] project_file.toml:
+
+        [keyboards.product]
+        params = ["product_id:int", "page:int"]
+        rows = [
+            [{text = "Купить", callback = "buy", args = ["product_id"]}],
+            [{text = "Стр. {page}", callback = "page", args = ["page"]}],
+        ]
+
+    Кнопки reply-клавиатуры можно задавать строками: rows = [["Да", "Нет"]].
+    """
+
+    type: Literal["inline", "reply"] = "inline"
+    params: List[str] = []
+    rows: List[List[ButtonSpec]]
+    cache: int = 1024                   # размер LRU-кеша для клавиатур с параметрами
+    resize: bool = True
+    one_time: bool = False
+    placeholder: Optional[str] = None
+
+
+def _parse_param(raw: str) -> Tuple[str, str]:
+    name, _, kind = raw.partition(":")
+    return name.strip(), (kind.strip() or "str")
+
+
+def _fields(text: str) -> List[str]:
+    return [field for _, field, _, _ in string.Formatter().parse(text) if field is not None]
+
+
+def _button(spec: ButtonSpec, kind: str, params: Dict[str, str], where: str, errors: List[str]) -> Dict[str, Any]:
+    fields = _fields(spec.text) if params else []
+    for field in fields:
+        if field not in params:
+            errors.append(f"{where}: в тексте {spec.text!r} неизвестный параметр {field!r}")
+    text = repr(spec.text)
+    if fields:
+        text += ".format(" + ", ".join(f"{field}={field}" for field in dict.fromkeys(fields)) + ")"
+    button = {
+        "text": text,
+        "callback": spec.callback,
+        "args": list(spec.args),
+        "url": repr(spec.url) if spec.url else None,
+        "request_contact": spec.request_contact,
+        "request_location": spec.request_location,
+    }
+    if kind == "reply":
+        if spec.callback or spec.url or spec.args:
+            errors.append(f"{where}: у кнопки reply-клавиатуры не может быть callback, args или url")
+        return button
+    if bool(spec.callback) == bool(spec.url):
+        errors.append(f"{where}: у inline-кнопки должен быть ровно один из callback или url")
+    if spec.request_contact or spec.request_location:
+        errors.append(f"{where}: request_contact/request_location есть только у reply-кнопок")
+    if spec.args and not spec.callback:
+        errors.append(f"{where}: args задаются только вместе с callback")
+    for arg in spec.args:
+        if arg not in params:
+            errors.append(f"{where}: аргумент {arg!r} не объявлен в params")
+    if spec.callback:
+        if not ACTION_NAME.match(spec.callback):
+            errors.append(f"{where}: имя действия {spec.callback!r} — только буквы, цифры и _")
+        elif not spec.args and len(spec.callback.encode("utf-8")) > CALLBACK_DATA_LIMIT:
+            errors.append(f"{where}: callback_data длиннее {CALLBACK_DATA_LIMIT} байт")
+    return button
+
+
+def compile_keyboards(section: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Проверяет описания клавиатур и готовит контекст шаблона keyboards/compiled.py.
+
+    section — секция keyboards из project_file.toml: каждая вложенная
+    таблица — клавиатура, ключ class (список компонента) не используется.
+    Возвращает {"keyboards": [...], "actions": [...]}; тексты и url уже
+    в виде выражений Python (repr и .format по параметрам), шаблон
+    подставляет их как есть.
+    Все найденные ошибки собираются в одно исключение KeyboardSpecError.
+    """
+    errors: List[str] = []
+    keyboards: List[Dict[str, Any]] = []
+    actions: Dict[str, List[Tuple[str, str]]] = {}
+
+    for name, raw in section.items():
+        if name == "class" or not isinstance(raw, dict):
+            continue
+        where = f"keyboards.{name}"
+        if not name.isidentifier() or keyword.iskeyword(name):
+            errors.append(f"{where}: имя клавиатуры должно быть идентификатором Python")
+            continue
+        rows = raw.get("rows")
+        if isinstance(rows, list):
+            rows = [
+                [{"text": b} if isinstance(b, str) else b for b in row] if isinstance(row, list) else row
+                for row in rows
+            ]
+        try:
+            spec = KeyboardSpec.model_validate(raw | {"rows": rows})
+        except ValidationError as e:
+            errors.extend(f"{where}: {error['msg']} ({'.'.join(map(str, error['loc']))})" for error in e.errors())
+            continue
+
+        params: Dict[str, str] = {}
+        for raw_param in spec.params:
+            param, kind = _parse_param(raw_param)
+            if not param.isidentifier() or keyword.iskeyword(param):
+                errors.append(f"{where}: параметр {param!r} должен быть идентификатором Python")
+            elif kind not in PARAM_TYPES:
+                errors.append(f"{where}: тип параметра {raw_param!r} — один из {', '.join(PARAM_TYPES)}")
+            params[param] = kind
+
+        compiled_rows = []
+        for r, row in enumerate(spec.rows):
+            compiled_row = []
+            for b, button in enumerate(row):
+                at = f"{where}.rows[{r}][{b}]"
+                compiled_row.append(_button(button, spec.type, params, at, errors))
+                if button.callback and spec.type == "inline":
+                    fields = [(arg, params.get(arg, "str")) for arg in button.args]
+                    known = actions.setdefault(button.callback, fields)
+                    if known != fields:
+                        errors.append(f"{at}: действие {button.callback!r} уже используется с другими аргументами")
+            compiled_rows.append(compiled_row)
+
+        keyboards.append({
+            "name": name,
+            "const": name.upper(),
+            "type": spec.type,
+            "params": list(params.items()),
+            "rows": compiled_rows,
+            "cache": spec.cache,
+            "resize": spec.resize,
+            "one_time": spec.one_time,
+            "placeholder": repr(spec.placeholder) if spec.placeholder else None,
+        })
+
+    compiled_actions = [
+        {"name": name, "const": f"{name.upper()}_ACTION", "fields": fields}
+        for name, fields in actions.items()
+    ]
+    names = [kb["const"] if not kb["params"] else kb["name"] for kb in keyboards]
+    names += [action["const"] for action in compiled_actions]
+    for duplicate in sorted({name for name in names if names.count(name) > 1}):
+        errors.append(f"keyboards: имя {duplicate} в keyboards/compiled.py получается дважды")
+
+    if errors:
+        raise KeyboardSpecError(errors)
+    return {"keyboards": keyboards, "actions": compiled_actions}
@@ -0,0 +1,252 @@
+import hashlib
+from abc import ABC, abstractmethod
+import io
+import os
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+# Права файлов в архивах
+FILE_MODE = 0o644
+
+
+class OutputSink(ABC):
+    """
+    Куда записываются отрисованные шаблоны (см. TemplateRenderer).
+
+    write() получает текст файла кусками — прямо из Template.stream
+    (jinja2 generate()), без сборки целой строки, — и возвращает размер
+    в символах и sha256 содержимого в UTF-8. Вызывается из нескольких
+    потоков одновременно.
+
+    Синки архивов и памяти — контекстные менеджеры: архив дописывается
+    в close().
+    """
+
+    def prepare(self, targets: Sequence[Path]) -> None:
+        """Вызывается один раз до записи всех файлов сборки."""
+
+    @abstractmethod
+    def write(self, target: Path, chunks: Iterable[str]) -> Tuple[int, str]:
+        """Записывает файл target из кусков текста; возвращает (размер, sha256)."""
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class DiskSink(OutputSink):
+    """
+    Файлы на диске относительно root (по умолчанию текущий каталог).
+    Каждая запись атомарна: куски пишутся во временный файл рядом
+    с целевым, который затем заменяет его (os.replace).
+
+    skip_unchanged=True не перезаписывает файл, если новое содержимое
+    совпадает с тем, что уже на диске (mtime сохраняется — перезагрузчики
+    и make не видят лишних изменений); такие цели собираются в unchanged.
+    Сравнение идёт по ходу записи во временный файл, который при совпадении
+    просто удаляется.
+    """
+
+    def __init__(self, root: Union[str, Path] = ".", skip_unchanged: bool = False):
+        self.root = Path(root)
+        self.skip_unchanged = skip_unchanged
+        self.unchanged: List[Path] = []
+
+    def path(self, target: Path) -> Path:
+        return self.root / target
+
+    def prepare(self, targets: Sequence[Path]) -> None:
+        # Каждый каталог создаётся один раз, а не при записи каждого файла
+        for directory in sorted({self.path(target).parent for target in targets}):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def write(self, target: Path, chunks: Iterable[str]) -> Tuple[int, str]:
+        path = self.path(target)
+        # Старое содержимое сравнивается по ходу записи, кусок за куском:
+        # файл целиком в памяти не собирается
+        current: Optional[BinaryIO] = None
+        if self.skip_unchanged:
+            try:
+                current = open(path, "rb")
+            except FileNotFoundError:
+                pass
+        same = current is not None
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    size += len(chunk)
+                    data = chunk.encode("utf-8")
+                    digest.update(data)
+                    f.write(data)
+                    if same:
+                        same = current.read(len(data)) == data
+            if same and not current.read(1):
+                self.unchanged.append(Path(target))
+            else:
+                os.replace(tmp_path, str(path))
+        finally:
+            if current is not None:
+                current.close()
+            # Временный файл остаётся, если содержимое не изменилось
+            # или произошла ошибка до замены
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return size, digest.hexdigest()
+
+
+class _BufferingSink(OutputSink):
+    """Общая часть синков, которым нужен весь файл целиком (байты, не строка)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def write(self, target: Path, chunks: Iterable[str]) -> Tuple[int, str]:
+        digest = hashlib.sha256()
+        buffer = io.BytesIO()
+        size = 0
+        for chunk in chunks:
+            size += len(chunk)
+            data = chunk.encode("utf-8")
+            digest.update(data)
+            buffer.write(data)
+        with self._lock:
+            self._store(PurePosixPath(Path(target).as_posix()), buffer.getbuffer())
+        return size, digest.hexdigest()
+
+    @abstractmethod
+    def _store(self, target: PurePosixPath, data: memoryview) -> None:
+        """Сохраняет готовый файл; вызывается под блокировкой."""
+
+
+class MemorySink(_BufferingSink):
+    """
+    Виртуальная файловая система в памяти: путь (posix) -> байты.
+    Удобна для тестов и предпросмотра сборки без записи на диск.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.files: Dict[str, bytes] = {}
+
+    def _store(self, target: PurePosixPath, data: memoryview) -> None:
+        self.files[str(target)] = bytes(data)
+
+    def read_text(self, target: Union[str, Path]) -> str:
+        return self.files[Path(target).as_posix()].decode("utf-8")
+
+    def paths(self) -> List[str]:
+        return sorted(self.files)
+
+
+class _ArchiveSink(_BufferingSink):
+    """
+    Архив в файле или в уже открытом потоке (например, в теле HTTP-ответа).
+    Поток может быть без seek: tar пишется потоково ("w|gz"), zip — с data
+    descriptor. Заголовку записи нужен размер, поэтому файл копится
+    в памяти в байтах и добавляется в архив под блокировкой.
+    prefix — каталог внутри архива, в который кладутся все файлы.
+    """
+
+    def __init__(self, output: Union[str, Path, BinaryIO], prefix: str = ""):
+        super().__init__()
+        self.prefix = PurePosixPath(prefix) if prefix else None
+        self.mtime = time.time()
+        # Архив по пути удаляется, если сборка завершилась ошибкой (см. __exit__)
+        self._path = Path(output) if isinstance(output, (str, Path)) else None
+        if self._path is not None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._stream: BinaryIO = open(self._path, "wb")
+        else:
+            self._stream = output
+        self._closed = False
+
+    def _name(self, target: PurePosixPath) -> str:
+        return str(self.prefix / target if self.prefix else target)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._finish()
+        finally:
+            if self._path is not None:
+                self._stream.close()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self.close()
+        finally:
+            if exc_type is not None and self._path is not None:
+                self._path.unlink(missing_ok=True)
+
+    @abstractmethod
+    def _finish(self) -> None:
+        """Дописывает конец архива."""
+
+
+class TarSink(_ArchiveSink):
+    """Архив .tar.gz (compression="gz"), .tar.bz2, .tar.xz или .tar ("")."""
+
+    def __init__(self, output: Union[str, Path, BinaryIO], prefix: str = "", compression: str = "gz"):
+        super().__init__(output, prefix)
+        self._tar = tarfile.open(fileobj=self._stream, mode=f"w|{compression}")
+
+    def _store(self, target: PurePosixPath, data: memoryview) -> None:
+        info = tarfile.TarInfo(self._name(target))
+        info.size = len(data)
+        info.mtime = int(self.mtime)
+        info.mode = FILE_MODE
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def _finish(self) -> None:
+        self._tar.close()
+
+
+class ZipSink(_ArchiveSink):
+    """Архив .zip со сжатием deflate."""
+
+    def __init__(self, output: Union[str, Path, BinaryIO], prefix: str = "", compresslevel: Optional[int] = None):
+        super().__init__(output, prefix)
+        self.compresslevel = compresslevel
+        self._zip = zipfile.ZipFile(self._stream, "w", zipfile.ZIP_DEFLATED)
+
+    def _store(self, target: PurePosixPath, data: memoryview) -> None:
+        info = zipfile.ZipInfo(self._name(target), date_time=time.localtime(self.mtime)[:6])
+        info.external_attr = FILE_MODE << 16
+        info.compress_type = zipfile.ZIP_DEFLATED
+        self._zip.writestr(info, data, compresslevel=self.compresslevel)
+
+    def _finish(self) -> None:
+        self._zip.close()
+
+
+def open_sink(output: Union[str, Path], prefix: str = "") -> OutputSink:
+    """
+    Синк по пути: *.zip, *.tar, *.tar.gz/*.tgz, *.tar.bz2, *.tar.xz —
+    архив, всё остальное — каталог на диске.
+    """
+    name = Path(output).name.lower()
+    if name.endswith(".zip"):
+        return ZipSink(output, prefix)
+    if name.endswith((".tar.gz", ".tgz")):
+        return TarSink(output, prefix, "gz")
+    for suffix in ("bz2", "xz"):
+        if name.endswith(f".tar.{suffix}"):
+            return TarSink(output, prefix, suffix)
+    if name.endswith(".tar"):
+        return TarSink(output, prefix, "")
+    return DiskSink(Path(output) / prefix if prefix else output)
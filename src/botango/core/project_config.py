@@ -1,7 +1,12 @@
 from enum import Enum
-from typing import List, Optional, Union, overload
+from typing import Dict, FrozenSet, List, Optional, Union, overload
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+from botango.core.component_registry import ComponentRegistry
+from botango.core.component_resolver import ComponentResolver, ResolutionError
+from botango.core.requirements import MergedRequirement, merge_dependencies
+from botango.core.tracing import traced
 
 
 class VersionSeparator(str, Enum):
@@ -46,12 +51,20 @@ FASTAPI = Dependency(name="fastapi", version="0.109.0")
 UVICORN = Dependency.latest("uvicorn")
 DJANGO = Dependency(name="django", version="5.0.0")
 
+REDIS = Dependency(name="redis", version="5.0.1")
+
 AIOHTTP = Dependency.latest("aiohttp")
 REQUESTS = Dependency.latest("requests")
 
 DOCKER = Dependency(name="docker", version="7.1.0")
 DOCKER_COMPOSE = Dependency(name="docker-compose", version="1.29.2")
 
+# Базы данных, для которых генерируется слой bot/database (AsyncEngine), и их вид
+DATABASE_KINDS = {"aiosqlite": "sqlite", "aiosqlite-docker": "sqlite", "postgresql": "postgresql"}
+
+# Где может храниться очередь компонента tasks (у postgresql-sync нет AsyncEngine)
+TASK_STORAGES = ("redis", *DATABASE_KINDS)
+
 class Component(BaseModel):
     name: str
     description: str
@@ -60,6 +73,8 @@ class Component(BaseModel):
     dependencies: List[Dependency] = Field(default_factory=list)
     conflicts_with: List[str] = Field(default_factory=list)
     requires: List[str] = Field(default_factory=list)
+    # Абстрактные возможности, которые закрывает компонент (например "database")
+    provides: List[str] = Field(default_factory=list)
 
     # Методы для работы с зависимостями
     def get_dependencies(self) -> List[Dependency]:
@@ -82,6 +97,7 @@ class DatabaseComponent(Component):
     """Базовый класс для компонентов базы данных"""
     db_type: str
     async_support: bool = True
+    provides: List[str] = ["database"]
 
 class AioSQLiteDatabase(DatabaseComponent):
     name: str = "aiosqlite"
@@ -90,6 +106,8 @@ class AioSQLiteDatabase(DatabaseComponent):
     templates: str = "templates/database/aiosqlite"
     db_type: str = "sqlite"
     dependencies: List[Dependency] = [AIOSQLITE, SQLALCHEMY]
+    # Один провайдер "database": остальные пары уже объявлены у других баз
+    conflicts_with: List[str] = ["postgresql"]
 
 class PostgresDatabase(DatabaseComponent):
     name: str = "postgresql"
@@ -116,10 +134,13 @@ class DockerComponent(Component):
     required: bool = False
     templates: str = "templates/docker"
     dependencies: List[Dependency] = [DOCKER, DOCKER_COMPOSE]
+    # С Docker база данных — только Docker-версия (см. DockerDatabaseComponent)
+    conflicts_with: List[str] = ["aiosqlite", "postgresql", "postgresql-sync"]
 
 class DockerDatabaseComponent(DatabaseComponent):
     """База данных с Docker-специфичной конфигурацией"""
     volume_path: str = ""
+    requires: List[str] = ["docker"]
 
 class AioSQLiteDockerDatabase(DockerDatabaseComponent):
     name: str = "aiosqlite-docker"
@@ -150,6 +171,7 @@ class EnvironmentConfigComponent(Component):
 class WebFrameworkComponent(Component):
     """Компонент веб-фреймворка для админки или вебхуков"""
     framework_type: str
+    provides: List[str] = ["web"]
 
 
 class FastAPIComponent(WebFrameworkComponent):
@@ -205,6 +227,14 @@ class BotangoConfig(BaseModel):
         description="Промежуточное ПО (throttling, ACL)",
         required=False,
         templates="templates/middlewares",
+        requires=["base", "throttling"]
+    )
+
+    throttling: Component = Component(
+        name="throttling",
+        description="Антифлуд: ограничение частоты апдейтов от пользователя",
+        required=False,
+        templates="templates/middlewares",
         requires=["base"]
     )
 
@@ -244,6 +274,31 @@ class BotangoConfig(BaseModel):
         conflicts_with=["polling"]  # если добавим polling компонент
     )
 
+    redis: Component = Component(
+        name="redis",
+        description="Redis: FSM-хранилище, кеш и общий антифлуд",
+        required=False,
+        templates="templates/redis",
+        dependencies=[REDIS],
+        requires=["base"]
+    )
+
+    metrics: Component = Component(
+        name="metrics",
+        description="Метрики Prometheus: апдейты, хендлеры, ошибки, запросы к базе",
+        required=False,
+        templates="templates/metrics",
+        requires=["base"]
+    )
+
+    tasks: Component = Component(
+        name="tasks",
+        description="Фоновые задачи: очередь в базе данных или Redis, повторы, отложенные и периодические задачи",
+        required=False,
+        templates="templates/tasks",
+        requires=["base"]
+    )
+
     admin_panel: Component = Component(
         name="admin",
         description="Админ панель для управления ботом",
@@ -262,6 +317,16 @@ class BotangoConfig(BaseModel):
 
     migrations: AlembicMigrationsComponent = AlembicMigrationsComponent()
 
+    # Сторонние компоненты (каталог плагинов)
+    plugin_components: List[Component] = Field(default_factory=list)
+
+    # Индекс компонентов строится при первом обращении (см. registry)
+    _registry: Optional[ComponentRegistry] = PrivateAttr(default=None)
+    _resolver: Optional[ComponentResolver] = PrivateAttr(default=None)
+    _requirements: Dict[FrozenSet[str], List[MergedRequirement]] = PrivateAttr(
+        default_factory=dict
+    )
+
     # Методы для работы с конфигурацией
     def get_all_components(self) -> List[Component]:
         """Возвращает все доступные компоненты"""
@@ -270,46 +335,81 @@ class BotangoConfig(BaseModel):
             self.handlers,
             self.keyboards,
             self.middlewares,
+            self.throttling,
             self.services,
             self.webhook,
+            self.redis,
+            self.metrics,
+            self.tasks,
             self.admin_panel,
             self.docker,
             self.migrations
         ]
         all_components.extend(self.database_components)
+        all_components.extend(self.docker_databases)
         all_components.extend(self.web_components)
+        all_components.extend(self.plugin_components)
         return all_components
 
+    @property
+    def registry(self) -> ComponentRegistry:
+        """Индекс имён и граф requires/conflicts, построенные один раз"""
+        if self._registry is None:
+            self._registry = ComponentRegistry(self.get_all_components())
+        return self._registry
+
+    def reset_registry(self) -> None:
+        """Сбрасывает индекс — нужно после изменения списков компонентов"""
+        self._registry = None
+        self._resolver = None
+        self._requirements.clear()
+
     def get_component_by_name(self, name: str) -> Optional[Component]:
         """Находит компонент по имени"""
-        for component in self.get_all_components():
-            if component.name == name:
-                return component
-        return None
-
+        return self.registry.get(name)
+
+    @traced("components.resolve", "components")
+    def resolve_selection(self, selected_names: List[str]) -> List[str]:
+        """
+        Дополняет частичный выбор до полного согласованного набора
+        (транзитивные requires, выбор провайдера для "database"/"web").
+        С docker провайдером "database" может быть только Docker-версия базы:
+        это конфликт в каталоге, поэтому решает сам резолвер.
+        При невозможности выбрасывает ResolutionError с объяснением.
+        """
+        if self._resolver is None:
+            self._resolver = ComponentResolver(self.registry)
+        try:
+            resolved = self._resolver.resolve(selected_names)
+        except ResolutionError as e:
+            # Вместо общего "конфликтует с 'docker'" — какую базу выбрать
+            docker_errors = self.validate_docker_compatibility(selected_names)
+            raise (ResolutionError(docker_errors) if docker_errors else e) from None
+        if "tasks" in resolved and not set(TASK_STORAGES) & set(resolved):
+            raise ResolutionError(["Компоненту tasks нужно хранилище очереди: выберите redis или базу данных"])
+        return resolved
+
+    @traced("components.requirements", "components")
+    def get_requirements(self, selected_names: List[str]) -> List[MergedRequirement]:
+        """
+        Объединённые зависимости выбранных компонентов: один пин на пакет
+        с пересечением диапазонов версий (см. merge_dependencies).
+        Результат запоминается для каждого набора компонентов.
+        """
+        key = frozenset(selected_names)
+        if key not in self._requirements:
+            pairs = []
+            for name in selected_names:
+                component = self.get_component_by_name(name)
+                if component:
+                    pairs.extend((component.name, dep) for dep in component.get_dependencies())
+            self._requirements[key] = merge_dependencies(pairs)
+        return list(self._requirements[key])
+
+    @traced("components.validate", "components")
     def validate_component_selection(self, selected_names: List[str]) -> List[str]:
-        """Проверяет валидность выбранных компонентов и возвращает ошибки"""
-        errors = []
-        selected_components = []
-
-        # Собираем компоненты по именам
-        for name in selected_names:
-            component = self.get_component_by_name(name)
-            if component:
-                selected_components.append(component)
-            else:
-                errors.append(f"Компонент '{name}' не найден")
-
-        # Проверяем требования и конфликты
-        for component in selected_components:
-            if not component.validate_compatibility(selected_names):
-                errors.append(f"Компонент '{component.name}' несовместим с выбранной конфигурацией")
-
-        # Проверяем обязательные компоненты
-        required_components = [comp for comp in self.get_all_components() if comp.required]
-        for req_comp in required_components:
-            if req_comp.name not in selected_names:
-                errors.append(f"Обязательный компонент '{req_comp.name}' не выбран")
+        """Проверяет валидность выбранных компонентов и возвращает все ошибки сразу"""
+        errors = self.registry.validate(selected_names)
 
         docker_errors = self.validate_docker_compatibility(selected_names)
         errors.extend(docker_errors)
@@ -330,18 +430,17 @@ class BotangoConfig(BaseModel):
         errors = []
 
         # Проверяем, что если выбран docker, то база данных тоже docker-версия
-        docker_selected = "docker" in selected_names
-        has_regular_db = any(
-            name in selected_names
-            for name in ["aiosqlite", "postgresql", "postgresql-sync"]
-        )
-        has_docker_db = any(
-            name in selected_names
-            for name in [db.name for db in self.docker_databases]
-        )
-
-        if docker_selected and has_regular_db and not has_docker_db:
-            errors.append("При использовании Docker выберите Docker-версию базы данных")
+        if "docker" not in selected_names:
+            return errors
+        for db in self.database_components:
+            if db.name not in selected_names:
+                continue
+            docker_db = self.get_docker_database_component(db.name)
+            if docker_db is not None:
+                errors.append(f"При использовании Docker выберите '{docker_db.name}' вместо '{db.name}'")
+            else:
+                available = ", ".join(d.name for d in self.docker_databases)
+                errors.append(f"У базы данных '{db.name}' нет Docker-версии, доступны: {available}")
 
         return errors
 
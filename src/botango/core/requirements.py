@@ -0,0 +1,198 @@
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from botango.core.project_config import Dependency
+
+VersionKey = Tuple[int, ...]
+
+
+def normalize_name(name: str) -> str:
+    """Нормализация имени пакета по PEP 503: SQLAlchemy == sqlalchemy, a_b == a-b."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def version_key(version: str) -> VersionKey:
+    """
+    Ключ сравнения версий: числовые сегменты релиза без хвостовых нулей,
+    поэтому 2.0 == 2.0.0. Суффиксы (rc1, .post1) в сравнении не участвуют.
+    """
+    parts = []
+    for segment in version.split("."):
+        digits = re.match(r"\d+", segment)
+        if not digits:
+            break
+        parts.append(int(digits.group()))
+    while parts and parts[-1] == 0:
+        parts.pop()
+    return tuple(parts)
+
+
+@dataclass(frozen=True)
+class Bound:
+    version: str
+    inclusive: bool
+
+    @property
+    def key(self) -> VersionKey:
+        return version_key(self.version)
+
+
+@dataclass
+class VersionRange:
+    """Интервал допустимых версий; None — граница не задана."""
+
+    lower: Optional[Bound] = None
+    upper: Optional[Bound] = None
+
+    @classmethod
+    def from_specifier(cls, separator: str, version: Optional[str]) -> "VersionRange":
+        if not version:
+            return cls()
+        if separator == "==":
+            return cls(Bound(version, True), Bound(version, True))
+        if separator == ">=":
+            return cls(lower=Bound(version, True))
+        if separator == ">":
+            return cls(lower=Bound(version, False))
+        if separator == "<=":
+            return cls(upper=Bound(version, True))
+        if separator == "<":
+            return cls(upper=Bound(version, False))
+        if separator == "~=":
+            # ~=X.Y.Z  ->  >=X.Y.Z, <X.(Y+1)
+            release = []
+            for segment in version.split("."):
+                if not segment.isdigit():
+                    break
+                release.append(int(segment))
+            if len(release) < 2:
+                raise ValueError(f"~= требует минимум два сегмента версии: {version}")
+            prefix = release[:-1]
+            prefix[-1] += 1
+            return cls(Bound(version, True), Bound(".".join(map(str, prefix)), False))
+        raise ValueError(f"Неизвестный оператор версии: {separator}")
+
+    def intersect(self, other: "VersionRange") -> "VersionRange":
+        return VersionRange(
+            lower=_pick(self.lower, other.lower, prefer_higher=True),
+            upper=_pick(self.upper, other.upper, prefer_higher=False),
+        )
+
+    @property
+    def empty(self) -> bool:
+        if self.lower is None or self.upper is None:
+            return False
+        if self.lower.key != self.upper.key:
+            return self.lower.key > self.upper.key
+        return not (self.lower.inclusive and self.upper.inclusive)
+
+    def specifier(self) -> str:
+        """Строка спецификатора, например '>=0.20.0,<0.21' или '==2.9.11'."""
+        lower, upper = self.lower, self.upper
+        if lower and upper and lower.key == upper.key:
+            return f"=={lower.version}"
+        parts = []
+        if lower:
+            parts.append(f"{'>=' if lower.inclusive else '>'}{lower.version}")
+        if upper:
+            parts.append(f"{'<=' if upper.inclusive else '<'}{upper.version}")
+        return ",".join(parts)
+
+
+def _pick(a: Optional[Bound], b: Optional[Bound], prefer_higher: bool) -> Optional[Bound]:
+    """Более строгая из двух границ одного направления."""
+    if a is None or b is None:
+        return a or b
+    if a.key != b.key:
+        return max(a, b, key=lambda x: x.key) if prefer_higher else min(a, b, key=lambda x: x.key)
+    # Одинаковая версия: строгая граница уже нестрогой
+    return a if not a.inclusive else b
+
+
+class RequirementConflictError(ValueError):
+    """Диапазоны версий одного пакета не пересекаются."""
+
+    def __init__(self, conflicts: Dict[str, List[str]]):
+        self.conflicts = conflicts
+        details = "; ".join(f"{name}: {', '.join(pins)}" for name, pins in conflicts.items())
+        super().__init__(f"Несовместимые версии зависимостей: {details}")
+
+
+@dataclass
+class MergedRequirement:
+    """Зависимость после объединения всех её упоминаний."""
+
+    name: str
+    range: VersionRange = field(default_factory=VersionRange)
+    sources: List[str] = field(default_factory=list)   # «компонент: пин»
+    optional: bool = True
+
+    def pack(self) -> str:
+        return f"{self.name}{self.range.specifier()}"
+
+
+def merge_dependencies(
+    dependencies: Iterable[Tuple[str, "Dependency"]],
+) -> List[MergedRequirement]:
+    """
+    Объединяет зависимости компонентов по пакету.
+
+    Принимает пары (имя компонента, Dependency), пересекает диапазоны
+    версий каждого пакета и возвращает список, отсортированный по имени.
+    Пакет считается необязательным, только если он необязателен везде.
+    При пустом пересечении выбрасывает RequirementConflictError со всеми
+    конфликтующими пакетами сразу.
+    """
+    merged: Dict[str, MergedRequirement] = {}
+    conflicts: Dict[str, List[str]] = {}
+
+    for source, dep in dependencies:
+        key = normalize_name(dep.name)
+        item = merged.setdefault(key, MergedRequirement(name=dep.name))
+        pin = VersionRange.from_specifier(dep.separator.value, dep.version)
+        item.range = item.range.intersect(pin)
+        item.sources.append(f"{source}: {dep.pack()}")
+        item.optional = item.optional and dep.optional
+        if item.range.empty:
+            conflicts[item.name] = item.sources
+
+    if conflicts:
+        raise RequirementConflictError(conflicts)
+    return sorted(merged.values(), key=lambda r: normalize_name(r.name))
+
+
+def split_requirements(requirements: Iterable[MergedRequirement]) -> Dict[str, List[str]]:
+    """
+    Данные для шаблонов requirements.txt и pyproject.toml:
+    обязательные пины и необязательные (extra "optional").
+    """
+    required, optional = [], []
+    for req in requirements:
+        (optional if req.optional else required).append(req.pack())
+    return {"requirements": required, "optional_requirements": optional}
+
+
+def to_requirements_txt(requirements: Iterable[MergedRequirement]) -> str:
+    """Необязательные пакеты перечисляются закомментированными, pip их не ставит."""
+    data = split_requirements(requirements)
+    text = "".join(f"{req}\n" for req in data["requirements"])
+    if data["optional_requirements"]:
+        text += "# Необязательные зависимости\n"
+        text += "".join(f"# {req}\n" for req in data["optional_requirements"])
+    return text
+
+
+def to_pyproject_dependencies(requirements: Iterable[MergedRequirement]) -> str:
+    """
+    Блок dependencies для конца секции [project] файла pyproject.toml;
+    необязательные пакеты — в [project.optional-dependencies] (extra "optional").
+    """
+    data = split_requirements(requirements)
+    rows = "".join(f'    "{req}",\n' for req in data["requirements"])
+    text = f"dependencies = [\n{rows}]\n"
+    if data["optional_requirements"]:
+        rows = "".join(f'    "{req}",\n' for req in data["optional_requirements"])
+        text += f"\n[project.optional-dependencies]\noptional = [\n{rows}]\n"
+    return text
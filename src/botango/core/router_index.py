@@ -0,0 +1,215 @@
+import ast
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Наблюдатели aiogram.Router: имя атрибута -> тип события (Router.observers)
+OBSERVERS: Dict[str, str] = {
+    name: name for name in (
+        "message", "edited_message", "channel_post", "edited_channel_post",
+        "inline_query", "chosen_inline_result", "callback_query",
+        "shipping_query", "pre_checkout_query", "poll", "poll_answer",
+        "my_chat_member", "chat_member", "chat_join_request",
+        "message_reaction", "message_reaction_count", "chat_boost", "removed_chat_boost",
+        "business_connection", "business_message", "edited_business_message",
+        "deleted_business_messages", "purchased_paid_media",
+    )
+} | {"errors": "error", "error": "error"}
+
+# Хуки жизненного цикла: такой модуль нужно загрузить до emit_startup
+LIFECYCLE = ("startup", "shutdown")
+
+
+@dataclass
+class RouterInfo:
+    """
+    Сведения о роутере модуля хендлеров, собранные без его импорта.
+
+    events   — типы событий, на которые у роутера есть хендлеры;
+               None — определить не удалось, модуль нужен для любого апдейта.
+    commands — если у всех хендлеров message есть фильтр Command,
+               то имена этих команд, иначе None.
+    eager    — модуль регистрирует startup/shutdown-хуки и загружается сразу.
+    """
+
+    module: str
+    attr: str
+    events: Optional[Tuple[str, ...]] = None
+    commands: Optional[Tuple[str, ...]] = None
+    eager: bool = False
+
+    def pack(self) -> Dict[str, Any]:
+        """Словарь для контекста шаблона handlers/__init__.py."""
+        return {
+            "attr": self.attr,
+            "events": list(self.events) if self.events is not None else None,
+            "commands": list(self.commands) if self.commands is not None else None,
+            "eager": self.eager,
+        }
+
+
+def _is_router_call(node: ast.AST) -> bool:
+    """Router(...) или aiogram.Router(...)."""
+    if not isinstance(node, ast.Call):
+        return False
+    func = node.func
+    return (isinstance(func, ast.Name) and func.id == "Router") or (
+        isinstance(func, ast.Attribute) and func.attr == "Router"
+    )
+
+
+def _literal_strings(node: ast.AST) -> Optional[List[str]]:
+    """Строка или список/кортеж строк; всё остальное — None."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        values = [_literal_strings(item) for item in node.elts]
+        if all(value is not None for value in values):
+            return [name for value in values for name in value]
+    return None
+
+
+def _command_names(filters: Iterable[ast.AST]) -> Optional[List[str]]:
+    """
+    Команды из фильтров Command(...) / CommandStart() хендлера.
+    None — среди фильтров нет команды с известными именами
+    (или у неё свой префикс), хендлер может сработать на любое сообщение.
+    """
+    for node in filters:
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+        if name == "CommandStart":
+            return ["start"]
+        if name != "Command":
+            continue
+        keywords = {keyword.arg: keyword.value for keyword in node.keywords}
+        prefix = keywords.get("prefix")
+        if prefix is not None and not (isinstance(prefix, ast.Constant) and prefix.value == "/"):
+            return None
+        names = []
+        for arg in list(node.args) + ([keywords["commands"]] if "commands" in keywords else []):
+            values = _literal_strings(arg)
+            if values is None:
+                return None  # BotCommand, re.compile(...), переменная
+            names.extend(values)
+        return names or None
+    return None
+
+
+class _RouterVisitor(ast.NodeVisitor):
+    """Собирает регистрации хендлеров на переменной роутера attr."""
+
+    def __init__(self, attr: str):
+        self.attr = attr
+        self.events: Set[str] = set()
+        self.commands: Set[str] = set()
+        self.any_message = False
+        self.unknown = False
+        self.eager = False
+
+    def _observer(self, node: ast.AST) -> Optional[str]:
+        """Имя атрибута для выражения <attr>.<имя>."""
+        if (
+            isinstance(node, ast.Attribute)
+            and isinstance(node.value, ast.Name)
+            and node.value.id == self.attr
+        ):
+            return node.attr
+        return None
+
+    def _register(self, observer: str, filters: List[ast.AST]) -> None:
+        if observer in LIFECYCLE:
+            self.eager = True
+            return
+        event = OBSERVERS[observer]
+        self.events.add(event)
+        if event == "message":
+            names = _command_names(filters)
+            if names is None:
+                self.any_message = True
+            else:
+                self.commands.update(name.lower() for name in names)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        for decorator in node.decorator_list:
+            observer = self._observer(getattr(decorator, "func", None))
+            if observer is not None and observer not in OBSERVERS and observer not in LIFECYCLE:
+                self.unknown = True  # наблюдатель новой версии aiogram
+        self.generic_visit(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Call(self, node: ast.Call) -> None:
+        func = node.func
+        observer = self._observer(func)
+        if observer in ("include_router", "include_routers"):
+            self.unknown = True  # хендлеры вложенных роутеров отсюда не видны
+        elif observer in OBSERVERS or observer in LIFECYCLE:
+            # @router.message(F.text) над функцией
+            self._register(observer, list(node.args))
+        elif isinstance(func, ast.Attribute) and func.attr == "register":
+            # router.message.register(callback, *filters)
+            observer = self._observer(func.value)
+            if observer in OBSERVERS or observer in LIFECYCLE:
+                self._register(observer, list(node.args[1:]))
+            elif observer is not None:
+                self.unknown = True
+        self.generic_visit(node)
+
+
+def index_module(path: Path, module: str) -> RouterInfo:
+    """
+    Разбирает модуль хендлеров (без импорта) и описывает его роутер
+    <module>_router. При любой неясности возвращает консервативное
+    описание: модуль загружается на первом же апдейте.
+    """
+    attr = f"{module}_router"
+    info = RouterInfo(module=module, attr=attr)
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    except (OSError, SyntaxError, UnicodeDecodeError) as e:
+        logger.warning("Не удалось разобрать %s: %s", path, e)
+        return info
+
+    assigned = any(
+        isinstance(node, (ast.Assign, ast.AnnAssign))
+        and _is_router_call(node.value)
+        and any(
+            isinstance(target, ast.Name) and target.id == attr
+            for target in getattr(node, "targets", [getattr(node, "target", None)])
+        )
+        for node in tree.body
+    )
+    if not assigned:
+        logger.warning("В %s нет %s = Router(...): модуль будет загружаться всегда", path, attr)
+        return info
+
+    visitor = _RouterVisitor(attr)
+    visitor.visit(tree)
+    info.eager = visitor.eager
+    if visitor.unknown:
+        return info
+    info.events = tuple(sorted(visitor.events))
+    if "message" in visitor.events and not visitor.any_message:
+        info.commands = tuple(sorted(visitor.commands))
+    return info
+
+
+def index_handlers(directory: Optional[Path], modules: Iterable[str]) -> Dict[str, RouterInfo]:
+    """
+    Индекс роутеров для модулей handlers.class из project_file.toml.
+    Модули, которых ещё нет на диске (или directory=None), описываются консервативно.
+    """
+    index = {}
+    for module in modules:
+        path = Path(directory) / f"{module}.py" if directory is not None else None
+        if path is not None and path.exists():
+            index[module] = index_module(path, module)
+        else:
+            index[module] = RouterInfo(module=module, attr=f"{module}_router")
+    return index
@@ -1,11 +1,18 @@
+import hashlib
+import logging
 import os
 from enum import StrEnum
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from typing import Dict, Any, Optional, Tuple, ClassVar
+from typing import Callable, Dict, Any, Optional, Tuple, ClassVar, Type
 
 from pydantic import BaseModel
 
+from botango.core.file_lock import FileLock
+from botango.core.tracing import traced
+
+logger = logging.getLogger(__name__)
+
 DATA_PATH = Path("data")
 ENV_PATH = DATA_PATH / ".env"
 
@@ -16,6 +23,13 @@ class NamesEnv(StrEnum):
     webhook = "webhook"
     redis = "redis"
     cryptobot = "cryptobot"
+    http = "http"
+    handlers = "handlers"
+    database = "database"
+    broadcast = "broadcast"
+    throttling = "throttling"
+    metrics = "metrics"
+    tasks = "tasks"
 
 class DefaultFieldEnv(StrEnum):
     bot = "Your-bot-token"
@@ -28,10 +42,41 @@ class DefaultFieldEnv(StrEnum):
     webhook_url = "https://your-domain.com"
     webhook_path = "/webhook"
     webhook_secret = "very-secret-value"
+    webhook_host = "0.0.0.0"
+    webhook_port = "8080"
+    webhook_workers = "0"
     redis_host = "localhost"
     redis_port = "6379"
     redis_database = "0"
+    redis_max_connections = "50"
+    fsm_state_ttl = "86400"
+    fsm_data_ttl = "86400"
+    cache_ttl = "300"
+    metrics_host = "127.0.0.1"
+    metrics_port = "9100"
     cryptobot_token = "Your cryptobot token here!"
+    http_pool_limit = "100"
+    http_keepalive_timeout = "30"
+    max_concurrent_updates = "64"
+    handlers_prewarm = "0"
+    db_pool_size = "10"
+    db_max_overflow = "20"
+    db_pool_timeout = "30"
+    db_pool_recycle = "1800"
+    db_pool_pre_ping = "1"
+    db_statement_cache_size = "100"
+    broadcast_rate = "25"
+    broadcast_concurrency = "8"
+    broadcast_chunk_size = "500"
+    throttle_burst = "5"
+    throttle_period = "5"
+    throttle_max_users = "100000"
+    tasks_concurrency = "8"
+    tasks_max_attempts = "5"
+    tasks_retry_delay = "2"
+    tasks_lease = "300"
+    tasks_poll_interval = "1"
+    tasks_key_ttl = "86400"
 
 class BaseEnv(BaseModel):
     name: Optional[str] = None
@@ -57,21 +102,93 @@ class WebhookEnv(BaseEnv):
     WEBHOOK_URL: DefaultFieldEnv = DefaultFieldEnv.webhook_url
     WEBHOOK_PATH: DefaultFieldEnv = DefaultFieldEnv.webhook_path
     WEBHOOK_SECRET: DefaultFieldEnv = DefaultFieldEnv.webhook_secret
+    WEBHOOK_HOST: DefaultFieldEnv = DefaultFieldEnv.webhook_host
+    WEBHOOK_PORT: DefaultFieldEnv = DefaultFieldEnv.webhook_port
+    WEBHOOK_WORKERS: DefaultFieldEnv = DefaultFieldEnv.webhook_workers
 
 class RedisEnv(BaseEnv):
     name: NamesEnv = NamesEnv.redis
     REDIS_HOST: DefaultFieldEnv = DefaultFieldEnv.redis_host
     REDIS_PORT: DefaultFieldEnv = DefaultFieldEnv.redis_port
     REDIS_DATABASE: DefaultFieldEnv = DefaultFieldEnv.redis_database
+    REDIS_MAX_CONNECTIONS: DefaultFieldEnv = DefaultFieldEnv.redis_max_connections
+    FSM_STATE_TTL: DefaultFieldEnv = DefaultFieldEnv.fsm_state_ttl
+    FSM_DATA_TTL: DefaultFieldEnv = DefaultFieldEnv.fsm_data_ttl
+    CACHE_TTL: DefaultFieldEnv = DefaultFieldEnv.cache_ttl
 
 class CryptoBotEnv(BaseEnv):
     name: NamesEnv = NamesEnv.cryptobot
     CRYPTOBOT_TOKEN: DefaultFieldEnv = DefaultFieldEnv.cryptobot_token
 
+class HttpEnv(BaseEnv):
+    name: NamesEnv = NamesEnv.http
+    HTTP_POOL_LIMIT: DefaultFieldEnv = DefaultFieldEnv.http_pool_limit
+    HTTP_KEEPALIVE_TIMEOUT: DefaultFieldEnv = DefaultFieldEnv.http_keepalive_timeout
+    MAX_CONCURRENT_UPDATES: DefaultFieldEnv = DefaultFieldEnv.max_concurrent_updates
+
+class HandlersEnv(BaseEnv):
+    name: NamesEnv = NamesEnv.handlers
+    HANDLERS_PREWARM: DefaultFieldEnv = DefaultFieldEnv.handlers_prewarm
+
+class DatabaseEnv(BaseEnv):
+    name: NamesEnv = NamesEnv.database
+    DB_POOL_SIZE: DefaultFieldEnv = DefaultFieldEnv.db_pool_size
+    DB_MAX_OVERFLOW: DefaultFieldEnv = DefaultFieldEnv.db_max_overflow
+    DB_POOL_TIMEOUT: DefaultFieldEnv = DefaultFieldEnv.db_pool_timeout
+    DB_POOL_RECYCLE: DefaultFieldEnv = DefaultFieldEnv.db_pool_recycle
+    DB_POOL_PRE_PING: DefaultFieldEnv = DefaultFieldEnv.db_pool_pre_ping
+    DB_STATEMENT_CACHE_SIZE: DefaultFieldEnv = DefaultFieldEnv.db_statement_cache_size
+
+class BroadcastEnv(BaseEnv):
+    name: NamesEnv = NamesEnv.broadcast
+    BROADCAST_RATE: DefaultFieldEnv = DefaultFieldEnv.broadcast_rate
+    BROADCAST_CONCURRENCY: DefaultFieldEnv = DefaultFieldEnv.broadcast_concurrency
+    BROADCAST_CHUNK_SIZE: DefaultFieldEnv = DefaultFieldEnv.broadcast_chunk_size
+
+class ThrottlingEnv(BaseEnv):
+    name: NamesEnv = NamesEnv.throttling
+    THROTTLE_BURST: DefaultFieldEnv = DefaultFieldEnv.throttle_burst
+    THROTTLE_PERIOD: DefaultFieldEnv = DefaultFieldEnv.throttle_period
+    THROTTLE_MAX_USERS: DefaultFieldEnv = DefaultFieldEnv.throttle_max_users
+
+class MetricsEnv(BaseEnv):
+    name: NamesEnv = NamesEnv.metrics
+    METRICS_HOST: DefaultFieldEnv = DefaultFieldEnv.metrics_host
+    METRICS_PORT: DefaultFieldEnv = DefaultFieldEnv.metrics_port
+
+class TasksEnv(BaseEnv):
+    name: NamesEnv = NamesEnv.tasks
+    TASKS_CONCURRENCY: DefaultFieldEnv = DefaultFieldEnv.tasks_concurrency
+    TASKS_MAX_ATTEMPTS: DefaultFieldEnv = DefaultFieldEnv.tasks_max_attempts
+    TASKS_RETRY_DELAY: DefaultFieldEnv = DefaultFieldEnv.tasks_retry_delay
+    TASKS_LEASE: DefaultFieldEnv = DefaultFieldEnv.tasks_lease
+    TASKS_POLL_INTERVAL: DefaultFieldEnv = DefaultFieldEnv.tasks_poll_interval
+    TASKS_KEY_TTL: DefaultFieldEnv = DefaultFieldEnv.tasks_key_ttl
+
+
+# Переменные окружения, которые добавляются в .env при выборе компонента
+COMPONENT_ENVS: Dict[str, Type[BaseEnv]] = {
+    "aiosqlite": AiosqliteEnv,
+    "aiosqlite-docker": AiosqliteEnv,
+    "postgresql": PostgresEnv,
+    "webhook": WebhookEnv,
+    "services": BroadcastEnv,
+    "throttling": ThrottlingEnv,
+    "redis": RedisEnv,
+    "metrics": MetricsEnv,
+    "tasks": TasksEnv,
+}
+
+
+class EnvStaleError(RuntimeError):
+    """Файл .env изменён на диске во время чтения-изменения-записи."""
+
 
 class EnvCreator:
     path: ClassVar[Path] = ENV_PATH
     exclude_values: ClassVar[Tuple[str, ...]] = ("name", "comment")
+    # Сколько раз повторять изменение, если файл поменяли без блокировки
+    retries: ClassVar[int] = 5
 
     @classmethod
     def load(cls):
@@ -79,17 +196,50 @@ class EnvCreator:
         Загрузка файла .env и создание при его отсутствии.
         :return:
         """
+        data, _ = cls._load()
+        return data
+
+    @classmethod
+    @traced("env.load", "env")
+    def _load(cls) -> Tuple[Dict[str, str], str]:
+        """Чтение .env за одно обращение к диску; второй элемент — хеш содержимого."""
         if not cls.path.exists():
-            cls._create()
+            with cls.lock():
+                if not cls.path.exists():
+                    cls._create()
+        raw = cls.path.read_bytes()
         d: Dict[str, str] = {}
-        with cls.path.open("r", encoding="utf-8") as f:
-            for row in f:
-                row = row.strip()
-                if not row or row.startswith("#") or "=" not in row:
-                    continue
-                k, v = row.split("=", 1)
-                d[k.strip()] = v.strip()
-        return d
+        for row in raw.decode("utf-8").splitlines():
+            row = row.strip()
+            if not row or row.startswith("#") or "=" not in row:
+                continue
+            k, v = row.split("=", 1)
+            d[k.strip()] = v.strip()
+        return d, hashlib.sha256(raw).hexdigest()
+
+    @classmethod
+    def lock(cls) -> FileLock:
+        """Межпроцессная блокировка .env (data/.env.lock)."""
+        return FileLock(cls.path)
+
+    @classmethod
+    def _update(cls, mutate: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Чтение-изменение-запись под блокировкой.
+
+        Параллельные команды botango выполняются по очереди; если файл
+        изменили в обход блокировки (хеш содержимого не совпал перед записью),
+        изменение повторяется на свежих данных.
+        """
+        for attempt in range(1, cls.retries + 1):
+            with cls.lock():
+                data, etag = cls._load()
+                mutate(data)
+                if hashlib.sha256(cls.path.read_bytes()).hexdigest() == etag:
+                    cls._rewrite_env_file(data)
+                    return
+            logger.debug("Файл %s изменён извне — повтор %d", cls.path, attempt)
+        raise EnvStaleError(f"Файл {cls.path} постоянно изменяется извне")
 
     @classmethod
     def _create(cls):
@@ -106,18 +256,20 @@ class EnvCreator:
         return c.model_dump(exclude={"name"})
 
     @classmethod
+    @traced("env.write", "env")
     def _rewrite_env_file(cls, data: Dict[str, Any]):
         DATA_PATH.mkdir(parents=True, exist_ok=True)
-        with NamedTemporaryFile("w", delete=False, dir=DATA_PATH, encoding="utf-8") as tf:
-            for k, v in data.items():
-                if k not in cls.exclude_values:
-                    tf.write(f"{k}={v}\n")
-            tmp = tf.name
-        os.replace(tmp, cls.path)
+        with cls.lock():
+            with NamedTemporaryFile("w", delete=False, dir=DATA_PATH, encoding="utf-8") as tf:
+                for k, v in data.items():
+                    if k not in cls.exclude_values:
+                        tf.write(f"{k}={v}\n")
+                tmp = tf.name
+            os.replace(tmp, cls.path)
 
     @classmethod
-    def add(cls, model: BaseEnv):
-        data = cls.load()
+    def merge(cls, data: Dict[str, Any], model: BaseEnv) -> None:
+        """Добавляет в data недостающие переменные model (без записи на диск)."""
         if isinstance(model, AiosqliteEnv):
             [data.pop(v, None) for v in PostgresEnv().model_dump(exclude={"name"}).keys()]
         if isinstance(model, PostgresEnv):
@@ -125,10 +277,15 @@ class EnvCreator:
         for k, v in model.model_dump().items():
             if k not in data and k not in cls.exclude_values:
                 data[k] = v
-        cls._rewrite_env_file(data)
+
+    @classmethod
+    @traced("env.add", "env")
+    def add(cls, model: BaseEnv):
+        cls._update(lambda data: cls.merge(data, model))
 
     @classmethod
     def delete(cls, model: BaseEnv):
-        data = cls.load()
-        [data.pop(v, None) for v in model.model_dump().keys()]
-        cls._rewrite_env_file(data)
\ No newline at end of file
+        def mutate(data: Dict[str, Any]) -> None:
+            [data.pop(v, None) for v in model.model_dump().keys()]
+
+        cls._update(mutate)
\ No newline at end of file
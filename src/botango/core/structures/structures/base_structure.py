@@ -1,6 +1,12 @@
-from typing import Dict, Any, List
+import time
+from pathlib import Path
+from typing import Collection, Dict, Any, List, Optional
 
+from botango.core.build_manifest import BuildManifest
+from botango.core.output_sinks import DiskSink, OutputSink
 from botango.core.structures.template import Template
+from botango.core.template_render import RenderReport, TemplateRenderer
+from botango.core.tracing import span, traced
 
 
 class BaseStructure:
@@ -10,14 +16,70 @@ class BaseStructure:
     def __init__(self):
         self.data = dict(name_project=self.name)
 
-    def build_project(self, data: Dict[str, Any] = None):
+    @traced("build", "build")
+    def build_project(
+        self,
+        data: Dict[str, Any] = None,
+        workers: Optional[int] = None,
+        force: bool = False,
+        manifest: Optional[BuildManifest] = None,
+        sink: Optional[OutputSink] = None,
+        only: Optional[Collection[Path]] = None,
+    ) -> RenderReport:
         """
         Создаёт все файлы, указанные в схеме проекта.
+
+        Сборка инкрементальная: по манифесту (data/.botango-manifest.json)
+        пропускаются файлы, у которых не изменились ни шаблон, ни используемые
+        им данные, а файлы, исключённые из схемы (или чьё условие when
+        стало ложным), удаляются.
+        force=True пересобирает всё.
+
+        Шаблоны отрисовываются параллельно (см. TemplateRenderer),
+        workers=1 — последовательная сборка.
+
+        sink — куда писать файлы вместо текущего каталога: в память,
+        архив .tar.gz/.zip или другой каталог (см. botango.core.output_sinks).
+        Такая сборка всегда полная и манифест не использует; синк
+        закрывает вызывающий.
+
+        only — пути целей (target_file), которыми ограничивается сборка
+        (botango watch): остальные цели схемы не проверяются и не удаляются.
+        Файл, содержимое которого не изменилось, не перезаписывается
+        (кроме force=True) и попадает в report.unchanged.
+        Возвращает отчёт со временем отрисовки и записи каждого файла.
         """
+        started = time.perf_counter()
         data = data or {}
         self.data = self.data | data
-        for tmpl in self.schema:
-            tmpl.create(data=self.data)
+
+        candidates = self.schema if only is None else [t for t in self.schema if t.target_file in only]
+        schema = [tmpl for tmpl in candidates if tmpl.enabled(self.data)]
+        if sink is not None:
+            report = TemplateRenderer(max_workers=workers).render_all(schema, self.data, sink)
+            report.elapsed = time.perf_counter() - started
+            return report
+
+        manifest = manifest or BuildManifest.load()
+        with span("build.plan", "build", templates=len(schema)):
+            pending, skipped, stale = manifest.plan(schema, self.data, force=force)
+        if only is not None:
+            # Вне only цели не рассматривались — устаревшими считаются только отключённые из only
+            scope = {t.target_file.as_posix() for t in candidates}
+            stale = [target for target in stale if target in scope]
+        disk = DiskSink(skip_unchanged=not force)
+        report = TemplateRenderer(max_workers=workers).render_all(
+            [tmpl for tmpl, _ in pending], self.data, disk
+        )
+        report.unchanged = disk.unchanged
+        for (_, inputs), result in zip(pending, report.results):
+            manifest.record(inputs, result)
+        report.skipped = skipped
+        report.removed = [path for path in map(manifest.remove, stale) if path]
+        manifest.save()
+
+        report.elapsed = time.perf_counter() - started
+        return report
 
     def add_template(self, template: Template):
         """
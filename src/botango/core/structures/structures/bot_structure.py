@@ -1,16 +1,79 @@
 from typing import List
 
+from botango.core.project_config import DATABASE_KINDS
+
 from .base_structure import BaseStructure
 from ..template import Template
 
 
+def selected(*components: str) -> str:
+    """Условие when: выбран хотя бы один из компонентов (секция components в project_file.toml)."""
+    return " or ".join(f"{component!r} in (components or {{}}).get('class', [])" for component in components)
+
+
+# Слой базы данных: выбрана база с AsyncEngine (ключи .env остаются и после отмены выбора)
+WITH_DATABASE = selected(*DATABASE_KINDS)
+
+
+# Сервисам (рассылке) нужна база данных для получателей и прогресса
+WITH_SERVICES = f"{selected('services')} and ({WITH_DATABASE})"
+
+# Антифлуд (компонент throttling; его же подключает middlewares)
+WITH_THROTTLING = selected("throttling")
+
+# Общий клиент Redis, FSM-хранилище и кеш
+WITH_REDIS = selected("redis")
+
+# Метрики Prometheus
+WITH_METRICS = selected("metrics")
+
+# Клавиатуры из секции keyboards project_file.toml
+WITH_KEYBOARDS = selected("keyboards")
+
+# Фоновые задачи: очередь в Redis, если он выбран, иначе в базе данных
+WITH_TASKS = f"({selected('tasks')}) and ({selected('redis', *DATABASE_KINDS)})"
+
+# Режим webhook (без компонента webhook — long polling)
+WITH_WEBHOOK = selected("webhook")
+
+
 class BotStructure(BaseStructure):
     name = "bot"
     schema: List[Template] = [
         Template(base_directory="bot", target_file="main.py"),
         Template(base_directory="bot", target_file="__init__.py"),
+        Template(base_directory="bot", target_file="multiworker.py", when=WITH_WEBHOOK),
         Template(base_directory="bot/handlers", target_file="__init__.py"),
+        Template(base_directory="bot/middlewares", target_file="__init__.py"),
+        Template(base_directory="bot/middlewares", target_file="concurrency.py"),
+        Template(base_directory="bot/middlewares", target_file="database.py", when=WITH_DATABASE),
+        Template(base_directory="bot/middlewares", target_file="throttling.py", when=WITH_THROTTLING),
+        Template(base_directory="bot/database", target_file="__init__.py", when=WITH_DATABASE),
+        Template(base_directory="bot/database", target_file="engine.py", when=WITH_DATABASE),
+        Template(base_directory="bot/database", target_file="models.py", when=WITH_DATABASE),
+        Template(base_directory="bot/metrics", target_file="__init__.py", when=WITH_METRICS),
+        Template(base_directory="bot/metrics", target_file="registry.py", when=WITH_METRICS),
+        Template(base_directory="bot/metrics", target_file="middleware.py", when=WITH_METRICS),
+        Template(base_directory="bot/metrics", target_file="server.py", when=WITH_METRICS),
+        Template(
+            base_directory="bot/metrics", target_file="database.py",
+            when=f"{WITH_METRICS} and ({WITH_DATABASE})",
+        ),
+        Template(base_directory="bot/keyboards", target_file="__init__.py", when=WITH_KEYBOARDS),
+        Template(base_directory="bot/keyboards", target_file="builder.py", when=WITH_KEYBOARDS),
+        Template(base_directory="bot/keyboards", target_file="compiled.py", when=WITH_KEYBOARDS),
+        Template(base_directory="bot/cache", target_file="__init__.py", when=WITH_REDIS),
+        Template(base_directory="bot/cache", target_file="cached.py", when=WITH_REDIS),
+        Template(base_directory="bot/cache", target_file="client.py", when=WITH_REDIS),
+        Template(base_directory="bot/tasks", target_file="__init__.py", when=WITH_TASKS),
+        Template(base_directory="bot/tasks", target_file="__main__.py", when=WITH_TASKS),
+        Template(base_directory="bot/tasks", target_file="queue.py", when=WITH_TASKS),
+        Template(base_directory="bot/tasks", target_file="backends.py", when=WITH_TASKS),
+        Template(base_directory="bot/services", target_file="__init__.py", when=WITH_SERVICES),
+        Template(base_directory="bot/services", target_file="broadcast.py", when=WITH_SERVICES),
         Template(base_directory=".", target_file=".gitignore"),
+        Template(base_directory=".", target_file="requirements.txt"),
+        Template(base_directory=".", target_file="pyproject.toml"),
         Template(base_directory="settings", target_file="__init__.py"),
         Template(base_directory="settings", target_file="settings.py")
         ]
@@ -2,11 +2,15 @@ import logging
 import os
 import tempfile
 from pathlib import Path
-from typing import Any, Dict, ClassVar
+from typing import Any, Dict, ClassVar, Iterator, Optional
 
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound, TemplateSyntaxError
+from jinja2 import Environment, FileSystemLoader, Template as JinjaTemplate, TemplateNotFound, TemplateSyntaxError
 from pydantic import BaseModel, Field, ConfigDict
 
+from botango.core.project_config import DATABASE_KINDS
+from botango.core.template_cache import make_bytecode_cache
+from botango.core.tracing import span
+
 # Путь до папки с шаблонами (берётся на два уровня выше текущего файла)
 TemplateDirectory: Path = Path(__file__).resolve().parents[2] / "templates"
 
@@ -14,6 +18,46 @@ TemplateDirectory: Path = Path(__file__).resolve().parents[2] / "templates"
 logger = logging.getLogger(__name__)
 
 
+class _Environment(Environment):
+    """Среда Jinja2, в трассе которой видна компиляция шаблонов (промах кеша байткода)."""
+
+    def compile(self, source, name=None, filename=None, raw=False, defer_init=False):
+        with span("template.compile", "jinja", template=name):
+            return super().compile(source, name, filename, raw, defer_init)
+
+
+def make_environment(bytecode_cache: bool = True) -> Environment:
+    """
+    Создаёт среду Jinja2 для шаблонов botango.
+    При bytecode_cache=True скомпилированные шаблоны кешируются на диске
+    (см. botango.core.template_cache) и не компилируются заново при каждом запуске.
+    """
+    environment = _Environment(
+        loader=FileSystemLoader(TemplateDirectory),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        bytecode_cache=make_bytecode_cache(enabled=bytecode_cache),
+        # Сборка обходит всю схему: с LRU на 400 шаблонов (по умолчанию в Jinja2)
+        # схема побольше перекомпилировалась бы целиком на каждой сборке
+        cache_size=-1,
+    )
+    # Вид базы данных ("sqlite" / "postgresql") по выбранному компоненту — для шаблонов
+    environment.globals["DATABASE_KINDS"] = DATABASE_KINDS
+    return environment
+
+
+class _LazyEnvironment:
+    """
+    Дескриптор общей среды Jinja2: среда (и каталог кеша) создаётся
+    при первом обращении, а не при импорте модуля.
+    """
+
+    def __get__(self, instance: Any, owner: type) -> Environment:
+        if owner._environment is None:
+            owner._environment = make_environment()
+        return owner._environment
+
+
 class Template(BaseModel):
     """
     Класс для генерации файлов на основе Jinja2 шаблонов.
@@ -26,13 +70,13 @@ class Template(BaseModel):
     target_file: Path                   # Путь до результирующего файла
     template_file: Path                 # Путь до шаблона .j2
     data: Dict[str, Any] = Field(default_factory=dict)  # Данные для подстановки в шаблон
+    when: Optional[str] = None          # Условие Jinja2: файл создаётся, только если оно истинно
 
     # Конфигурация Jinja2 — общий объект среды для всех шаблонов
-    environment: ClassVar[Environment] = Environment(
-        loader=FileSystemLoader(TemplateDirectory),
-        trim_blocks=True,
-        lstrip_blocks=True
-    )
+    environment: ClassVar[Environment] = _LazyEnvironment()
+    _environment: ClassVar[Optional[Environment]] = None
+    # Скомпилированные условия when: одно выражение на все сборки процесса
+    _conditions: ClassVar[Dict[str, Any]] = {}
 
     # Разрешаем использование произвольных типов (например Path)
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -55,14 +99,58 @@ class Template(BaseModel):
             **_pydantic_kwargs
         )
 
-    def _render(self) -> str:
+    @classmethod
+    def configure_environment(cls, bytecode_cache: bool = True) -> None:
+        """Пересоздаёт общую среду Jinja2 (например, чтобы отключить кеш байткода)."""
+        Template._environment = make_environment(bytecode_cache=bytecode_cache)
+        Template._conditions = {}
+
+    @property
+    def template_name(self) -> str:
+        """Имя шаблона в загрузчике Jinja2 (всегда с прямыми слешами)."""
+        return self.template_file.as_posix()
+
+    def enabled(self, data: Dict[str, Any] = None) -> bool:
         """
-        Отрисовывает шаблон Jinja2 с переданными данными.
-        Возвращает итоговый текст для записи в файл.
+        Проверяет условие when на данных проекта.
+        Например, when="DB_NAME or POSTGRES_NAME" — файл нужен только с базой данных.
+        """
+        if not self.when:
+            return True
+        condition = Template._conditions.get(self.when)
+        if condition is None:
+            condition = Template._conditions[self.when] = self.environment.compile_expression(self.when)
+        return bool(condition(**(self.data | (data or {}))))
+
+    def source(self) -> str:
+        """Возвращает исходный текст .j2-шаблона."""
+        source, _, _ = self.environment.loader.get_source(self.environment, self.template_name)
+        return source
+
+    def render(self, data: Dict[str, Any] = None) -> str:
+        """
+        Отрисовывает шаблон Jinja2, не изменяя состояние экземпляра.
+
+        Данные экземпляра объединяются с переданными только на время вызова,
+        поэтому метод безопасно вызывать из нескольких потоков одновременно.
+        """
+        context = self.data | (data or {})
+        return self._load().render(**context)
+
+    def stream(self, data: Dict[str, Any] = None) -> Iterator[str]:
+        """
+        Отрисовывает шаблон кусками (jinja2 generate()): текст отдаётся
+        по мере отрисовки, целая строка не собирается. Результат
+        побайтно совпадает с render().
         """
+        context = self.data | (data or {})
+        return self._load().generate(**context)
+
+    def _load(self) -> JinjaTemplate:
+        """Шаблон из среды Jinja2 (из кеша, кеша байткода или с компиляцией)."""
         try:
-            tpl = self.environment.get_template(name=str(self.template_file))
-            return tpl.render(**self.data)
+            with span("template.lookup", "jinja", template=self.template_name):
+                return self.environment.get_template(name=self.template_name)
         except TemplateNotFound:
             logger.exception("Template not found: %s", self.template_file)
             raise
@@ -70,15 +158,26 @@ class Template(BaseModel):
             logger.exception("Syntax error in template: %s", self.template_file)
             raise
 
-    def _write_atomic(self, content: str):
+    def _render(self) -> str:
+        """
+        Отрисовывает шаблон Jinja2 с переданными данными.
+        Возвращает итоговый текст для записи в файл.
+        """
+        return self.render()
+
+    def _write_atomic(self, content: str, make_dirs: bool = True):
         """
         Безопасная запись файла через временный файл (atomic write).
 
         1. Создаётся временный файл.
         2. В него записывается содержимое.
         3. Временный файл заменяет целевой — без риска частичной записи.
+
+        make_dirs=False позволяет пропустить создание каталога, если
+        каталоги уже созданы заранее (например, пакетно в TemplateRenderer).
         """
-        self.target_file.parent.mkdir(parents=True, exist_ok=True)
+        if make_dirs:
+            self.target_file.parent.mkdir(parents=True, exist_ok=True)
         fd, tmp_path = tempfile.mkstemp(dir=str(self.target_file.parent))
         try:
             with os.fdopen(fd, "w", encoding="utf-8") as f:
@@ -96,4 +195,4 @@ class Template(BaseModel):
         data = data if data else {}
         self.data = self.data | data
         rows = self._render()
-        self._write_atomic(rows)
\ No newline at end of file
+        self._write_atomic(rows)
@@ -0,0 +1,90 @@
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from botango import __version__
+
+if TYPE_CHECKING:
+    from jinja2 import FileSystemBytecodeCache
+
+logger = logging.getLogger(__name__)
+
+# Переменные окружения для управления кешем
+CACHE_DIR_ENV = "BOTANGO_CACHE_DIR"
+NO_CACHE_ENV = "BOTANGO_NO_CACHE"
+
+
+def cache_root() -> Path:
+    """
+    Корневой каталог кеша botango.
+
+    Порядок выбора: $BOTANGO_CACHE_DIR, $XDG_CACHE_HOME/botango,
+    %LOCALAPPDATA%/botango (Windows), ~/.cache/botango.
+    """
+    explicit = os.getenv(CACHE_DIR_ENV)
+    if explicit:
+        return Path(explicit)
+    base = os.getenv("XDG_CACHE_HOME") or (os.name == "nt" and os.getenv("LOCALAPPDATA"))
+    return Path(base) / "botango" if base else Path.home() / ".cache" / "botango"
+
+
+def bytecode_cache_dir() -> Path:
+    """
+    Каталог скомпилированных шаблонов текущей версии botango.
+
+    Внутри каталога Jinja2 сама сверяет контрольную сумму исходника шаблона
+    и версию байткода Python, поэтому изменённый шаблон перекомпилируется.
+    """
+    return cache_root() / __version__ / "jinja"
+
+
+def lock_cache_dir() -> Path:
+    """Каталог закешированных результатов uv lock (общий для всех версий botango)."""
+    return cache_root() / "locks"
+
+
+def cache_disabled() -> bool:
+    return os.getenv(NO_CACHE_ENV, "").lower() in ("1", "true", "yes")
+
+
+def make_bytecode_cache(enabled: bool = True) -> Optional["FileSystemBytecodeCache"]:
+    """
+    Создаёт дисковый кеш байткода шаблонов.
+    Возвращает None, если кеш отключён или каталог недоступен для записи.
+    """
+    if not enabled or cache_disabled():
+        return None
+    directory = bytecode_cache_dir()
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        logger.warning("Каталог кеша %s недоступен — кеш шаблонов отключён", directory)
+        return None
+    from jinja2 import FileSystemBytecodeCache
+
+    return FileSystemBytecodeCache(str(directory))
+
+
+def clear_cache(locks: bool = False) -> int:
+    """
+    Удаляет скомпилированные шаблоны всех версий botango, а при locks=True —
+    и закешированные результаты uv lock. Возвращает количество удалённых файлов.
+    """
+    root = cache_root()
+    if not root.exists():
+        return 0
+    directories = [path for path in root.glob("*/jinja") if path.is_dir()]
+    if locks:
+        directories.append(lock_cache_dir())
+    removed = 0
+    for directory in directories:
+        if not directory.exists():
+            continue
+        removed += sum(1 for p in directory.rglob("*") if p.is_file())
+        shutil.rmtree(directory, ignore_errors=True)
+        # Пустой каталог версии больше не нужен
+        if directory.parent != root and not any(directory.parent.iterdir()):
+            directory.parent.rmdir()
+    return removed
@@ -0,0 +1,162 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from botango.core import tracing
+from botango.core.output_sinks import DiskSink, OutputSink
+from botango.core.structures.template import Template
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RenderResult:
+    """Результат отрисовки одного шаблона с замерами времени (в секундах)."""
+
+    target: Path
+    render_time: float
+    write_time: float
+    size: int
+    digest: str = ""
+
+    @property
+    def total_time(self) -> float:
+        return self.render_time + self.write_time
+
+
+@dataclass
+class RenderReport:
+    """Сводный отчёт о сборке проекта."""
+
+    workers: int
+    elapsed: float = 0.0
+    results: List[RenderResult] = field(default_factory=list)
+    skipped: List[Path] = field(default_factory=list)   # цели без изменений
+    removed: List[Path] = field(default_factory=list)   # цели, удалённые из схемы
+    unchanged: List[Path] = field(default_factory=list)  # отрисованы, но совпали с файлом на диске
+
+    @property
+    def files(self) -> int:
+        return len(self.results)
+
+    @property
+    def written(self) -> int:
+        return len(self.results) - len(self.unchanged)
+
+    def slowest(self, count: int = 5) -> List[RenderResult]:
+        """Возвращает самые медленные файлы — удобно для поиска узких мест."""
+        return sorted(self.results, key=lambda r: r.total_time, reverse=True)[:count]
+
+
+class _Timed:
+    """Итератор кусков шаблона, который считает время, потраченное на их отрисовку."""
+
+    __slots__ = ("chunks", "elapsed")
+
+    def __init__(self, chunks: Iterable[str]):
+        self.chunks = iter(chunks)
+        self.elapsed = 0.0
+
+    def __iter__(self) -> Iterator[str]:
+        return self
+
+    def __next__(self) -> str:
+        started = time.perf_counter()
+        try:
+            return next(self.chunks)
+        finally:
+            self.elapsed += time.perf_counter() - started
+
+
+class TemplateRenderer:
+    """
+    Движок отрисовки шаблонов проекта.
+
+    Шаблоны рендерятся параллельно в пуле потоков и кусками
+    (Template.stream) передаются в синк: по умолчанию DiskSink —
+    атомарная запись в текущий каталог, — или в архив / память
+    (см. botango.core.output_sinks). Синк один раз до начала отрисовки
+    готовит каталоги всех целей. Результат побайтно совпадает
+    с последовательной сборкой через Template.render.
+
+    max_workers=1 выполняет сборку последовательно в текущем потоке,
+    None — размер пула по умолчанию, как у ThreadPoolExecutor.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers должен быть >= 1")
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+
+    @staticmethod
+    def prepare_directories(templates: Sequence[Template]) -> None:
+        """Пакетно создаёт каталоги для всех целевых файлов (каждый — один раз)."""
+        DiskSink().prepare([t.target_file for t in templates])
+
+    @staticmethod
+    def _render_one(template: Template, data: Dict[str, Any], sink: OutputSink) -> RenderResult:
+        started = time.perf_counter()
+        chunks = _Timed(template.stream(data))
+        # Поиск и компиляция шаблона (в stream до первого куска) — тоже отрисовка
+        chunks.elapsed = time.perf_counter() - started
+        size, digest = sink.write(template.target_file, chunks)
+        total = time.perf_counter() - started
+        # Отрисовка и запись чередуются: запись — всё, кроме отрисовки кусков
+        result = RenderResult(
+            target=template.target_file,
+            render_time=chunks.elapsed,
+            write_time=max(total - chunks.elapsed, 0.0),
+            size=size,
+            digest=digest,
+        )
+        tracer = tracing.current()
+        if tracer is not None:
+            # Отрисовка и запись чередуются кусками — в трассе это суммарные
+            # интервалы render и write внутри интервала шаблона
+            args = {"target": result.target, "size": size}
+            tracer.add("template", "template", started, total, args)
+            tracer.add("template.render", "template", started, result.render_time, args)
+            tracer.add("template.write", "template", started + result.render_time, result.write_time, args)
+        logger.debug(
+            "%s: render %.2f ms, write %.2f ms",
+            result.target, result.render_time * 1000, result.write_time * 1000,
+        )
+        return result
+
+    def render_all(
+        self,
+        templates: Sequence[Template],
+        data: Dict[str, Any] = None,
+        sink: Optional[OutputSink] = None,
+    ) -> RenderReport:
+        """
+        Отрисовывает все шаблоны и записывает их в sink (по умолчанию —
+        на диск в текущий каталог). Синк не закрывается: архив можно
+        дописать или закрыть вызывающему.
+        Возвращает отчёт с временем по каждому файлу в порядке схемы.
+        """
+        data = data or {}
+        sink = sink or DiskSink()
+        started = time.perf_counter()
+        sink.prepare([t.target_file for t in templates])
+
+        if self.max_workers == 1 or len(templates) <= 1:
+            report = RenderReport(workers=1)
+            report.results = [self._render_one(t, data, sink) for t in templates]
+        else:
+            report = RenderReport(workers=min(self.max_workers, len(templates)))
+            with ThreadPoolExecutor(max_workers=report.workers) as executor:
+                report.results = list(
+                    executor.map(lambda t: self._render_one(t, data, sink), templates)
+                )
+
+        report.elapsed = time.perf_counter() - started
+        logger.debug(
+            "Создано файлов: %d за %.2f ms (потоков: %d)",
+            report.files, report.elapsed * 1000, report.workers,
+        )
+        return report
@@ -1,16 +1,34 @@
+import hashlib
 import logging
 import os
 import tempfile
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import toml
 
+from botango.core.file_lock import FileLock
+from botango.core.tracing import traced
+
 logger = logging.getLogger(__name__)
 
 
-# Тип, который мы храним: mapping class_name -> {"class": [values...]}
-TomlData = Dict[str, Dict[str, List[str]]]
+# Тип, который мы храним: mapping class_name -> {"class": [values...]}.
+# Остальные ключи секции (например, таблицы [keyboards.<name>]) сохраняются как есть.
+TomlData = Dict[str, Dict[str, Any]]
+
+
+class _InlineTableEncoder(toml.TomlEncoder):
+    """
+    Таблицы внутри массивов записываются как inline-таблицы:
+    rows = [[{text = "Да", callback = "yes"}]]. Стандартный кодировщик
+    toml записывает от них только список ключей.
+    """
+
+    def dump_value(self, v):
+        if isinstance(v, dict):
+            return self.dump_inline_table(v).strip()
+        return super().dump_value(v)
 
 
 class TomlCreator:
@@ -23,10 +41,17 @@ class TomlCreator:
     """
 
     encoding = "utf-8"
+    # Сколько раз повторять изменение, если файл поменяли без блокировки
+    retries = 5
 
     def __init__(self, name_file: str):
         self.path = Path(name_file)
 
+    def lock(self) -> FileLock:
+        """Межпроцессная блокировка файла (project_file.toml.lock)."""
+        return FileLock(self.path)
+
+    @traced("toml.write", "toml")
     def write(self, data: TomlData) -> None:
         """Атомарно записать данные в toml-файл (перезаписывает полностью)."""
         # ensure parent dir exists
@@ -34,122 +59,235 @@ class TomlCreator:
             self.path.parent.mkdir(parents=True, exist_ok=True)
 
         # atomic write via mkstemp + replace
-        fd, tmp_path = tempfile.mkstemp(dir=str(self.path.parent))
-        try:
-            with os.fdopen(fd, "w", encoding=self.encoding) as f:
-                toml.dump(data, f)
-            os.replace(tmp_path, str(self.path))
-            logger.debug("Файл %s создан/обновлен", self.path)
-        finally:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+        with self.lock():
+            fd, tmp_path = tempfile.mkstemp(dir=str(self.path.parent))
+            try:
+                with os.fdopen(fd, "w", encoding=self.encoding) as f:
+                    toml.dump(data, f, encoder=_InlineTableEncoder())
+                os.replace(tmp_path, str(self.path))
+                logger.debug("Файл %s создан/обновлен", self.path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
 
     def read(self) -> TomlData:
         """Прочитать toml-файл. Если файла нет — вернуть пустой dict."""
+        data, _ = self._load()
+        return data
+
+    @traced("toml.read", "toml")
+    def _load(self) -> Tuple[TomlData, Optional[str]]:
+        """
+        Прочитать и нормализовать файл за одно чтение с диска.
+        Вторым элементом возвращается хеш содержимого (None, если файла нет) —
+        по нему сессия определяет, что файл изменили со стороны.
+        """
         if not self.path.exists():
             logger.debug("Файл %s не найден — возвращаю пустой словарь", self.path)
-            return {}
+            return {}, None
         try:
-            with self.path.open("r", encoding=self.encoding) as f:
-                data = toml.load(f)
-            # Нормализуем структуру — гарантируем нужную форму
-            normalized: TomlData = {}
-            for k, v in data.items():
-                if isinstance(v, dict):
-                    vals = v.get("class", [])
-                    if isinstance(vals, list):
-                        normalized[k] = {"class": [str(x) for x in vals]}
-                    else:
-                        # если "class" не список — приводим к списку
-                        normalized[k] = {"class": [str(vals)]}
-                else:
-                    # если запись некорректного формата — приводим в ожидаемую форму
-                    normalized[k] = {"class": [str(v)]}
+            raw = self.path.read_bytes()
+            data = toml.loads(raw.decode(self.encoding))
             logger.debug("Файл %s прочитан", self.path)
-            return normalized
+            return self._normalize(data), hashlib.sha256(raw).hexdigest()
         except Exception:
             logger.exception("Ошибка при чтении %s", self.path)
             raise
 
+    def _fingerprint(self) -> Optional[str]:
+        """Хеш текущего содержимого файла (None, если файла нет)."""
+        try:
+            return hashlib.sha256(self.path.read_bytes()).hexdigest()
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _normalize(data: Dict) -> TomlData:
+        # Нормализуем структуру — гарантируем нужную форму
+        normalized: TomlData = {}
+        for k, v in data.items():
+            if isinstance(v, dict):
+                vals = v.get("class", [])
+                if isinstance(vals, list):
+                    normalized[k] = {**v, "class": [str(x) for x in vals]}
+                else:
+                    # если "class" не список — приводим к списку
+                    normalized[k] = {**v, "class": [str(vals)]}
+            else:
+                # если запись некорректного формата — приводим в ожидаемую форму
+                normalized[k] = {"class": [str(v)]}
+        return normalized
+
+    def session(self) -> "TomlSession":
+        """
+        Транзакционная сессия: файл читается один раз, изменения копятся
+        в памяти и записываются одной атомарной записью при выходе из блока.
+
+            with creator.session() as s:
+                for name in handlers:
+                    s.add_value("handlers", name)
+        """
+        return TomlSession(self)
+
+    @traced("toml.rewrite", "toml")
     def rewrite(self, data: TomlData, *, prefer_new: bool = True) -> None:
         """
         Объединить существующие данные и новые и записать в файл.
         По умолчанию prefer_new=True — новые значения перезаписывают существующие.
         Если prefer_new=False — существующие значения будут иметь приоритет (existing wins).
         """
-        existing = self.read()
-        merged: TomlData = {}
+        self._apply(lambda s: s.rewrite(data, prefer_new=prefer_new))
+
+    def add_model(self, name: str) -> None:
+        """Добавить новую модель (секцию) с пустым списком 'class'."""
+        self._apply(lambda s: s.add_model(name))
 
-        # start from existing, then update with data or vice versa depending on prefer_new
-        base = existing if not prefer_new else {}
-        overlay = data if prefer_new else {}
+    def add_value(self, class_name: str, value: str) -> None:
+        """
+        Добавить значение в список class для секции class_name.
+        Если секции нет — создаём её.
+        """
+        self._apply(lambda s: s.add_value(class_name, value))
 
-        # merge base first
-        for k, v in existing.items():
-            merged[k] = {"class": list(v.get("class", []))}
+    def delete_class(self, class_name: str) -> None:
+        self._apply(lambda s: s.delete_class(class_name))
 
-        # apply overlay (new data)
+    def delete_value(self, class_name: str, value: str) -> None:
+        self._apply(lambda s: s.delete_value(class_name, value))
+
+    def _apply(self, operation: Callable[["TomlSession"], None]) -> None:
+        """
+        Выполнить одно изменение в отдельной сессии.
+        Если файл изменили в обход блокировки, изменение повторяется
+        на свежих данных, а не затирает чужую запись.
+        """
+        for attempt in range(1, self.retries + 1):
+            try:
+                with self.session() as s:
+                    operation(s)
+                return
+            except TomlStaleError:
+                if attempt == self.retries:
+                    raise
+                logger.debug("Файл %s изменён извне — повтор %d", self.path, attempt)
+
+
+class TomlStaleError(RuntimeError):
+    """Файл изменён на диске другим процессом во время сессии."""
+
+
+class TomlSession:
+    """
+    Сессия изменений toml-файла в памяти.
+
+    Для каждой секции, помимо списка значений (порядок сохраняется),
+    хранится множество — проверка наличия значения выполняется за O(1).
+    На всё время сессии удерживается межпроцессная блокировка, поэтому
+    параллельные команды botango выполняются по очереди.
+    При выходе из блока без исключений все изменения записываются
+    одной атомарной записью; если файл за это время изменили на диске
+    в обход блокировки, выбрасывается TomlStaleError и ничего не записывается.
+    """
+
+    def __init__(self, creator: TomlCreator):
+        self.creator = creator
+        self.data: TomlData = {}
+        self._index: Dict[str, Set[str]] = {}
+        self._fingerprint: Optional[str] = None
+        self._dirty = False
+        self._lock = creator.lock()
+
+    def __enter__(self) -> "TomlSession":
+        self._lock.acquire()
+        try:
+            self.data, self._fingerprint = self.creator._load()
+        except BaseException:
+            self._lock.release()
+            raise
+        self._index = {k: set(v["class"]) for k, v in self.data.items()}
+        self._dirty = False
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            self._lock.release()
+
+    def flush(self) -> None:
+        """Записать накопленные изменения (если они есть)."""
+        if not self._dirty:
+            return
+        if self.creator._fingerprint() != self._fingerprint:
+            raise TomlStaleError(f"Файл {self.creator.path} изменён во время сессии")
+        self.creator.write(self.data)
+        self._fingerprint = self.creator._fingerprint()
+        self._dirty = False
+
+    def _section(self, class_name: str) -> List[str]:
+        if class_name not in self.data:
+            self.data[class_name] = {"class": []}
+            self._index[class_name] = set()
+            self._dirty = True
+        return self.data[class_name]["class"]
+
+    def __contains__(self, class_name: str) -> bool:
+        return class_name in self.data
+
+    def has_value(self, class_name: str, value: str) -> bool:
+        return value in self._index.get(class_name, ())
+
+    def rewrite(self, data: TomlData, *, prefer_new: bool = True) -> None:
         for k, v in data.items():
+            if k in self.data and not prefer_new:
+                continue
             # ensure proper shape
             vals = v.get("class") if isinstance(v, dict) else None
-            if vals is None:
-                vals = []
-            # replace or create
-            merged[k] = {"class": list(vals)}
-
-        self.write(merged)
+            values = [str(x) for x in (vals or [])]
+            merged = {**self.data.get(k, {}), "class": values}
+            # Повторная запись того же содержимого не трогает файл
+            if self.data.get(k) == merged:
+                continue
+            self.data[k] = merged
+            self._index[k] = set(values)
+            self._dirty = True
 
     def add_model(self, name: str) -> None:
-        """Добавить новую модель (секцию) с пустым списком 'class'."""
-        data = self.read()
-        if name in data:
+        if name in self.data:
             logger.info("Модель %s уже существует", name)
             return
-        data[name] = {"class": []}
-        self.write(data)
+        self._section(name)
         logger.info("Модель %s успешно добавлена", name)
 
     def add_value(self, class_name: str, value: str) -> None:
-        """
-        Добавить значение в список class для секции class_name.
-        Если секции нет — создаём её.
-        """
-        data = self.read()
-        section = data.setdefault(class_name, {"class": []})
-        values = section.get("class")
-        if not isinstance(values, list):
-            values = []
-            section["class"] = values
-
-        if value in values:
+        values = self._section(class_name)
+        if value in self._index[class_name]:
             logger.info("Значение %s уже присутствует в модели %s", value, class_name)
             return
-
         values.append(value)
-        self.write(data)
+        self._index[class_name].add(value)
+        self._dirty = True
         logger.info("Значение %s добавлено в модель %s", value, class_name)
 
     def delete_class(self, class_name: str) -> None:
-        data = self.read()
-        if class_name in data:
-            del data[class_name]
-            self.write(data)
+        if class_name in self.data:
+            del self.data[class_name]
+            del self._index[class_name]
+            self._dirty = True
             logger.info("Модель %s успешно удалена", class_name)
         else:
             logger.info("Модель %s не найдена", class_name)
 
     def delete_value(self, class_name: str, value: str) -> None:
-        data = self.read()
-        section = data.get(class_name)
-        if not section:
+        if class_name not in self.data:
             logger.info("Модель %s не найдена", class_name)
             return
-        values = section.get("class", [])
-        if value in values:
-            values.remove(value)
-            # если список стал пуст — можно оставить секцию или удалить её — здесь оставим пустую
-            section["class"] = values
-            self.write(data)
+        if value in self._index[class_name]:
+            # секция остаётся, даже если список стал пуст
+            self.data[class_name]["class"].remove(value)
+            self._index[class_name].discard(value)
+            self._dirty = True
             logger.info("Значение %s удалено из модели %s", value, class_name)
         else:
             logger.info("Значение %s не найдено в модели %s", value, class_name)
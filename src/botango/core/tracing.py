@@ -0,0 +1,165 @@
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Начало отсчёта времени трассы: импорт модуля (botango.cli импортирует его первым)
+_ORIGIN = time.perf_counter()
+
+
+class _NullSpan:
+    """Пустой интервал: трассировка выключена."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "started")
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.add(self.name, self.cat, self.started, time.perf_counter() - self.started, self.args)
+
+
+class Tracer:
+    """
+    Хронология фаз команды в формате Chrome Trace Event (ph="X"):
+    файл открывается в chrome://tracing и https://ui.perfetto.dev.
+    Интервалы добавляются из нескольких потоков (отрисовка шаблонов).
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.events: List[Dict[str, Any]] = []
+        self._threads: Dict[int, Tuple[int, str]] = {}
+        self._lock = threading.Lock()
+
+    def _tid(self) -> int:
+        ident = threading.get_ident()
+        thread = self._threads.get(ident)
+        if thread is None:
+            with self._lock:
+                thread = self._threads.setdefault(ident, (len(self._threads) + 1, threading.current_thread().name))
+        return thread[0]
+
+    def add(self, name: str, cat: str, started: float, duration: float, args: Optional[Dict[str, Any]] = None) -> None:
+        """Добавляет интервал; started — значение time.perf_counter(), duration — секунды."""
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": (started - _ORIGIN) * 1e6,
+            "dur": duration * 1e6,
+            "pid": self.pid,
+            "tid": self._tid(),
+        }
+        if args:
+            event["args"] = {key: value if isinstance(value, (int, float, bool)) else str(value)
+                             for key, value in args.items()}
+        self.events.append(event)
+
+    def span(self, name: str, cat: str, args: Dict[str, Any]) -> _Span:
+        return _Span(self, name, cat, args)
+
+    def summary(self) -> List[Tuple[str, int, float]]:
+        """
+        (фаза, число интервалов, суммарное время в секундах), по убыванию времени.
+        Время вложенных фаз входит и в родительскую (env.add включает env.load).
+        """
+        totals: Dict[str, List[float]] = {}
+        for event in self.events:
+            total = totals.setdefault(event["name"], [0, 0.0])
+            total[0] += 1
+            total[1] += event["dur"] / 1e6
+        return sorted(((name, int(count), dur) for name, (count, dur) in totals.items()), key=lambda r: -r[2])
+
+    def dump(self, path: Union[str, Path]) -> None:
+        threads = [
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+            for tid, name in self._threads.values()
+        ]
+        Path(path).write_text(
+            json.dumps({"traceEvents": threads + self.events, "displayTimeUnit": "ms"}),
+            encoding="utf-8",
+        )
+
+
+# Текущая трасса; None — трассировка выключена и span() ничего не делает
+_tracer: Optional[Tracer] = None
+
+
+def span(name: str, cat: str, **args: Any) -> Union[_Span, _NullSpan]:
+    """
+    Интервал трассы:
+
+        with span("env.load", "env", path=cls.path):
+            ...
+
+    name — фаза в сводке --trace, cat — группа в просмотрщике.
+    Без трассировки возвращается общий пустой контекст: стоимость
+    вызова — одна проверка глобальной переменной.
+    """
+    if _tracer is None:
+        return _NULL_SPAN
+    return _tracer.span(name, cat, args)
+
+
+def traced(name: str, cat: str) -> Callable[[F], F]:
+    """
+    Декоратор: каждый вызов функции — интервал name трассы.
+
+        @classmethod
+        @traced("env.add", "env")
+        def add(cls, model): ...
+    """
+    def decorator(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return fn(*args, **kwargs)
+            with _tracer.span(name, cat, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current() -> Optional[Tracer]:
+    return _tracer
+
+
+def enable() -> Tracer:
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable() -> Optional[Tracer]:
+    """Выключает трассировку и возвращает собранную трассу."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
@@ -0,0 +1,347 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from jinja2 import meta
+
+from botango.core.keyboards import compile_keyboards
+from botango.core.project_config import config
+from botango.core.router_index import index_handlers
+from botango.core.structures.env_configuration import EnvCreator
+from botango.core.structures.structures.base_structure import BaseStructure
+from botango.core.structures.structures.bot_structure import BotStructure
+from botango.core.structures.template import Template, TemplateDirectory
+from botango.core.template_render import RenderReport
+from botango.core.toml_creator import TomlCreator
+
+logger = logging.getLogger(__name__)
+
+PROJECT_FILE = Path("project_file.toml")
+
+# Шаблон с динамическим {% include name %} зависит от любого ключа контекста
+ANY_KEY = "*"
+
+
+def load_context(project_file: Path = PROJECT_FILE) -> Dict[str, Any]:
+    """Данные сборки — как в newbot: .env, project_file.toml и производные от них."""
+    project = TomlCreator(str(project_file)).read()
+    handlers = project.get("handlers", {}).get("class", [])
+    requirements = config.get_requirements(project.get("components", {}).get("class", []))
+    routers = index_handlers(Path(BotStructure.name) / "handlers", handlers)
+    return EnvCreator.load() | project | {
+        "requirements": [r.pack() for r in requirements],
+        "routers": {name: info.pack() for name, info in routers.items()},
+        "keyboard_specs": compile_keyboards(project.get("keyboards", {})),
+    }
+
+
+def changed_keys(old: Dict[str, Any], new: Dict[str, Any]) -> Set[str]:
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+class DependencyIndex:
+    """
+    Обратный индекс: ключ контекста -> цели, шаблоны которых его читают
+    (jinja2.meta.find_undeclared_variables, вместе с подключаемыми через
+    include/import/extends), и .j2-файл -> цели, которые от него зависят.
+
+    Ключи из условий when индексируются отдельно: цель затрагивается,
+    только если условие на старых и новых данных даёт разный результат.
+    """
+
+    def __init__(self, templates: Sequence[Template]):
+        self.templates: Dict[Path, Template] = {t.target_file: t for t in templates}
+        self.variables: Dict[Path, FrozenSet[str]] = {}
+        self.conditions: Dict[Path, FrozenSet[str]] = {}
+        self.sources: Dict[Path, FrozenSet[str]] = {}
+        for template in templates:
+            self._index(template)
+
+    def _parse(self, name: str) -> Tuple[Set[str], Set[str]]:
+        """Переменные шаблона name и подключаемых им шаблонов; второй элемент — имена файлов."""
+        environment = Template.environment
+        variables: Set[str] = set()
+        sources: Set[str] = set()
+        pending = [name]
+        while pending:
+            current = pending.pop()
+            if current in sources:
+                continue
+            sources.add(current)
+            source, _, _ = environment.loader.get_source(environment, current)
+            ast = environment.parse(source)
+            variables |= meta.find_undeclared_variables(ast)
+            for referenced in meta.find_referenced_templates(ast):
+                if referenced is None:
+                    variables.add(ANY_KEY)
+                else:
+                    pending.append(referenced)
+        return variables, sources
+
+    def _index(self, template: Template) -> None:
+        variables, sources = self._parse(template.template_name)
+        self.variables[template.target_file] = frozenset(variables)
+        self.sources[template.target_file] = frozenset(sources)
+        if template.when:
+            ast = Template.environment.parse(f"{{{{ {template.when} }}}}")
+            self.conditions[template.target_file] = frozenset(meta.find_undeclared_variables(ast))
+
+    def dependents(self, template_name: str) -> Set[Path]:
+        """Цели, которые зависят от .j2-файла template_name; их индекс обновляется."""
+        targets = {target for target, names in self.sources.items() if template_name in names}
+        for target in targets:
+            self._index(self.templates[target])
+        return targets
+
+    def affected(self, old: Dict[str, Any], new: Dict[str, Any], keys: Optional[Set[str]] = None) -> Set[Path]:
+        """Цели, которые нужно пересобрать после изменения данных old -> new."""
+        keys = changed_keys(old, new) if keys is None else keys
+        if not keys:
+            return set()
+        targets = set()
+        for target, template in self.templates.items():
+            if keys & self.conditions.get(target, frozenset()) and template.enabled(old) != template.enabled(new):
+                targets.add(target)
+            elif template.enabled(new) and (ANY_KEY in self.variables[target] or keys & self.variables[target]):
+                targets.add(target)
+        return targets
+
+
+@dataclass
+class WatchUpdate:
+    """Результат обработки одной пачки изменений."""
+
+    keys: Set[str] = field(default_factory=set)
+    templates: Set[str] = field(default_factory=set)
+    targets: Set[Path] = field(default_factory=set)
+    report: Optional[RenderReport] = None
+    elapsed: float = 0.0
+
+
+class LiveBuilder:
+    """
+    Пересобирает только цели, затронутые изменением .env,
+    project_file.toml или .j2-шаблонов.
+    """
+
+    def __init__(self, structure: type = BotStructure, project_file: Path = PROJECT_FILE):
+        self.structure = structure
+        self.project_file = Path(project_file)
+        self.index = DependencyIndex(structure.schema)
+        self.data = load_context(self.project_file)
+
+    @property
+    def files(self) -> List[Path]:
+        return [EnvCreator.path, self.project_file]
+
+    @property
+    def directories(self) -> List[Path]:
+        return [TemplateDirectory]
+
+    def _structure(self) -> BaseStructure:
+        # Новый экземпляр: данные не накапливаются между сборками (удалённые ключи .env)
+        return self.structure()
+
+    def build_all(self, workers: Optional[int] = None) -> RenderReport:
+        """Инкрементальная сборка всей схемы — синхронизация перед наблюдением."""
+        return self._structure().build_project(data=self.data, workers=workers)
+
+    def apply(self, changed: Iterable[Path]) -> WatchUpdate:
+        started = time.perf_counter()
+        update = WatchUpdate()
+        data_files = {path.resolve() for path in self.files}
+        templates_root = TemplateDirectory.resolve()
+        reload = False
+        for path in map(Path.resolve, changed):
+            if path in data_files:
+                reload = True
+            elif path.suffix == ".j2" and path.is_relative_to(templates_root):
+                name = path.relative_to(templates_root).as_posix()
+                update.templates.add(name)
+                update.targets |= self.index.dependents(name)
+
+        if reload:
+            new = load_context(self.project_file)
+            update.keys = changed_keys(self.data, new)
+            update.targets |= self.index.affected(self.data, new, update.keys)
+            self.data = new
+        if update.targets:
+            update.report = self._structure().build_project(data=self.data, workers=1, only=update.targets)
+        update.elapsed = time.perf_counter() - started
+        return update
+
+
+# --- отслеживание изменений файлов ---
+
+class PollingWatcher:
+    """Опрос mtime/размера файлов раз в interval секунд — работает везде."""
+
+    def __init__(self, files: Sequence[Path], directories: Sequence[Path], interval: float = 0.5):
+        self.files = [Path(p) for p in files]
+        self.directories = [Path(p) for p in directories]
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        paths = list(self.files)
+        for directory in self.directories:
+            paths.extend(p for p in directory.rglob("*.j2"))
+        snapshot = {}
+        for path in paths:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout: float) -> Set[Path]:
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {p for p in snapshot.keys() | self._snapshot.keys() if snapshot.get(p) != self._snapshot.get(p)}
+            self._snapshot = snapshot
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    inotify (Linux) через ctypes, без сторонних пакетов. Наблюдаются
+    каталоги, а не файлы: редакторы сохраняют файл через rename,
+    и наблюдение за самим файлом после этого теряется.
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_ISDIR = 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self, files: Sequence[Path], directories: Sequence[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.files = {Path(p).resolve() for p in files}
+        self._watches: Dict[int, Path] = {}
+        self._recursive: Set[Path] = set()
+        try:
+            for path in self.files:
+                self._watch(path.parent)
+            for directory in directories:
+                directory = Path(directory).resolve()
+                self._recursive.add(directory)
+                for sub in [directory, *(p for p in directory.rglob("*") if p.is_dir())]:
+                    self._watch(sub)
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def _watch(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        wd = self._add_watch(self._fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch {directory}")
+        self._watches[wd] = directory
+
+    def _wanted(self, path: Path) -> bool:
+        if path in self.files:
+            return True
+        return path.suffix == ".j2" and any(path.is_relative_to(root) for root in self._recursive)
+
+    def wait(self, timeout: float) -> Set[Path]:
+        # События о посторонних файлах (блокировки, временные файлы) не прерывают ожидание
+        deadline = time.monotonic() + timeout
+        changed: Set[Path] = set()
+        while not changed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self._fd], [], [], remaining)[0]:
+                break
+            self._read(changed)
+        return changed
+
+    def _read(self, changed: Set[Path]) -> None:
+        while True:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _, length = self.EVENT.unpack_from(buffer, offset)
+                offset += self.EVENT.size
+                name = buffer[offset:offset + length].rstrip(b"\0")
+                offset += length
+                directory = self._watches.get(wd)
+                if directory is None or not name:
+                    continue
+                path = directory / os.fsdecode(name)
+                if mask & self.IN_ISDIR:
+                    # Новый подкаталог шаблонов
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO) and any(
+                        path.is_relative_to(root) for root in self._recursive
+                    ):
+                        self._watch(path)
+                elif self._wanted(path):
+                    changed.add(path)
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def open_watcher(files: Sequence[Path], directories: Sequence[Path], poll: Optional[float] = None):
+    """InotifyWatcher на Linux, иначе (или при poll=интервал) — PollingWatcher."""
+    if poll is None and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(files, directories)
+        except (OSError, AttributeError) as e:
+            logger.warning("inotify недоступен (%s) — опрашиваю файлы", e)
+    return PollingWatcher(files, directories, interval=poll or 0.5)
+
+
+def run_watch(
+    builder: LiveBuilder,
+    watcher,
+    debounce: float = 0.05,
+    stop: Optional[threading.Event] = None,
+    on_update: Optional[Callable[[WatchUpdate], None]] = None,
+) -> None:
+    """
+    Цикл наблюдения: пачка изменений собирается, пока события идут
+    чаще debounce секунд (сохранение нескольких файлов, rename редактора),
+    и обрабатывается одной сборкой. Ошибки сборки (например, .env или
+    шаблон сохранены наполовину) логируются, наблюдение продолжается.
+    """
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        changed = watcher.wait(0.2)
+        if not changed:
+            continue
+        while more := watcher.wait(debounce):
+            changed |= more
+        try:
+            update = builder.apply(changed)
+        except Exception:
+            logger.exception("Не удалось пересобрать проект после изменения %s", ", ".join(map(str, sorted(changed))))
+            continue
+        if on_update is not None:
+            on_update(update)
@@ -0,0 +1,65 @@
+# test_batch.py
+import tarfile
+
+import pytest
+
+from botango.core.batch import BatchManifest, run_batch
+from botango.core.project_config import ResolutionError, config
+
+MANIFEST = """
+output = "build/{name}"
+
+[defaults]
+components = ["aiosqlite"]
+handlers = ["start"]
+env = {BOT_TOKEN = "42:batch"}
+
+[[project]]
+name = "shop"
+components = ["keyboards", "tasks"]
+env = {DB_NAME = "shop.db"}
+
+[[project]]
+name = "blog"
+output = "dist/blog.tar.gz"
+
+[[project]]
+name = "broken"
+components = ["missing"]
+"""
+
+
+def _manifest(tmp_path) -> BatchManifest:
+    path = tmp_path / "batch.toml"
+    path.write_text(MANIFEST, encoding="utf-8")
+    return BatchManifest.load(path)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_builds_projects_and_reports_failures(tmp_path, workers):
+    results = list(run_batch(_manifest(tmp_path), base_dir=tmp_path, workers=workers))
+
+    assert [r.name for r in results] == ["shop", "blog", "broken"]
+    assert [r.ok for r in results] == [True, True, False]
+    assert "missing" in results[2].error
+    assert not (tmp_path / "build" / "broken").exists()
+
+    shop = tmp_path / "build" / "shop"
+    assert (shop / "bot" / "tasks" / "queue.py").exists()
+    assert (shop / "bot" / "keyboards" / "compiled.py").exists()
+    env = (shop / "data" / ".env").read_text(encoding="utf-8")
+    assert "BOT_TOKEN=42:batch\n" in env and "DB_NAME=shop.db\n" in env
+    assert 'class = [ "start",]' in (shop / "project_file.toml").read_text(encoding="utf-8")
+
+    with tarfile.open(tmp_path / "dist" / "blog.tar.gz") as tar:
+        names = tar.getnames()
+    assert "bot/main.py" in names and "data/.env" in names
+    assert not any(name.startswith("bot/tasks/") for name in names)
+    assert results[1].files == len(names)
+
+
+def test_batch_manifest_validation(tmp_path):
+    manifest = BatchManifest.model_validate({"project": [{"name": "a"}, {"name": "b"}, {"name": "a"}]})
+    assert manifest.duplicates() == ["a"]
+    with pytest.raises(ResolutionError, match="tasks"):
+        config.resolve_selection(["tasks"])
@@ -0,0 +1,50 @@
+# test_build_manifest.py
+from pathlib import Path
+
+from botango.core.structures.structures.base_structure import BaseStructure
+from botango.core.structures.structures.bot_structure import BotStructure
+
+DATA = {"BOT_TOKEN": "token", "handlers": {"class": ["start"]}}
+
+
+class SmallStructure(BaseStructure):
+    name = "bot"
+    schema = [t for t in BotStructure.schema if t.when is None]
+
+
+def test_rebuild_skips_unchanged_targets(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first = SmallStructure().build_project(data=DATA)
+    assert first.written == len(SmallStructure.schema)
+
+    mtimes = {p: p.stat().st_mtime_ns for p in map(Path, [t.target_file for t in SmallStructure.schema])}
+    second = SmallStructure().build_project(data=DATA)
+    assert second.written == 0
+    assert len(second.skipped) == len(SmallStructure.schema)
+    assert all(p.stat().st_mtime_ns == mtime for p, mtime in mtimes.items())
+
+    third = SmallStructure().build_project(data=DATA | {"handlers": {"class": ["start", "help"]}})
+    assert [r.target.as_posix() for r in third.results] == ["bot/handlers/__init__.py"]
+    assert "help_router" in Path("bot/handlers/__init__.py").read_text(encoding="utf-8")
+
+
+def test_targets_dropped_from_schema_are_removed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    SmallStructure().build_project(data=DATA)
+
+    class Shrunk(BaseStructure):
+        name = "bot"
+        schema = SmallStructure.schema[:-1]
+
+    report = Shrunk().build_project(data=DATA)
+    removed = SmallStructure.schema[-1].target_file
+    assert report.removed == [removed]
+    assert not removed.exists()
+
+    # Каталог, в котором больше ничего нет, удаляется вместе с файлами
+    class WithoutSettings(BaseStructure):
+        name = "bot"
+        schema = [t for t in SmallStructure.schema if t.target_file.parts[0] != "settings"]
+
+    WithoutSettings().build_project(data=DATA)
+    assert not Path("settings").exists() and Path("bot").is_dir()
@@ -0,0 +1,44 @@
+# test_cli_startup.py
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Бюджет на импорты `botango --help` (после site), микросекунды.
+# Сейчас это в основном click (~20-50 ms); запас — на медленные CI.
+IMPORT_BUDGET_US = 250_000
+
+# Тяжёлые модули, которые не должны загружаться ради справки
+FORBIDDEN = ("jinja2", "pydantic", "toml", "botango.core.structures", "botango.commands")
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def _importtime(*args: str):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(SRC), os.getenv("PYTHONPATH", "")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "botango", *args],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        rows.append((name[1:].rstrip(), int(cumulative_us)))
+    return rows
+
+
+def test_help_does_not_import_heavy_modules():
+    names = [name.strip() for name, _ in _importtime("--help")]
+    loaded = [n for n in names if n.startswith(FORBIDDEN)]
+    assert not loaded, f"--help импортирует лишнее: {loaded}"
+
+
+def test_help_import_time_budget():
+    rows = _importtime("--help")
+    # Корневые импорты (без отступа), начиная после инициализации интерпретатора
+    top_level = [(name, us) for name, us in rows if not name.startswith("  ")]
+    after_site = top_level[[n.strip() for n, _ in top_level].index("site") + 1:]
+    total = sum(us for _, us in after_site)
+    assert total <= IMPORT_BUDGET_US, f"импорт --help занял {total / 1000:.1f} ms"
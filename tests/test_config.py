@@ -1,5 +1,7 @@
 # test_config.py
-from botango.core.project_config import config
+from botango.core.component_registry import ComponentRegistry
+from botango.core.component_resolver import ComponentResolver
+from botango.core.project_config import Component, ResolutionError, config
 
 
 def test_config():
@@ -24,5 +26,80 @@ def test_config():
         print("Зависимости:", list(set(all_deps)))
 
 
+def test_registry_reports_all_conflicts_and_cycles():
+    registry = ComponentRegistry([
+        Component(name="a", description="", templates="", requires=["b"]),
+        Component(name="b", description="", templates="", requires=["a"]),
+        Component(name="c", description="", templates="", conflicts_with=["a", "b"]),
+        Component(name="d", description="", templates="", required=True),
+    ])
+    errors = registry.validate(["a", "b", "c", "x"])
+
+    assert "Компонент 'x' не найден" in errors
+    assert "Компонент 'a' конфликтует с 'c'" in errors
+    assert "Компонент 'b' конфликтует с 'c'" in errors
+    assert sum("Циклическая зависимость" in e for e in errors) == 1
+    assert "Обязательный компонент 'd' не выбран" in errors
+
+
+def test_resolver_picks_database_provider_and_explains_conflicts():
+    resolved = config.resolve_selection(["migrations"])
+    assert {"migrations", "base", "handlers", "aiosqlite"} == set(resolved)
+    assert config.validate_component_selection(resolved) == []
+
+    # Уже выбранный провайдер не заменяется
+    assert "aiosqlite" not in config.resolve_selection(["postgresql-sync", "migrations"])
+
+    # Провайдер "database" может быть только один
+    databases = config.registry.providers["database"]
+    assert all(b in config.registry.conflicts[a] for a in databases for b in databases if a != b)
+    for databases in (["postgresql-sync", "aiosqlite"], ["aiosqlite", "postgresql"]):
+        try:
+            config.resolve_selection(databases)
+        except ResolutionError as e:
+            assert any("конфликтует" in reason for reason in e.reasons)
+        else:
+            raise AssertionError(f"ожидалась ResolutionError для {databases}")
+
+
+def test_resolver_closes_docker_to_docker_database():
+    resolved = config.resolve_selection(["docker", "migrations"])
+    assert "aiosqlite-docker" in resolved and "aiosqlite" not in resolved
+    assert config.validate_component_selection(resolved) == []
+    # Docker-версия базы сама подтягивает docker
+    assert "docker" in config.resolve_selection(["aiosqlite-docker"])
+
+    try:
+        config.resolve_selection(["docker", "aiosqlite"])
+    except ResolutionError as e:
+        assert e.reasons == ["При использовании Docker выберите 'aiosqlite-docker' вместо 'aiosqlite'"]
+    else:
+        raise AssertionError("ожидалась ResolutionError")
+
+
+def test_resolver_scales_with_many_capabilities():
+    # 40 возможностей по 3 провайдера: полный перебор — 3**40 вариантов.
+    # Первый провайдер конфликтует с компонентом в конце очереди,
+    # второй тянет лишний компонент — ожидается третий везде.
+    size = 40
+    components = [
+        Component(name="root", description="", templates="",
+                  requires=[f"cap_{i}" for i in range(size)] + ["late"]),
+        Component(name="late", description="", templates=""),
+        Component(name="extra", description="", templates=""),
+    ]
+    for i in range(size):
+        components += [
+            Component(name=f"p0_{i}", description="", templates="", provides=[f"cap_{i}"], conflicts_with=["late"]),
+            Component(name=f"p1_{i}", description="", templates="", provides=[f"cap_{i}"], requires=["extra"]),
+            Component(name=f"p2_{i}", description="", templates="", provides=[f"cap_{i}"]),
+        ]
+    resolver = ComponentResolver(ComponentRegistry(components))
+
+    resolved = resolver.resolve(["root"])
+
+    assert set(resolved) == {"root", "late"} | {f"p2_{i}" for i in range(size)}
+
+
 if __name__ == "__main__":
     test_config()
\ No newline at end of file
@@ -0,0 +1,73 @@
+# test_dependency_lock.py
+import base64
+import hashlib
+import subprocess
+import zipfile
+
+import pytest
+
+from botango.core.dependency_lock import DependencyLocker, LockError, find_uv
+
+try:
+    find_uv()
+except LockError:
+    pytest.skip("uv недоступен", allow_module_level=True)
+
+PYPROJECT = """[project]
+name = "bot"
+version = "0.1.0"
+requires-python = ">=3.10"
+dependencies = ["alpha>=1.0"]
+
+[tool.uv]
+package = false
+"""
+
+
+def _wheel(directory, name, version, requires=()):
+    """Минимальное колесо для локального find-links без сети."""
+    dist = f"{name}-{version}.dist-info"
+    files = {
+        f"{name}/__init__.py": "",
+        f"{dist}/METADATA": f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n"
+        + "".join(f"Requires-Dist: {r}\n" for r in requires),
+        f"{dist}/WHEEL": "Wheel-Version: 1.0\nGenerator: test\nRoot-Is-Purelib: true\nTag: py3-none-any\n",
+    }
+    record = []
+    with zipfile.ZipFile(directory / f"{name}-{version}-py3-none-any.whl", "w") as whl:
+        for path, content in files.items():
+            whl.writestr(path, content)
+            digest = base64.urlsafe_b64encode(hashlib.sha256(content.encode()).digest())
+            record.append(f"{path},sha256={digest.rstrip(b'=').decode()},{len(content)}")
+        whl.writestr(f"{dist}/RECORD", "\n".join(record + [f"{dist}/RECORD,,"]) + "\n")
+
+
+def test_lock_offline_and_reuse_cached_resolution(tmp_path, monkeypatch):
+    monkeypatch.setenv("UV_CACHE_DIR", str(tmp_path / "uv-cache"))
+    wheels = tmp_path / "wheels"
+    wheels.mkdir()
+    _wheel(wheels, "alpha", "1.0.0", ["beta>=0.1"])
+    _wheel(wheels, "beta", "0.2.0")
+
+    locker = DependencyLocker(find_links=[wheels], offline=True, cache_dir=tmp_path / "locks")
+    first, second = tmp_path / "bot1", tmp_path / "bot2"
+    for project in (first, second):
+        project.mkdir()
+        (project / "pyproject.toml").write_text(PYPROJECT, encoding="utf-8")
+
+    result = locker.lock(first)
+    assert not result.cached
+    lock_text = result.path.read_text(encoding="utf-8")
+    assert 'name = "alpha"' in lock_text and 'name = "beta"' in lock_text
+
+    reused = locker.lock(second)
+    assert reused.cached and reused.key == result.key
+    assert reused.path.read_text(encoding="utf-8") == lock_text
+
+    # Новый процесс botango lock: попадание в кеш не запускает uv вовсе
+    def forbidden(*args, **kwargs):
+        raise AssertionError(f"uv запущен: {args}")
+
+    monkeypatch.setattr(subprocess, "run", forbidden)
+    again = DependencyLocker(find_links=[wheels], offline=True, cache_dir=tmp_path / "locks").lock(second)
+    assert again.cached and again.key == result.key
@@ -0,0 +1,48 @@
+# test_file_lock.py
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from botango.core.structures.env_configuration import EnvCreator
+from botango.core.toml_creator import TomlCreator
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+PROCESSES = 6
+VALUES_PER_PROCESS = 20
+
+# Каждый процесс добавляет свои значения в project_file.toml и свои ключи в data/.env
+WORKER = """
+import sys
+from pydantic import create_model
+from botango.core.structures.env_configuration import BaseEnv, EnvCreator
+from botango.core.toml_creator import TomlCreator
+
+worker, count = int(sys.argv[1]), int(sys.argv[2])
+creator = TomlCreator("project_file.toml")
+for i in range(count):
+    creator.add_value("handlers", f"w{worker}_h{i}")
+    model = create_model("StressEnv", __base__=BaseEnv, **{f"W{worker}_K{i}": (str, "v")})
+    EnvCreator.add(model())
+"""
+
+
+def test_parallel_writers_do_not_lose_updates(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(SRC), os.getenv("PYTHONPATH", "")]))
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER, str(worker), str(VALUES_PER_PROCESS)],
+            cwd=tmp_path, env=env,
+        )
+        for worker in range(PROCESSES)
+    ]
+    assert all(p.wait(timeout=120) == 0 for p in procs)
+
+    handlers = TomlCreator("project_file.toml").read()["handlers"]["class"]
+    expected = {f"w{w}_h{i}" for w in range(PROCESSES) for i in range(VALUES_PER_PROCESS)}
+    assert set(handlers) == expected
+    assert len(handlers) == len(expected)
+
+    env_keys = set(EnvCreator.load())
+    assert {f"W{w}_K{i}" for w in range(PROCESSES) for i in range(VALUES_PER_PROCESS)} <= env_keys
@@ -0,0 +1,48 @@
+# test_keyboards.py
+import pytest
+
+from botango.core.keyboards import KeyboardSpecError, compile_keyboards
+
+SECTION = {
+    "class": [],
+    "menu": {"rows": [[{"text": "Профиль", "callback": "profile"}, {"text": "Сайт", "url": "https://example.com"}]]},
+    "product": {
+        "params": ["product_id:int", "title"],
+        "rows": [[{"text": "Купить {title}", "callback": "buy", "args": ["product_id"]}]],
+    },
+    "confirm": {"type": "reply", "rows": [["Да", {"text": "Телефон", "request_contact": True}]]},
+}
+
+
+def test_compile_keyboards():
+    specs = compile_keyboards(SECTION)
+    menu, product, confirm = specs["keyboards"]
+    assert menu["const"] == "MENU" and not menu["params"]
+    assert product["params"] == [("product_id", "int"), ("title", "str")]
+    assert product["rows"][0][0]["text"] == "'Купить {title}'.format(title=title)"
+    assert confirm["rows"][0][1]["request_contact"]
+    assert specs["actions"] == [
+        {"name": "profile", "const": "PROFILE_ACTION", "fields": []},
+        {"name": "buy", "const": "BUY_ACTION", "fields": [("product_id", "int")]},
+    ]
+
+
+def test_compile_keyboards_collects_all_errors():
+    with pytest.raises(KeyboardSpecError) as info:
+        compile_keyboards({
+            "broken": {"rows": [[
+                {"text": "Оба", "callback": "x", "url": "https://example.com"},
+                {"text": "{page}", "callback": "page", "args": ["page"]},
+            ]], "params": ["id:float"]},
+            "reply": {"type": "reply", "rows": [[{"text": "Нет", "callback": "no"}]]},
+            "long": {"rows": [[{"text": "x", "callback": "a" * 65}]]},
+            "class_": {"rows": "not a list"},
+        })
+    reasons = "\n".join(info.value.reasons)
+    assert "ровно один из callback или url" in reasons
+    assert "'page' не объявлен в params" in reasons
+    assert "неизвестный параметр 'page'" in reasons
+    assert "тип параметра 'id:float'" in reasons
+    assert "reply-клавиатуры не может быть callback" in reasons
+    assert "длиннее 64 байт" in reasons
+    assert "keyboards.class_" in reasons
@@ -0,0 +1,120 @@
+# test_output_sinks.py
+import hashlib
+import io
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from botango.core.output_sinks import (
+    DiskSink,
+    MemorySink,
+    OutputSink,
+    TarSink,
+    ZipSink,
+    _ArchiveSink,
+    _BufferingSink,
+    open_sink,
+)
+from botango.core.structures.structures.bot_structure import BotStructure
+
+DATA = {
+    "BOT_TOKEN": "token",
+    "DB_NAME": "example_database.db",
+    "handlers": {"class": ["start", "help"]},
+    "components": {"class": ["base", "handlers", "aiosqlite"]},
+}
+
+
+class _Unseekable(io.RawIOBase):
+    """Поток только на запись — как тело HTTP-ответа."""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.data += b
+        return len(b)
+
+
+def test_memory_sink_matches_disk_build(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    disk = BotStructure().build_project(data=DATA)
+    with MemorySink() as memory:
+        report = BotStructure().build_project(data=DATA, sink=memory)
+
+    assert memory.paths() == sorted(r.target.as_posix() for r in disk.results)
+    for result in report.results:
+        assert memory.files[result.target.as_posix()] == result.target.read_bytes()
+    assert [(r.size, r.digest) for r in report.results] == [(r.size, r.digest) for r in disk.results]
+    # Сборка в синк не трогает манифест и каталог
+    assert BotStructure().build_project(data=DATA).written == 0
+
+
+def test_archives_stream_without_temp_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    memory = MemorySink()
+    BotStructure().build_project(data=DATA, sink=memory)
+
+    stream = _Unseekable()
+    with TarSink(stream, prefix="mybot") as sink:
+        BotStructure().build_project(data=DATA, sink=sink)
+    with tarfile.open(fileobj=io.BytesIO(bytes(stream.data)), mode="r:gz") as tar:
+        packed = {m.name: tar.extractfile(m).read() for m in tar.getmembers()}
+    assert packed == {f"mybot/{path}": content for path, content in memory.files.items()}
+
+    stream = _Unseekable()
+    with ZipSink(stream) as sink:
+        BotStructure().build_project(data=DATA, sink=sink, workers=1)
+    with zipfile.ZipFile(io.BytesIO(bytes(stream.data))) as archive:
+        assert {name: archive.read(name) for name in archive.namelist()} == memory.files
+    assert list(tmp_path.iterdir()) == []
+
+    assert isinstance(open_sink(tmp_path / "out"), DiskSink)
+    with open_sink(tmp_path / "bot.tgz") as sink:
+        assert isinstance(sink, TarSink)
+
+
+def test_sink_without_overrides_fails_on_creation():
+    class NoWrite(OutputSink):
+        pass
+
+    class NoStore(_BufferingSink):
+        pass
+
+    class NoFinish(_ArchiveSink):
+        def _store(self, target, data):
+            pass
+
+    for sink in (NoWrite, NoStore):
+        with pytest.raises(TypeError):
+            sink()
+    with pytest.raises(TypeError):
+        NoFinish(io.BytesIO())
+
+
+def test_disk_sink_skips_unchanged_files_while_streaming(tmp_path):
+    def write(chunks):
+        # Куски отдаются генератором: сравнение не может собрать их заранее
+        return DiskSink(tmp_path, skip_unchanged=True).write(Path("a.txt"), (chunk for chunk in chunks))
+
+    path = tmp_path / "a.txt"
+    path.write_text("привет, мир", encoding="utf-8")
+    os.utime(path, (0, 0))
+    sink = DiskSink(tmp_path, skip_unchanged=True)
+    size, digest = sink.write(Path("a.txt"), (chunk for chunk in ["при", "вет, ", "мир"]))
+    assert sink.unchanged == [Path("a.txt")]
+    assert (size, digest) == (11, hashlib.sha256("привет, мир".encode("utf-8")).hexdigest())
+    assert path.stat().st_mtime == 0
+    assert os.listdir(tmp_path) == ["a.txt"]
+
+    # Новое содержимое — начало старого или его продолжение: файл перезаписывается
+    for text in (["привет"], ["привет, мир", "!"]):
+        write(text)
+        assert path.read_text(encoding="utf-8") == "".join(text)
+    assert os.listdir(tmp_path) == ["a.txt"]
@@ -0,0 +1,61 @@
+# test_requirements.py
+import pytest
+import toml
+
+from botango.core.project_config import Dependency, VersionSeparator, config
+from botango.core.output_sinks import MemorySink
+from botango.core.requirements import (
+    RequirementConflictError, merge_dependencies, split_requirements, to_pyproject_dependencies,
+    to_requirements_txt,
+)
+from botango.core.structures.structures.bot_structure import BotStructure
+
+
+def test_pins_are_intersected_per_package():
+    merged = merge_dependencies([
+        ("a", Dependency(name="SQLAlchemy", version="2.0.30")),
+        ("b", Dependency(name="sqlalchemy", version="2.0.44", separator=VersionSeparator.COMPATIBLE)),
+        ("c", Dependency(name="aiosqlite", version="0.20.0")),
+        ("d", Dependency.exact("aiosqlite", "0.21.0")),
+    ])
+    assert [r.pack() for r in merged] == ["aiosqlite==0.21.0", "SQLAlchemy>=2.0.44,<2.1"]
+    assert to_pyproject_dependencies(merged).startswith('dependencies = [\n    "aiosqlite==0.21.0",')
+
+
+def test_empty_intersection_is_reported():
+    with pytest.raises(RequirementConflictError) as e:
+        merge_dependencies([
+            ("a", Dependency.exact("django", "5.0.0")),
+            ("b", Dependency(name="Django", version="5.0", separator=VersionSeparator.LESS)),
+        ])
+    assert "django" in e.value.conflicts
+
+
+def test_component_requirements_are_memoized():
+    selected = config.resolve_selection(["migrations"])
+    first = config.get_requirements(selected)
+    assert [r.pack() for r in first] == [r.pack() for r in config.get_requirements(selected[::-1])]
+    assert first[0] is config.get_requirements(selected)[0]
+
+
+def test_optional_requirements_go_to_extra():
+    merged = merge_dependencies([
+        ("a", Dependency(name="aiogram", version="3.8.0")),
+        ("b", Dependency(name="uvloop", optional=True)),
+        ("c", Dependency(name="orjson", optional=True)),
+        ("d", Dependency(name="orjson", version="3.9", optional=False)),
+    ])
+    assert split_requirements(merged) == {
+        "requirements": ["aiogram>=3.8.0", "orjson>=3.9"],
+        "optional_requirements": ["uvloop"],
+    }
+    assert to_requirements_txt(merged).endswith("orjson>=3.9\n# Необязательные зависимости\n# uvloop\n")
+    project = toml.loads(f"[project]\n{to_pyproject_dependencies(merged)}")["project"]
+    assert project["optional-dependencies"] == {"optional": ["uvloop"]}
+
+    with MemorySink() as sink:
+        BotStructure().build_project(data={"name_project": "bot", **split_requirements(merged)}, sink=sink)
+    project = toml.loads(sink.read_text("pyproject.toml"))["project"]
+    assert project["dependencies"] == ["aiogram>=3.8.0", "orjson>=3.9"]
+    assert project["optional-dependencies"] == {"optional": ["uvloop"]}
+    assert sink.read_text("requirements.txt") == to_requirements_txt(merged)
@@ -0,0 +1,91 @@
+# test_router_index.py
+from botango.core.router_index import index_handlers, index_module
+
+START = '''
+from aiogram import F, Router
+from aiogram.filters import Command, CommandStart
+
+start_router = Router()
+
+
+@start_router.message(CommandStart())
+async def start(message): ...
+
+
+@start_router.message(Command("help", "About"))
+async def help_(message): ...
+
+
+async def pick(callback): ...
+
+start_router.callback_query.register(pick, F.data == "pick")
+start_router.message.filter(F.chat.type == "private")
+'''
+
+ECHO = '''
+from aiogram import Router
+from aiogram.filters import Command
+
+echo_router = Router()
+
+
+@echo_router.message(Command("echo"))
+async def command(message): ...
+
+
+@echo_router.edited_message()
+@echo_router.message()
+async def echo(message): ...
+
+
+@echo_router.errors()
+async def on_error(event): ...
+'''
+
+NESTED = '''
+from aiogram import Router
+
+from .admin import admin_router
+
+nested_router = Router()
+nested_router.include_router(admin_router)
+
+
+@nested_router.startup()
+async def on_startup(): ...
+'''
+
+
+def _write(tmp_path, name, source):
+    path = tmp_path / f"{name}.py"
+    path.write_text(source, encoding="utf-8")
+    return path
+
+
+def test_index_collects_events_and_commands(tmp_path):
+    info = index_module(_write(tmp_path, "start", START), "start")
+    assert info.attr == "start_router"
+    assert info.events == ("callback_query", "message")
+    assert info.commands == ("about", "help", "start")
+    assert not info.eager
+
+
+def test_message_without_command_disables_command_gating(tmp_path):
+    info = index_module(_write(tmp_path, "echo", ECHO), "echo")
+    assert info.events == ("edited_message", "error", "message")
+    assert info.commands is None
+
+
+def test_unclear_modules_are_indexed_conservatively(tmp_path):
+    info = index_module(_write(tmp_path, "nested", NESTED), "nested")
+    assert info.events is None and info.eager
+
+    broken = index_module(_write(tmp_path, "broken", "def ("), "broken")
+    assert broken.events is None
+
+    _write(tmp_path, "start", START)
+    index = index_handlers(tmp_path, ["start", "missing"])
+    assert index["start"].events is not None
+    assert index["missing"].pack() == {
+        "attr": "missing_router", "events": None, "commands": None, "eager": False,
+    }
@@ -0,0 +1,52 @@
+# test_template_render.py
+from pathlib import Path
+
+from botango.core.structures.structures.bot_structure import BotStructure
+from botango.core.template_cache import CACHE_DIR_ENV, bytecode_cache_dir, clear_cache, lock_cache_dir
+from botango.core.template_render import TemplateRenderer
+
+DATA = {
+    "name_project": "bot",
+    "BOT_TOKEN": "token",
+    "DB_NAME": "example_database.db",
+    "handlers": {"class": ["start", "help"]},
+    "components": {"class": ["base", "handlers", "aiosqlite"]},
+}
+
+
+def _snapshot(root: Path):
+    return {
+        p.relative_to(root).as_posix(): p.read_bytes()
+        for p in root.rglob("*") if p.is_file()
+    }
+
+
+def test_parallel_output_matches_serial(tmp_path, monkeypatch):
+    serial, parallel = tmp_path / "serial", tmp_path / "parallel"
+    serial.mkdir()
+    parallel.mkdir()
+
+    monkeypatch.chdir(serial)
+    for tmpl in BotStructure.schema:
+        tmpl.model_copy().create(data=DATA)
+
+    monkeypatch.chdir(parallel)
+    report = TemplateRenderer(max_workers=4).render_all(BotStructure.schema, DATA)
+
+    assert report.files == len(BotStructure.schema)
+    assert [r.target for r in report.results] == [t.target_file for t in BotStructure.schema]
+    assert all(r.render_time >= 0 and r.write_time >= 0 for r in report.results)
+    assert _snapshot(parallel) == _snapshot(serial)
+
+
+def test_clear_cache_keeps_lock_results_unless_asked(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path))
+    for path in (bytecode_cache_dir() / "a.cache", tmp_path / "0.0.1" / "jinja" / "b.cache",
+                 lock_cache_dir() / "key" / "uv.lock"):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x", encoding="utf-8")
+
+    assert clear_cache() == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["locks"]
+    assert clear_cache(locks=True) == 1
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,684 @@
+# test_templates.py
+import ast
+import asyncio
+import re
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from botango.cli import cli
+from botango.core.structures.structures.bot_structure import BotStructure
+from botango.core.toml_creator import TomlCreator
+
+BASE = {
+    "BOT_TOKEN": "token",
+    "DB_NAME": "example_database.db",
+    "handlers": {"class": ["start"]},
+}
+WEBHOOK = {
+    "WEBHOOK_URL": "https://example.com",
+    "WEBHOOK_PATH": "/webhook",
+    "WEBHOOK_SECRET": "secret",
+}
+
+CONTEXTS = {
+    "polling": BASE | {"components": {"class": ["base", "handlers", "aiosqlite"]}},
+    "webhook": BASE | WEBHOOK | {"components": {"class": ["base", "handlers", "webhook"]}},
+    "middlewares": BASE | {"THROTTLE_BURST": "5", "REDIS_HOST": "localhost",
+                           "components": {"class": ["base", "handlers", "aiosqlite", "middlewares", "throttling", "redis"]}},
+    "metrics": BASE | WEBHOOK | {"METRICS_PORT": "9100", "THROTTLE_BURST": "5",
+                                 "components": {"class": ["base", "handlers", "aiosqlite", "webhook", "middlewares", "throttling", "metrics"]}},
+    "keyboards": BASE | {"components": {"class": ["base", "handlers", "keyboards"]}},
+    "tasks": BASE | {"TASKS_CONCURRENCY": "8", "components": {"class": ["base", "handlers", "aiosqlite", "tasks"]}},
+    "redis_tasks": BASE | {"TASKS_CONCURRENCY": "8", "REDIS_HOST": "localhost",
+                           "components": {"class": ["base", "handlers", "aiosqlite", "redis", "tasks"]}},
+    "postgresql": {k: v for k, v in BASE.items() if k != "DB_NAME"}
+    | {"POSTGRES_NAME": "example_database", "components": {"class": ["base", "handlers", "postgresql"]}},
+}
+
+
+@pytest.mark.parametrize("context", CONTEXTS.values(), ids=CONTEXTS.keys())
+def test_generated_python_compiles(context, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    BotStructure().build_project(data=context)
+    sources = list(Path(".").rglob("*.py"))
+    assert sources
+    for source in sources:
+        compile(source.read_text(encoding="utf-8"), str(source), "exec")
+
+
+def test_main_selects_run_mode(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    BotStructure().build_project(data=CONTEXTS["webhook"])
+    main = Path("bot/main.py").read_text(encoding="utf-8")
+    assert "SimpleRequestHandler" in main and "secret_token=settings.WEBHOOK_SECRET" in main
+    assert "start_polling" not in main
+
+    # Режим задаёт выбор компонента webhook, а не оставшиеся в .env ключи
+    BotStructure().build_project(data=CONTEXTS["polling"] | WEBHOOK)
+    main = Path("bot/main.py").read_text(encoding="utf-8")
+    assert "start_polling" in main and "SimpleRequestHandler" not in main
+    assert "WEBHOOK_URL" not in Path("settings/settings.py").read_text(encoding="utf-8")
+    assert not Path("bot/multiworker.py").exists()
+
+
+# Модуль верхнего уровня -> пакет в requirements.txt (aiohttp и pydantic ставятся с aiogram)
+DISTRIBUTIONS = {"aiohttp": "aiogram", "pydantic": "aiogram", "dotenv": "python-dotenv"}
+# Драйверы базы данных подключаются через URL_DATABASE, а не import
+DRIVERS = {"sqlite+aiosqlite": "aiosqlite", "postgresql+asyncpg": "asyncpg"}
+# Пакеты и модули, которые генерируются только для выбранного компонента
+PACKAGES = {
+    "redis": "bot/cache", "metrics": "bot/metrics", "tasks": "bot/tasks",
+    "throttling": "bot/middlewares/throttling.py",
+}
+
+
+def _unpinned_imports(root: Path):
+    """Импорты сгенерированного кода, пакетов которых нет в requirements.txt."""
+    lines = (root / "requirements.txt").read_text(encoding="utf-8").split()
+    pinned = {re.split(r"[<>=~!\[;]", line)[0].lower() for line in lines}
+    missing = set()
+    for source in root.rglob("*.py"):
+        text = source.read_text(encoding="utf-8")
+        modules = [d for driver, d in DRIVERS.items() if driver in text]
+        for node in ast.walk(ast.parse(text)):
+            if isinstance(node, ast.Import):
+                modules += [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level:
+                modules.append(node.module)
+        for module in modules:
+            top = module.split(".")[0]
+            if top in sys.stdlib_module_names or top in ("bot", "settings"):
+                continue
+            if DISTRIBUTIONS.get(top, top) not in pinned:
+                missing.add(f"{source.relative_to(root).as_posix()}: {module}")
+    return missing
+
+
+@pytest.mark.parametrize("selections", [
+    [[]],
+    [["postgresql"]],
+    # База данных отменена: ключи остаются в .env, слой базы — нет
+    [["aiosqlite"], []],
+    [["aiosqlite", "redis"], ["postgresql"]],
+    [["metrics"], []],
+    [["redis", "tasks"], ["aiosqlite"]],
+    [["middlewares"], []],
+], ids=[
+    "default", "postgresql", "database-deselected", "redis-deselected", "metrics-deselected",
+    "tasks-deselected", "throttling-deselected",
+])
+def test_generated_code_follows_selection(selections, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for components in selections:
+        args = [arg for name in components for arg in ("-c", name)]
+        result = CliRunner().invoke(cli, ["newbot", "-w", "1", *args])
+        assert result.exit_code == 0, result.output
+    assert _unpinned_imports(tmp_path) == set()
+    resolved = TomlCreator("project_file.toml").read()["components"]["class"]
+    for component, package in PACKAGES.items():
+        assert Path(package).exists() == (component in resolved), package
+
+
+def _import_generated(monkeypatch, root: Path):
+    """Импорт сгенерированного проекта с очисткой sys.modules после теста."""
+    monkeypatch.syspath_prepend(str(root))
+    for name in list(sys.modules):
+        if name.split(".")[0] in ("bot", "settings"):
+            monkeypatch.delitem(sys.modules, name)
+    monkeypatch.setenv("ENV_PATH", str(root / "data" / ".env"))
+
+
+def test_database_layer_is_conditional(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # DB_NAME остался в .env, но база данных не выбрана
+    BotStructure().build_project(data=CONTEXTS["webhook"])
+    assert not Path("bot/database").exists()
+    assert "DbSessionMiddleware" not in Path("bot/main.py").read_text(encoding="utf-8")
+
+    report = BotStructure().build_project(data=CONTEXTS["polling"])
+    assert Path("bot/database/engine.py") in [r.target for r in report.results]
+    # База снова отключена — неизменённые файлы слоя удаляются
+    report = BotStructure().build_project(data=CONTEXTS["webhook"])
+    assert Path("bot/database/engine.py") in report.removed
+
+
+def test_sqlite_engine_and_session_per_update(tmp_path, monkeypatch):
+    pytest.importorskip("aiogram")
+    pytest.importorskip("aiosqlite")
+    monkeypatch.chdir(tmp_path)
+    BotStructure().build_project(data=CONTEXTS["polling"])
+    Path("data").mkdir(exist_ok=True)
+    Path("data/.env").write_text("BOT_TOKEN=42:token\nDB_NAME=test.db\n", encoding="utf-8")
+    _import_generated(monkeypatch, tmp_path)
+
+    from sqlalchemy import text
+
+    from bot.database import engine, session_pool
+    from bot.middlewares import DbSessionMiddleware
+
+    sessions = []
+
+    async def handler(event, data):
+        sessions.append(data["session"])
+        return (await data["session"].execute(text("PRAGMA journal_mode"))).scalar()
+
+    async def scenario():
+        middleware = DbSessionMiddleware(session_pool)
+        modes = [await middleware(handler, object(), {}) for _ in range(3)]
+        async with engine.connect() as conn:
+            synchronous = (await conn.execute(text("PRAGMA synchronous"))).scalar()
+        await engine.dispose()
+        return modes, synchronous
+
+    modes, synchronous = asyncio.run(scenario())
+    assert modes == ["wal"] * 3
+    assert synchronous == 1  # NORMAL
+    assert len(set(map(id, sessions))) == 3
+    assert engine.pool.size() == 10
+
+
+def test_broadcaster_resumes_and_backs_off(tmp_path, monkeypatch):
+    pytest.importorskip("aiogram")
+    pytest.importorskip("aiosqlite")
+    monkeypatch.chdir(tmp_path)
+    context = CONTEXTS["polling"] | {
+        "BROADCAST_RATE": "1000",
+        "components": {"class": ["base", "handlers", "aiosqlite", "services"]},
+    }
+    BotStructure().build_project(data=context)
+    Path("data").mkdir(exist_ok=True)
+    Path("data/.env").write_text("BOT_TOKEN=42:token\nDB_NAME=test.db\n", encoding="utf-8")
+    _import_generated(monkeypatch, tmp_path)
+
+    from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+    from aiogram.methods import SendMessage
+    from sqlalchemy import Column, Integer, MetaData, Table, insert
+
+    from bot.database import engine, session_pool
+    from bot.services import Broadcaster
+
+    users = Table("users", MetaData(), Column("chat_id", Integer, primary_key=True))
+    delivered = []
+    flood = {"left": 1}
+    crash = {"left": 1}
+
+    async def send(bot, chat_id):
+        method = SendMessage(chat_id=chat_id, text="hi")
+        if chat_id == 7 and flood["left"]:
+            flood["left"] -= 1
+            raise TelegramRetryAfter(method=method, message="flood", retry_after=0)
+        if chat_id % 10 == 0:
+            raise TelegramForbiddenError(method=method, message="blocked")
+        if chat_id == 25 and crash["left"]:
+            crash["left"] -= 1
+            raise RuntimeError("crash")
+        delivered.append(chat_id)
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(users.create)
+            await conn.execute(insert(users), [{"chat_id": i} for i in range(1, 51)])
+        broadcaster = Broadcaster(None, session_pool, rate=1000, concurrency=4, chunk_size=10)
+        with pytest.raises(RuntimeError):
+            await broadcaster.run("news", users.c.chat_id, send)
+        stats = await broadcaster.run("news", users.c.chat_id, send)
+        again = await broadcaster.run("news", users.c.chat_id, send)
+        await engine.dispose()
+        return stats, again
+
+    stats, again = asyncio.run(scenario())
+    assert (stats.total, stats.sent, stats.blocked, stats.failed) == (50, 45, 5, 0)
+    # Первые две пачки не отправляются повторно после сбоя в третьей
+    assert sorted(set(delivered)) == [i for i in range(1, 51) if i % 10]
+    assert all(delivered.count(i) == 1 for i in range(1, 21) if i % 10)
+    assert again.processed == 50
+
+
+def _throttling_module(tmp_path, monkeypatch):
+    pytest.importorskip("aiogram")
+    monkeypatch.chdir(tmp_path)
+    BotStructure().build_project(data=CONTEXTS["polling"] | {
+        "THROTTLE_BURST": "5", "components": {"class": ["base", "handlers", "aiosqlite", "throttling"]},
+    })
+    _import_generated(monkeypatch, tmp_path)
+    from bot.middlewares import throttling
+    return throttling
+
+
+def test_memory_throttling_is_bounded(tmp_path, monkeypatch):
+    throttling = _throttling_module(tmp_path, monkeypatch)
+    clock = [0.0]
+    monkeypatch.setattr(throttling.time, "monotonic", lambda: clock[0])
+
+    storage = throttling.MemoryThrottleStorage(burst=3, period=3, max_size=100)
+    assert [storage.consume_nowait(1) for _ in range(4)] == [True, True, True, False]
+    clock[0] = 1.0
+    assert storage.consume_nowait(1) and not storage.consume_nowait(1)
+
+    for user in range(1000):
+        storage.consume_nowait(user)
+    assert len(storage) == 100
+    # Просроченные корзины вытесняются при появлении нового пользователя
+    clock[0] = 10.0
+    storage.consume_nowait(-1)
+    assert len(storage) == 1
+
+
+def test_throttling_middleware_drops_flood(tmp_path, monkeypatch):
+    throttling = _throttling_module(tmp_path, monkeypatch)
+    from aiogram.types import User
+
+    middleware = throttling.ThrottlingMiddleware(throttling.MemoryThrottleStorage(burst=2, period=60))
+    user = User(id=1, is_bot=False, first_name="u")
+
+    async def handler(event, data):
+        return "ok"
+
+    async def scenario():
+        return [await middleware(handler, object(), {"event_from_user": user}) for _ in range(3)]
+
+    assert asyncio.run(scenario()) == ["ok", "ok", None]
+    assert middleware.throttled == 1
+
+
+def _redis_project(tmp_path, monkeypatch):
+    pytest.importorskip("aiogram")
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # Lua-скрипты в fakeredis
+    monkeypatch.chdir(tmp_path)
+    BotStructure().build_project(data=CONTEXTS["middlewares"])
+    _import_generated(monkeypatch, tmp_path)
+    return fakeredis
+
+
+def test_cache_single_flight_across_instances(tmp_path, monkeypatch):
+    fakeredis = _redis_project(tmp_path, monkeypatch)
+    from bot.cache import Cache
+
+    server = fakeredis.FakeServer()
+    calls = []
+
+    async def scenario():
+        # Два «процесса» с общим Redis
+        caches = [Cache(fakeredis.FakeAsyncRedis(server=server), poll_interval=0.01) for _ in range(2)]
+
+        async def expensive(user_id):
+            calls.append(user_id)
+            await asyncio.sleep(0.05)
+            return {"id": user_id, "name": "u"}
+
+        lookups = [caches[i % 2].cached("user:{user_id}")(expensive) for i in range(2)]
+        values = await asyncio.gather(*(lookups[i % 2](1) for i in range(20)))
+
+        update = caches[0].write_through("user:{user_id}")(
+            lambda user_id, name: asyncio.sleep(0, {"id": user_id, "name": name})
+        )
+        await update(1, name="new")
+        return values, await lookups[1](1)
+
+    values, after_update = asyncio.run(scenario())
+    assert calls == [1]
+    assert all(v == {"id": 1, "name": "u"} for v in values)
+    assert after_update == {"id": 1, "name": "new"}
+
+
+def test_redis_fsm_storage_and_throttling(tmp_path, monkeypatch):
+    fakeredis = _redis_project(tmp_path, monkeypatch)
+    from aiogram.fsm.storage.base import StorageKey
+
+    from bot.cache.client import SharedRedisStorage
+    from bot.middlewares import RedisThrottleStorage
+
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        storage = SharedRedisStorage(redis, state_ttl=60, data_ttl=60)
+        key = StorageKey(bot_id=1, chat_id=2, user_id=3)
+        await storage.set_state(key, "form:name")
+        await storage.close()  # общий клиент остаётся открытым
+        ttls = [await redis.ttl(k) for k in await redis.keys("fsm:*")]
+
+        throttle = RedisThrottleStorage(redis, burst=2, period=60)
+        allowed = [await throttle.consume(7) for _ in range(3)]
+        return await storage.get_state(key), ttls, allowed
+
+    state, ttls, allowed = asyncio.run(scenario())
+    assert state == "form:name"
+    assert ttls and all(0 < ttl <= 60 for ttl in ttls)
+    assert allowed == [True, True, False]
+
+
+def test_multiworker_shards_by_chat_and_keeps_order(tmp_path, monkeypatch):
+    pytest.importorskip("aiogram")
+    monkeypatch.chdir(tmp_path)
+    # Модулей хендлеров шаблоны не создают — импортируем без них
+    BotStructure().build_project(data=CONTEXTS["webhook"] | {"handlers": {"class": []}})
+    Path("data").mkdir(exist_ok=True)
+    Path("data/.env").write_text("BOT_TOKEN=42:token\nWEBHOOK_SECRET=s\n", encoding="utf-8")
+    _import_generated(monkeypatch, tmp_path)
+    from bot.multiworker import ChatOrdering, chat_id_of
+
+    assert chat_id_of({"update_id": 1, "message": {"chat": {"id": -5}}}) == -5
+    assert chat_id_of({"update_id": 1, "callback_query": {"from": {"id": 3}, "message": {"chat": {"id": 9}}}}) == 9
+    assert chat_id_of({"update_id": 1, "inline_query": {"from": {"id": 3}}}) == 3
+
+    done = []
+
+    async def work(chat_id, n, delay):
+        await asyncio.sleep(delay)
+        done.append((chat_id, n))
+
+    async def scenario():
+        ordering = ChatOrdering(limit=4)
+        # Первый апдейт чата 1 самый медленный, но второй ждёт его
+        await ordering.submit(1, work(1, 1, 0.03))
+        await ordering.submit(2, work(2, 1, 0.0))
+        await ordering.submit(1, work(1, 2, 0.0))
+        await ordering.join()
+
+    asyncio.run(scenario())
+    assert done == [(2, 1), (1, 1), (1, 2)]
+
+
+def test_metrics_record_handlers_and_render(tmp_path, monkeypatch):
+    pytest.importorskip("aiogram")
+    monkeypatch.chdir(tmp_path)
+    BotStructure().build_project(data=CONTEXTS["metrics"] | {"handlers": {"class": []}})
+    Path("data").mkdir(exist_ok=True)
+    Path("data/.env").write_text("BOT_TOKEN=42:token\nDB_NAME=test.db\n", encoding="utf-8")
+    _import_generated(monkeypatch, tmp_path)
+
+    from aiogram import Bot, Dispatcher, Router
+    from aiogram.types import Update
+
+    from bot.metrics import registry, setup_metrics
+
+    router = Router(name="profile")
+
+    @router.message()
+    async def show_profile(message):
+        if message.text == "boom":
+            raise ValueError(message.text)
+
+    dp = Dispatcher()
+    setup_metrics(dp)
+    dp.include_router(router)
+    bot = Bot("42:token")
+
+    def update(update_id, text):
+        return Update.model_validate({"update_id": update_id, "message": {
+            "message_id": update_id, "date": 0, "text": text, "chat": {"id": 1, "type": "private"},
+        }}, context={"bot": bot})
+
+    async def scenario():
+        await dp.feed_update(bot, update(1, "hi"))
+        with pytest.raises(ValueError):
+            await dp.feed_update(bot, update(2, "boom"))
+
+    async def queries():
+        from sqlalchemy import text as sql
+        from sqlalchemy.exc import OperationalError
+
+        from bot.database import engine
+        from bot.metrics import instrument_engine
+
+        instrument_engine(engine)
+        async with engine.connect() as conn:
+            await conn.execute(sql("SELECT 1"))
+            with pytest.raises(OperationalError):
+                await conn.execute(sql("SELECT * FROM missing"))
+            info = dict(conn.sync_connection.info)
+        await engine.dispose()
+        return info
+
+    asyncio.run(scenario())
+    # Неудачный запрос тоже замерен, и время его начала не остаётся на соединении
+    assert "query_started" not in asyncio.run(queries())
+    text = registry.render()
+    assert "bot_db_query_duration_seconds_count 2" in text
+    labels = 'router="profile",handler="test_metrics_record_handlers_and_render.<locals>.show_profile"'
+    assert f"bot_handler_calls_total{{{labels}}} 2" in text
+    assert f"bot_handler_errors_total{{{labels}}} 1" in text
+    assert f'bot_handler_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert 'bot_updates_total{type="message"} 2' in text
+    assert "bot_updates_in_flight 0" in text
+    assert "# TYPE bot_db_query_duration_seconds histogram" in text
+
+
+HANDLER_MODULES = {
+    "start": '''
+from aiogram import Router
+from aiogram.filters import CommandStart
+
+start_router = Router()
+
+
+@start_router.message(CommandStart())
+async def start(message):
+    return "start"
+''',
+    "buttons": '''
+from aiogram import Router
+
+buttons_router = Router()
+
+
+@buttons_router.callback_query()
+async def pressed(callback):
+    return "pressed"
+''',
+    "echo": '''
+from aiogram import Router
+
+echo_router = Router()
+
+
+@echo_router.message()
+async def echo(message):
+    return "echo"
+''',
+}
+
+
+def test_handlers_load_lazily(tmp_path, monkeypatch):
+    pytest.importorskip("aiogram")
+    from botango.core.router_index import index_handlers
+
+    monkeypatch.chdir(tmp_path)
+    Path("bot/handlers").mkdir(parents=True)
+    for name, source in HANDLER_MODULES.items():
+        Path(f"bot/handlers/{name}.py").write_text(source, encoding="utf-8")
+    names = list(HANDLER_MODULES)
+    routers = {name: info.pack() for name, info in index_handlers(Path("bot/handlers"), names).items()}
+    BotStructure().build_project(data=CONTEXTS["webhook"] | {"handlers": {"class": names}, "routers": routers})
+    Path("data").mkdir(exist_ok=True)
+    Path("data/.env").write_text("BOT_TOKEN=42:token\n", encoding="utf-8")
+    _import_generated(monkeypatch, tmp_path)
+
+    from aiogram import Bot, Dispatcher
+    from aiogram.types import Update
+    from bot import handlers
+
+    dp = Dispatcher()
+    handlers.include_routers(dp)
+    assert not any(f"bot.handlers.{name}" in sys.modules for name in names)
+    assert handlers.update_types(dp) == ["callback_query", "message"]
+
+    bot = Bot("42:token")
+    chat = {"id": 1, "type": "private"}
+
+    def message(text):
+        return Update.model_validate({"update_id": 1, "message": {
+            "message_id": 1, "date": 0, "text": text, "chat": chat,
+        }}, context={"bot": bot})
+
+    async def scenario():
+        # Не команда: start (только /start) не загружается, отвечает echo
+        assert await dp.feed_update(bot, message("hi")) == "echo"
+        assert "bot.handlers.start" not in sys.modules
+        assert "bot.handlers.buttons" not in sys.modules
+        assert await dp.feed_update(bot, message("/start now")) == "start"
+        await bot.session.close()
+
+    asyncio.run(scenario())
+    assert "bot.handlers.buttons" not in sys.modules
+    assert handlers.buttons_router is sys.modules["bot.handlers.buttons"].buttons_router
+
+
+def test_keyboards_are_prebuilt_and_serialized_once(tmp_path, monkeypatch):
+    pytest.importorskip("aiogram")
+    from botango.core.keyboards import compile_keyboards
+
+    monkeypatch.chdir(tmp_path)
+    specs = compile_keyboards({
+        "menu": {"rows": [[{"text": "Профиль", "callback": "profile"}, {"text": "Сайт", "url": "https://example.com"}]]},
+        "product": {"params": ["product_id:int"], "rows": [[{"text": "Купить {product_id}", "callback": "buy", "args": ["product_id"]}]]},
+    })
+    BotStructure().build_project(data=CONTEXTS["polling"] | {
+        "handlers": {"class": []},
+        "components": {"class": ["base", "handlers", "aiosqlite", "keyboards"]},
+        "keyboard_specs": specs,
+    })
+    Path("data").mkdir(exist_ok=True)
+    Path("data/.env").write_text("BOT_TOKEN=42:token\n", encoding="utf-8")
+    _import_generated(monkeypatch, tmp_path)
+
+    import json
+
+    from aiogram import Bot
+    from aiogram.client.session.aiohttp import AiohttpSession
+    from aiogram.methods import SendMessage
+    from aiogram.types import CallbackQuery, User
+    from bot.keyboards import BUY_ACTION, MENU, product
+    from bot.main import create_bot
+
+    with pytest.raises(Exception):
+        MENU.inline_keyboard = []  # frozen
+    assert product(7) is product(7)
+    assert product(7).inline_keyboard[0][0].callback_data == "buy:7"
+
+    callback = CallbackQuery(id="1", from_user=User(id=1, is_bot=False, first_name="u"), chat_instance="c", data="buy:7")
+    assert asyncio.run(BUY_ACTION.filter()(callback)) == {"product_id": 7}
+    assert BUY_ACTION.unpack("buy:x") is None and BUY_ACTION.unpack("buyer:7") is None
+
+    bot = create_bot()
+    method = SendMessage(chat_id=1, text="hi", reply_markup=MENU)
+    fields = {f[0]["name"]: f[2] for f in bot.session.build_form_data(bot, method)._fields}
+    plain = {f[0]["name"]: f[2] for f in AiohttpSession().build_form_data(bot, method)._fields}
+    assert fields.keys() == plain.keys()
+    assert json.loads(fields["reply_markup"]) == json.loads(plain["reply_markup"])
+    asyncio.run(bot.session.close())
+
+
+async def _exercise_task_queue(queue, worker_cls):
+    """Повторы, ключ идемпотентности, отложенная и неудачная задача на одном хранилище."""
+    calls = []
+
+    @queue.task(max_attempts=3)
+    async def flaky(n, bot):
+        calls.append((n, bot))
+        if len(calls) < 3:
+            raise RuntimeError("boom")
+
+    @queue.task(max_attempts=2)
+    async def broken():
+        raise ValueError("nope")
+
+    worker = worker_cls(queue, concurrency=4, poll_interval=0.01, bot="bot")
+    await worker.start()
+    first = await flaky.enqueue(1, key="order:1")
+    duplicate = await flaky.enqueue(1, key="order:1")
+    await queue.enqueue(broken)
+    delayed = await flaky.enqueue(2, delay=60)
+    for _ in range(500):
+        if worker.processed and worker.failed:
+            break
+        await asyncio.sleep(0.01)
+    assert await worker.stop(1)
+    # Через минуту отложенная задача будет выдана
+    later = await queue.backend.claim(10, time.time() + 120, 30)
+    return {
+        "first": first, "duplicate": duplicate, "calls": calls,
+        "processed": worker.processed, "failed": worker.failed,
+        "later": [(job.id, job.args, job.attempts) for job in later], "delayed": delayed,
+        "again": await flaky.enqueue(1, key="order:1"),
+    }
+
+
+def _check_task_queue(result):
+    assert result["first"] is not None and result["duplicate"] is None
+    assert result["calls"] == [(1, "bot")] * 3
+    assert result["processed"] == 1 and result["failed"] == 1
+    assert result["later"] == [(result["delayed"], [2], 1)]
+    # Ключ занят и после выполнения задачи
+    assert result["again"] is None
+
+
+def test_sql_task_queue_retries_and_deduplicates(tmp_path, monkeypatch):
+    pytest.importorskip("aiogram")
+    pytest.importorskip("aiosqlite")
+    monkeypatch.chdir(tmp_path)
+    BotStructure().build_project(data=CONTEXTS["tasks"] | {"handlers": {"class": []}})
+    Path("data").mkdir(exist_ok=True)
+    Path("data/.env").write_text("BOT_TOKEN=42:token\nDB_NAME=test.db\n", encoding="utf-8")
+    _import_generated(monkeypatch, tmp_path)
+
+    from bot.database import engine, session_pool
+    from bot.tasks import TaskQueue, Worker, queue
+    from bot.tasks.backends import SqlBackend
+
+    async def scenario():
+        backend = SqlBackend(engine, session_pool, key_ttl=60)
+        result = await _exercise_task_queue(TaskQueue(backend, retry_delay=0.01), Worker)
+        # Старые завершённые задачи удаляются, ключ снова свободен
+        removed = await backend.cleanup(0)
+        result["after_cleanup"] = await backend.push(Job(name="x", key="order:1"))
+        await engine.dispose()
+        return result, removed
+
+    from bot.tasks import Job
+
+    result, removed = asyncio.run(scenario())
+    _check_task_queue(result)
+    assert removed == 2 and result["after_cleanup"] is not None
+    assert "bot.tasks:cleanup" in [p.task.name for p in queue.periodic]
+    main = Path("bot/main.py").read_text(encoding="utf-8")
+    assert "dp.startup.register(start_tasks)" in main and "await stop_worker(SHUTDOWN_TIMEOUT)" in main
+
+
+def test_redis_task_queue_retries_and_deduplicates(tmp_path, monkeypatch):
+    pytest.importorskip("aiogram")
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    monkeypatch.chdir(tmp_path)
+    BotStructure().build_project(data=CONTEXTS["redis_tasks"] | {"handlers": {"class": []}})
+    Path("data").mkdir(exist_ok=True)
+    Path("data/.env").write_text("BOT_TOKEN=42:token\nREDIS_HOST=localhost\n", encoding="utf-8")
+    _import_generated(monkeypatch, tmp_path)
+    assert not Path("bot/database/models.py").read_text(encoding="utf-8").count("TaskJob")
+
+    from bot.tasks import TaskQueue, Worker
+    from bot.tasks.backends import RedisBackend
+
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        backend = RedisBackend(redis, prefix="t", key_ttl=60)
+        result = await _exercise_task_queue(TaskQueue(backend, retry_delay=0.01), Worker)
+        # Ключ отложенной дольше key_ttl задачи не истекает, пока она в очереди
+        late = Job(name="x", key="late", run_at=time.time() + 3600)
+        result["late"] = await backend.push(late), await backend.push(late), await redis.ttl("t:key:late")
+        result["done_ttl"] = await redis.ttl("t:key:order:1")
+        return result, await redis.lrange("t:failed", 0, -1), await redis.zcard("t:running")
+
+    from bot.tasks import Job
+
+    result, failed, running = asyncio.run(scenario())
+    _check_task_queue(result)
+    assert len(failed) == 1 and running == 1  # выданная в claim отложенная задача
+    pushed, duplicate, ttl = result["late"]
+    assert pushed is not None and duplicate is None and ttl == -1
+    # После выполнения ключ живёт key_ttl секунд
+    assert 0 < result["done_ttl"] <= 60
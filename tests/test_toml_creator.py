@@ -0,0 +1,71 @@
+# test_toml_creator.py
+import pytest
+
+from botango.core.toml_creator import TomlCreator, TomlStaleError
+
+
+def test_session_coalesces_writes(tmp_path, monkeypatch):
+    creator = TomlCreator(str(tmp_path / "project_file.toml"))
+    creator.rewrite({"handlers": {"class": []}})
+
+    writes = []
+    original = creator.write
+    monkeypatch.setattr(creator, "write", lambda data: (writes.append(1), original(data)))
+
+    with creator.session() as s:
+        for i in range(200):
+            s.add_value("handlers", f"handler_{i}")
+        s.add_value("handlers", "handler_0")
+        s.add_model("keyboards")
+        s.delete_value("handlers", "handler_1")
+
+    assert len(writes) == 1
+    data = creator.read()
+    assert len(data["handlers"]["class"]) == 199
+    assert data["keyboards"] == {"class": []}
+
+
+def test_session_detects_external_change(tmp_path):
+    creator = TomlCreator(str(tmp_path / "project_file.toml"))
+    creator.add_value("handlers", "start")
+
+    with pytest.raises(TomlStaleError):
+        with creator.session() as s:
+            s.add_value("handlers", "help")
+            TomlCreator(str(creator.path)).add_value("handlers", "admin")
+
+    assert creator.read()["handlers"]["class"] == ["start", "admin"]
+
+
+def test_extra_tables_survive_rewrites(tmp_path):
+    creator = TomlCreator(str(tmp_path / "project_file.toml"))
+    spec = {"type": "reply", "rows": [[{"text": "Да", "request_contact": True}, {"text": "Нет"}]]}
+    creator.path.write_text(
+        '[keyboards]\nclass = []\n\n[keyboards.confirm]\ntype = "reply"\n'
+        'rows = [[{text = "Да", request_contact = true}, {text = "Нет"}]]\n',
+        encoding="utf-8",
+    )
+
+    with creator.session() as s:
+        s.add_value("handlers", "start")
+        s.rewrite({"keyboards": {"class": []}})
+
+    data = creator.read()
+    assert data["handlers"] == {"class": ["start"]}
+    assert data["keyboards"]["confirm"] == spec
+
+
+def test_unchanged_rewrite_does_not_touch_file(tmp_path, monkeypatch):
+    creator = TomlCreator(str(tmp_path / "project_file.toml"))
+    creator.rewrite({"components": {"class": ["base", "handlers"]}, "handlers": {"class": []}})
+
+    writes = []
+    monkeypatch.setattr(creator, "write", lambda data: writes.append(data))
+    with creator.session() as s:
+        s.rewrite({"components": {"class": ["base", "handlers"]}})
+        s.rewrite({"handlers": {"class": ["start"]}}, prefer_new=False)
+    assert writes == []
+
+    with creator.session() as s:
+        s.rewrite({"components": {"class": ["base"]}})
+    assert writes == [{"components": {"class": ["base"]}, "handlers": {"class": []}}]
@@ -0,0 +1,51 @@
+# test_tracing.py
+import json
+import pstats
+
+from click.testing import CliRunner
+
+from botango.cli import cli
+from botango.core import tracing
+
+
+def test_spans_are_noop_when_disabled():
+    assert tracing.current() is None
+    assert tracing.span("a", "b", x=1) is tracing.span("c", "d")
+
+    @tracing.traced("double", "test")
+    def double(x):
+        return x * 2
+
+    assert double(2) == 4
+    tracer = tracing.enable()
+    try:
+        with tracing.span("outer", "test", size=3):
+            assert double(3) == 6
+    finally:
+        assert tracing.disable() is tracer
+    assert [(e["name"], e["cat"]) for e in tracer.events] == [("double", "test"), ("outer", "test")]
+    assert tracer.events[1]["args"] == {"size": 3}
+    assert double(4) == 8 and len(tracer.events) == 2
+
+
+def test_cli_trace_and_profile(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = CliRunner().invoke(
+        cli, ["--trace", "trace.json", "--profile", "newbot.prof", "newbot", "-c", "aiosqlite", "-w", "1"],
+    )
+    assert result.exit_code == 0, result.output
+    assert tracing.current() is None
+
+    trace = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))
+    events = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    assert all({"name", "cat", "ts", "dur", "pid", "tid"} <= e.keys() for e in events)
+    names = {e["name"] for e in events}
+    assert {
+        "import", "env.load", "env.add", "toml.read", "toml.write", "components.resolve",
+        "build", "template.lookup", "template.render", "template.write",
+    } <= names
+    rendered = {e["args"]["target"] for e in events if e["name"] == "template"}
+    assert "bot/main.py" in {path.replace("\\", "/") for path in rendered}
+
+    stats = pstats.Stats(str(tmp_path / "newbot.prof"))
+    assert any(func[2] == "build_project" for func in stats.stats)
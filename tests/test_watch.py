@@ -0,0 +1,105 @@
+# test_watch.py
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from botango.cli import cli
+from botango.core.toml_creator import TomlCreator
+from botango.core.watch import InotifyWatcher, LiveBuilder, PollingWatcher, run_watch
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = CliRunner().invoke(cli, ["newbot", "-c", "aiosqlite", "-c", "redis", "-w", "1"])
+    assert result.exit_code == 0, result.output
+    return tmp_path
+
+
+def _written(update):
+    unchanged = set(update.report.unchanged)
+    return [r.target.as_posix() for r in update.report.results if r.target not in unchanged]
+
+
+def test_live_builder_rebuilds_only_affected_targets(project):
+    builder = LiveBuilder()
+    assert builder.build_all().written == 0
+
+    TomlCreator("project_file.toml").add_value("handlers", "start")
+    update = builder.apply([Path("project_file.toml")])
+    assert update.keys == {"handlers", "routers"}
+    assert update.targets == {Path("bot/handlers/__init__.py")}
+    assert _written(update) == ["bot/handlers/__init__.py"]
+    assert "start_router" in Path("bot/handlers/__init__.py").read_text(encoding="utf-8")
+
+    # Значение REDIS_HOST в код не попадает: шаблоны не затронуты, файлы не тронуты
+    mtimes = {p: p.stat().st_mtime_ns for p in Path("bot").rglob("*.py")}
+    env = Path("data/.env")
+    env.write_text(env.read_text(encoding="utf-8").replace("REDIS_HOST=localhost", "REDIS_HOST="), encoding="utf-8")
+    update = builder.apply([env])
+    assert update.keys == {"REDIS_HOST"}
+    assert not update.targets
+    assert all(p.stat().st_mtime_ns == mtime for p, mtime in mtimes.items())
+
+    # Отмена выбора Redis меняет условия when: кеш удаляется, остальное по индексу
+    TomlCreator("project_file.toml").delete_value("components", "redis")
+    update = builder.apply([Path("project_file.toml")])
+    assert Path("bot/cache/client.py") in update.report.removed
+    assert not Path("bot/cache/client.py").exists()
+    assert "bot/handlers/__init__.py" not in _written(update)
+
+    assert builder.apply([]).report is None
+    assert builder.index.dependents("bot/handlers/__init__.py.j2") == {Path("bot/handlers/__init__.py")}
+
+
+@pytest.mark.parametrize("kind", ["polling", "inotify"])
+def test_watchers_report_changed_files(tmp_path, kind):
+    if kind == "inotify" and not sys.platform.startswith("linux"):
+        pytest.skip("inotify есть только в Linux")
+    env = tmp_path / "data" / ".env"
+    env.parent.mkdir()
+    env.write_text("A=1\n", encoding="utf-8")
+    templates = tmp_path / "templates"
+    (templates / "bot").mkdir(parents=True)
+    watcher = (
+        PollingWatcher([env], [templates], interval=0.01) if kind == "polling" else InotifyWatcher([env], [templates])
+    )
+    try:
+        time.sleep(0.02)
+        assert watcher.wait(0.05) == set()
+        env.write_text("A=2\n", encoding="utf-8")
+        (templates / "bot" / "main.py.j2").write_text("x", encoding="utf-8")
+        (tmp_path / "data" / "unrelated.txt").write_text("x", encoding="utf-8")
+        changed = set()
+        deadline = time.monotonic() + 2
+        while len(changed) < 2 and time.monotonic() < deadline:
+            changed |= watcher.wait(0.1)
+        assert {p.resolve() for p in changed} == {env.resolve(), (templates / "bot" / "main.py.j2").resolve()}
+    finally:
+        watcher.close()
+
+
+def test_run_watch_debounces_bursts(project):
+    builder = LiveBuilder()
+    watcher = PollingWatcher(builder.files, [], interval=0.01)
+    updates, stop = [], threading.Event()
+    thread = threading.Thread(target=run_watch, args=(builder, watcher), kwargs={
+        "debounce": 0.1, "stop": stop, "on_update": updates.append,
+    })
+    thread.start()
+    try:
+        for name in ("a", "b", "c"):
+            TomlCreator("project_file.toml").add_value("handlers", name)
+        deadline = time.monotonic() + 5
+        while not updates and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        stop.set()
+        thread.join()
+    assert len(updates) == 1
+    assert _written(updates[0]) == ["bot/handlers/__init__.py"]
+    assert "c_router" in Path("bot/handlers/__init__.py").read_text(encoding="utf-8")